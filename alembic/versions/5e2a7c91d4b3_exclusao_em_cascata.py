@@ -0,0 +1,49 @@
+"""Exclusao em cascata e indices das chaves estrangeiras
+
+Revision ID: 5e2a7c91d4b3
+Revises: a9cc79d9ecc2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a7c91d4b3'
+down_revision: Union[str, Sequence[str], None] = 'a9cc79d9ecc2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabela, coluna, tabela referenciada, ON DELETE)
+# Os nomes das restrições são os gerados pelo PostgreSQL nas migrações anteriores
+CHAVES = [
+    ('projeto', 'cliente_id', 'cliente', 'CASCADE'),
+    ('sistema', 'projeto_id', 'projeto', 'CASCADE'),
+    ('contagem', 'cliente_id', 'cliente', 'CASCADE'),
+    ('contagem', 'projeto_id', 'projeto', 'CASCADE'),
+    ('contagem', 'sistema_id', 'sistema', 'SET NULL'),
+    ('funcao', 'contagem_id', 'contagem', 'CASCADE'),
+    ('funcao', 'sistema_id', 'sistema', 'SET NULL'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabela, coluna, referenciada, ao_excluir in CHAVES:
+        restricao = f'{tabela}_{coluna}_fkey'
+        op.drop_constraint(restricao, tabela, type_='foreignkey')
+        op.create_foreign_key(restricao, tabela, referenciada, [coluna], ['id'], ondelete=ao_excluir)
+        # Sem índice, cada linha excluída na tabela referenciada varre a tabela inteira
+        op.create_index(op.f(f'ix_{tabela}_{coluna}'), tabela, [coluna], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabela, coluna, referenciada, _ in reversed(CHAVES):
+        restricao = f'{tabela}_{coluna}_fkey'
+        op.drop_index(op.f(f'ix_{tabela}_{coluna}'), table_name=tabela)
+        op.drop_constraint(restricao, tabela, type_='foreignkey')
+        op.create_foreign_key(restricao, tabela, referenciada, [coluna], ['id'])
@@ -0,0 +1,48 @@
+"""Busca textual (tsvector em portugues) nas funcoes
+
+Revision ID: c41d8e2f7a60
+Revises: 5e2a7c91d4b3
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e2f7a60'
+down_revision: Union[str, Sequence[str], None] = '5e2a7c91d4b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Pesos: identificação (A), DER/RLR (B), insumos e observações (C).
+# Mesma expressão de app.models.BUSCA_FUNCAO_SQL no momento desta migração.
+BUSCA = (
+    "setweight(to_tsvector('portuguese', coalesce(modulo, '') || ' ' || coalesce(funcionalidade, '') || ' ' || coalesce(nome, '')), 'A')"
+    " || setweight(to_tsvector('portuguese', coalesce(desc_der, '') || ' ' || coalesce(desc_rlr, '')), 'B')"
+    " || setweight(to_tsvector('portuguese', coalesce(insumos, '') || ' ' || coalesce(observacoes, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # A coluna gerada reescreve a tabela (uma vez); depois o PostgreSQL a mantém
+    op.execute(f'ALTER TABLE funcao ADD COLUMN busca tsvector GENERATED ALWAYS AS ({BUSCA}) STORED')
+    # CONCURRENTLY: o índice é construído sem bloquear escritas em funcao
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_funcao_busca', 'funcao', ['busca'], unique=False,
+            postgresql_using='gin', postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_funcao_busca', table_name='funcao')
+    op.drop_column('funcao', 'busca')
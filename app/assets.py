@@ -0,0 +1,258 @@
+# app/assets.py
+#
+# Pipeline dos arquivos estáticos usados pelos templates: gera cópias com
+# hash do conteúdo no nome (static/dist/...), acompanhadas de versões .gz e
+# .br pré-comprimidas, e um manifest.json que o helper `asset_url` consulta
+# para montar as URLs nos templates.
+#
+# Não há minificador aqui: quando o fornecedor distribui uma versão .min ela
+# é a usada (e a cópia mantém o .min no nome); os demais arquivos mantêm o
+# nome original. No CSS próprio só os comentários e a indentação são
+# removidos, o que não altera seletores, strings nem url().
+#
+# Uso (CLI): python -m app.assets
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import tempfile
+from typing import Optional
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele só as versões .gz são geradas
+    brotli = None
+
+STATIC_DIR = "static"
+DIST_DIR = "dist"
+MANIFEST = os.path.join(STATIC_DIR, DIST_DIR, "manifest.json")
+TEMPLATES_DIR = "templates"
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+
+_ASSET_URL_RE = re.compile(r"""asset_url\(\s*['"]([^'"]+)['"]\s*\)""")
+_CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_SOURCEMAP_RE = re.compile(r"^\s*(//|/\*)# sourceMappingURL=.*$", re.MULTILINE)
+_CSS_COMENTARIO_RE = re.compile(r"/\*(?!!).*?\*/", re.DOTALL)
+_CSS_INDENTACAO_RE = re.compile(r"^[ \t]+", re.MULTILINE)
+
+_manifesto: Optional[dict] = None
+
+
+# --- Build ---
+
+def assets_dos_templates() -> list:
+    """Caminhos (relativos a static/) referenciados via asset_url nos templates."""
+    encontrados = set()
+    for raiz, _, arquivos in os.walk(TEMPLATES_DIR):
+        for nome in arquivos:
+            if nome.endswith(".html"):
+                with open(os.path.join(raiz, nome), encoding="utf-8") as f:
+                    encontrados.update(_ASSET_URL_RE.findall(f.read()))
+    return sorted(encontrados)
+
+
+def _fonte_minificada(caminho: str) -> str:
+    """Usa a versão .min distribuída pelo fornecedor, quando existir."""
+    base, ext = os.path.splitext(caminho)
+    if not base.endswith(".min") and os.path.exists(os.path.join(STATIC_DIR, f"{base}.min{ext}")):
+        return f"{base}.min{ext}"
+    return caminho
+
+
+def _enxugar_css(conteudo: str) -> str:
+    """Remove comentários, indentação e linhas vazias; o restante fica como está."""
+    conteudo = _CSS_COMENTARIO_RE.sub("", conteudo)
+    conteudo = _CSS_INDENTACAO_RE.sub("", conteudo)
+    return "\n".join(linha for linha in conteudo.splitlines() if linha.strip()) + "\n"
+
+
+def _reescrever_urls_css(conteudo: str, caminho: str) -> str:
+    """
+    Converte os url() relativos em absolutos (/static/...), já que a cópia
+    com hash fica em outro diretório (ex.: fontes do fontawesome).
+    """
+    diretorio = posixpath.dirname(caminho)
+
+    def trocar(match):
+        url = match.group(2).strip()
+        if url.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        resolvido = posixpath.normpath(posixpath.join(diretorio, url))
+        return f'url("/{STATIC_DIR}/{resolvido}")'
+
+    return _CSS_URL_RE.sub(trocar, conteudo)
+
+
+def _processar(caminho: str) -> tuple:
+    """(conteúdo, arquivo de origem): a origem é a versão .min quando existir."""
+    fonte = _fonte_minificada(caminho)
+    with open(os.path.join(STATIC_DIR, fonte), encoding="utf-8") as f:
+        conteudo = f.read()
+    conteudo = _SOURCEMAP_RE.sub("", conteudo)
+    if fonte.endswith(".css"):
+        if ".min." not in fonte:
+            conteudo = _enxugar_css(conteudo)
+        conteudo = _reescrever_urls_css(conteudo, fonte)
+    # JavaScript sem versão .min é copiado sem alterações (não há minificador seguro aqui)
+    return conteudo.encode("utf-8"), fonte
+
+
+def _gravar(destino: str, dados: bytes):
+    """
+    Grava em um arquivo temporário e troca com os.replace: com vários workers
+    construindo ao mesmo tempo, nenhum deles lê (ou serve) um arquivo pela metade.
+    """
+    diretorio = os.path.dirname(destino)
+    os.makedirs(diretorio, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dados)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def _ja_gerado(destino: str, dados: bytes) -> bool:
+    """O arquivo com hash existe e tem exatamente o conteúdo esperado."""
+    try:
+        with open(destino, "rb") as f:
+            return f.read() == dados
+    except FileNotFoundError:
+        return False
+
+
+def construir_assets(caminhos: Optional[list] = None) -> dict:
+    """
+    Gera as cópias com hash (e as variantes .gz/.br) e grava o manifest.
+    Retorna o manifest {caminho original: caminho com hash}.
+    """
+    global _manifesto
+    manifesto = {}
+    for caminho in caminhos or assets_dos_templates():
+        dados, fonte = _processar(caminho)
+        digest = hashlib.sha256(dados).hexdigest()[:12]
+        # O .min no nome só quando o conteúdo veio de uma versão minificada
+        base, ext = os.path.splitext(fonte)
+        minificado = base.endswith(".min")
+        base = base[:-4] if minificado else base
+        hashed = f"{DIST_DIR}/{base}.{digest}{'.min' if minificado else ''}{ext}"
+        destino = os.path.join(STATIC_DIR, hashed)
+        # As variantes comprimidas são gravadas antes do arquivo principal, que
+        # só aparece (e é conferido) depois que todas estão completas
+        if not _ja_gerado(destino, dados):
+            _gravar(destino + ".gz", gzip.compress(dados, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _gravar(destino + ".br", brotli.compress(dados, quality=11))
+            _gravar(destino, dados)
+        manifesto[caminho] = hashed
+
+    _gravar(MANIFEST, json.dumps(manifesto, indent=2, sort_keys=True).encode("utf-8"))
+    _manifesto = manifesto
+    return manifesto
+
+
+def manifesto_desatualizado() -> bool:
+    """True quando o manifest não existe ou algum template/asset é mais novo que ele."""
+    if not os.path.exists(MANIFEST):
+        return True
+    gerado_em = os.path.getmtime(MANIFEST)
+    for raiz, _, arquivos in os.walk(TEMPLATES_DIR):
+        if any(os.path.getmtime(os.path.join(raiz, n)) > gerado_em for n in arquivos):
+            return True
+    try:
+        with open(MANIFEST, encoding="utf-8") as f:
+            origens = json.load(f)
+    except (OSError, ValueError):
+        return True
+    return any(
+        os.path.getmtime(os.path.join(STATIC_DIR, _fonte_minificada(c))) > gerado_em
+        for c in origens
+    )
+
+
+def preparar_assets() -> dict:
+    """Chamado na inicialização: reconstrói só se necessário."""
+    if manifesto_desatualizado():
+        return construir_assets()
+    return carregar_manifesto()
+
+
+def carregar_manifesto() -> dict:
+    global _manifesto
+    if _manifesto is None:
+        try:
+            with open(MANIFEST, encoding="utf-8") as f:
+                _manifesto = json.load(f)
+        except (OSError, ValueError):
+            # Sem build (ou manifest ilegível): usa os arquivos originais e
+            # tenta ler de novo na próxima chamada
+            return {}
+    return _manifesto
+
+
+def asset_url(caminho: str) -> str:
+    """Helper dos templates: URL da cópia com hash, ou do arquivo original se não houver build."""
+    return f"/{STATIC_DIR}/{carregar_manifesto().get(caminho, caminho)}"
+
+
+# --- Servidor ---
+
+def _codificacoes_aceitas(scope: Scope) -> list:
+    aceitas = []
+    for parte in Headers(scope=scope).get("accept-encoding", "").split(","):
+        nome, _, parametro = parte.strip().partition(";")
+        if parametro.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        aceitas.append(nome.strip().lower())
+    return aceitas
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles que entrega a variante .br/.gz pré-comprimida conforme o
+    Accept-Encoding e marca os arquivos com hash (dist/) como imutáveis.
+    """
+
+    async def get_response(self, path: str, scope: Scope):
+        response = None
+        if path.startswith(f"{DIST_DIR}/"):
+            aceitas = _codificacoes_aceitas(scope)
+            for codificacao, extensao in (("br", ".br"), ("gzip", ".gz")):
+                if codificacao not in aceitas:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + extensao)
+                if stat_result is None:
+                    continue
+                response = self.file_response(full_path, stat_result, scope)
+                media_type, _ = mimetypes.guess_type(path)
+                media_type = media_type or "application/octet-stream"
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["content-type"] = media_type
+                response.headers["content-encoding"] = codificacao
+                break
+
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if path.startswith(f"{DIST_DIR}/") and response.status_code in (200, 304):
+            response.headers["cache-control"] = CACHE_IMUTAVEL
+            response.headers["vary"] = "Accept-Encoding"
+        return response
+
+
+if __name__ == "__main__":
+    for original, hashed in construir_assets().items():
+        print(f"{original} -> {hashed}")
@@ -0,0 +1,175 @@
+# app/compression.py
+#
+# Middleware ASGI de compressão das respostas (JSON da API e HTML das páginas).
+# Negocia brotli/gzip pelo Accept-Encoding, só comprime tipos de texto
+# (lista permitida) acima de um tamanho mínimo e funciona em streaming: cada
+# pedaço de um StreamingResponse é comprimido e enviado com flush, sem
+# acumular a resposta inteira em memória.
+
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # sem brotli, só gzip é negociado
+    brotli = None
+
+# Respostas menores que isso não compensam o custo da compressão
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Tipos comprimíveis. Planilhas (.xlsx já é zip), imagens, fontes e arquivos
+# pré-comprimidos de /static/dist ficam de fora.
+TIPOS_COMPRIMIVEIS = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+
+def negociar_codificacao(accept_encoding: str, brotli_disponivel: bool = brotli is not None) -> Optional[str]:
+    """Escolhe "br" ou "gzip" a partir do Accept-Encoding, respeitando q=0."""
+    aceitas = {}
+    for parte in accept_encoding.lower().split(","):
+        nome, _, parametros = parte.strip().partition(";")
+        qualidade = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                qualidade = float(parametros[2:])
+            except ValueError:
+                qualidade = 0.0
+        aceitas[nome.strip()] = qualidade
+
+    candidatas = [c for c in ("br", "gzip") if c != "br" or brotli_disponivel]
+    curinga = aceitas.get("*", 0.0)
+    melhor, melhor_q = None, 0.0
+    for codificacao in candidatas:
+        qualidade = aceitas.get(codificacao, curinga)
+        if qualidade > melhor_q:
+            melhor, melhor_q = codificacao, qualidade
+    return melhor
+
+
+class _Compressor:
+    """Interface única para gzip (zlib) e brotli em modo streaming."""
+
+    def __init__(self, codificacao: str, gzip_level: int, brotli_quality: int):
+        self.codificacao = codificacao
+        if codificacao == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        if self.codificacao == "br":
+            return self._br.process(dados) + self._br.flush()
+        return self._zlib.compress(dados) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self, dados: bytes = b"") -> bytes:
+        if self.codificacao == "br":
+            return self._br.process(dados) + self._br.finish()
+        return self._zlib.compress(dados) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+        tipos: tuple = TIPOS_COMPRIMIVEIS,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.tipos = tipos
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacao = negociar_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, codificacao, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """
+    Segura o http.response.start até ver o primeiro pedaço do corpo: só então
+    decide se comprime (tipo permitido, sem Content-Encoding, tamanho mínimo
+    ou streaming) e ajusta os cabeçalhos.
+    """
+
+    def __init__(self, config: CompressionMiddleware, codificacao: str, send: Send):
+        self.config = config
+        self.codificacao = codificacao
+        self.send = send
+        self.inicio: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.decidido = False
+
+    def _elegivel(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        tipo = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return tipo in self.config.tipos
+
+    async def __call__(self, message: Message):
+        tipo_mensagem = message["type"]
+        if tipo_mensagem == "http.response.start":
+            self.inicio = message
+            return
+        if tipo_mensagem != "http.response.body":
+            await self.send(message)
+            return
+
+        corpo = message.get("body", b"")
+        mais = message.get("more_body", False)
+
+        if not self.decidido:
+            self.decidido = True
+            headers = MutableHeaders(raw=self.inicio["headers"])
+            if self._elegivel(headers):
+                headers.add_vary_header("Accept-Encoding")
+                # Resposta completa e pequena: envia como está
+                if mais or len(corpo) >= self.config.minimum_size:
+                    self.compressor = _Compressor(
+                        self.codificacao, self.config.gzip_level, self.config.brotli_quality
+                    )
+                    headers["Content-Encoding"] = self.codificacao
+                    del headers["Content-Length"]
+                    if not mais:
+                        corpo = self.compressor.finalizar(corpo)
+                        headers["Content-Length"] = str(len(corpo))
+                        await self.send(self.inicio)
+                        await self.send({"type": "http.response.body", "body": corpo})
+                        return
+            await self.send(self.inicio)
+
+        if self.compressor is None:
+            await self.send(message)
+            return
+
+        if mais:
+            dados = self.compressor.comprimir(corpo) if corpo else b""
+        else:
+            dados = self.compressor.finalizar(corpo)
+        if dados or not mais:
+            await self.send({"type": "http.response.body", "body": dados, "more_body": mais})
@@ -1,36 +1,189 @@
 # app/database.py
+#
+# Configuração do banco de dados. DATABASE_URL aceita:
+# - PostgreSQL (postgres://, postgresql:// ou postgresql+asyncpg://), com o
+#   driver asyncpg;
+# - SQLite em arquivo (sqlite:///caminho.db) ou em memória (sqlite:///:memory:),
+#   com o driver aiosqlite.
+# DATABASE_URL é obrigatória: o SQLite em memória descartável só é usado
+# quando pedido explicitamente (DATABASE_URL=sqlite+aiosqlite://), como fazem
+# os benchmarks.
+#
+# Modo efêmero (testes e benchmarks): o esquema é criado a partir de
+# SQLModel.metadata em vez das migrações do Alembic e descartado no fim.
+# - SQLite em memória é sempre efêmero (todas as sessões compartilham a
+#   mesma conexão, que some quando o processo termina);
+# - com DATABASE_EPHEMERAL=1 em um PostgreSQL, as tabelas são criadas em um
+#   schema próprio (apf_teste_<id>) e o schema inteiro é apagado no fim.
+# DATABASE_FIXTURES=1 popula o banco efêmero com app.fixtures na inicialização.
 
 import os
-from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import SQLModel, create_engine
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy.orm import sessionmaker
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from dotenv import load_dotenv
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
 
-# Pega a URL do banco de dados a partir das variáveis de ambiente
+SQLITE_MEMORIA = "sqlite+aiosqlite:///:memory:"
+# Driver assíncrono usado para cada banco quando a URL não especifica um
+DRIVERS_ASYNC = {"postgres": "postgresql+asyncpg", "postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def normalizar_url(url: str) -> str:
+    """Troca o driver síncrono padrão da URL pelo driver assíncrono do mesmo banco."""
+    esquema, separador, resto = url.partition("://")
+    if not separador:
+        raise ValueError(f"DATABASE_URL inválida: {url!r}")
+    return f"{DRIVERS_ASYNC.get(esquema, esquema)}://{resto}"
+
+
+def sqlite_em_memoria(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _ativar_chaves_estrangeiras(dbapi_connection, connection_record):
+    # O SQLite só valida as chaves estrangeiras com o pragma ligado em cada conexão
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def criar_engine(url: str, esquema: Optional[str] = None, **opcoes) -> AsyncEngine:
+    """
+    Cria o engine assíncrono para a URL (já normalizada). Com `esquema`, as
+    conexões do PostgreSQL usam esse schema no search_path.
+    Os comandos SQL são cronometrados e agregados por app.sql_instrumentation
+    (consultas lentas vão para o log); SQL_ECHO=1 volta a imprimir todos.
+    """
+    opcoes.setdefault("echo", os.getenv("SQL_ECHO") == "1")
+    backend = make_url(url).get_backend_name()
+
+    if backend == "sqlite":
+        opcoes.setdefault("connect_args", {"check_same_thread": False})
+        if sqlite_em_memoria(url):
+            # Uma única conexão compartilhada: cada conexão nova seria um banco vazio
+            opcoes.setdefault("poolclass", StaticPool)
+    else:
+        # Conexões mantidas abertas (e aquecidas na inicialização por app.warmup)
+        opcoes.setdefault("pool_size", int(os.getenv("DB_POOL_SIZE", "5")))
+        opcoes.setdefault("max_overflow", int(os.getenv("DB_MAX_OVERFLOW", "10")))
+        if esquema:
+            opcoes.setdefault("connect_args", {"server_settings": {"search_path": esquema}})
+
+    engine = create_async_engine(url, **opcoes)
+    if backend == "sqlite":
+        event.listen(engine.sync_engine, "connect", _ativar_chaves_estrangeiras)
+    return engine
+
+
+async def criar_esquema(engine: AsyncEngine, esquema: Optional[str] = None):
+    """Cria as tabelas a partir de SQLModel.metadata (e o schema, se informado)."""
+    # Garante que todos os modelos estejam registrados no metadata
+    from app import models  # noqa: F401
+
+    async with engine.begin() as conn:
+        if esquema:
+            await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{esquema}"'))
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+async def descartar_esquema(engine: AsyncEngine, esquema: Optional[str] = None):
+    """Apaga o schema efêmero do PostgreSQL ou as tabelas criadas por criar_esquema."""
+    async with engine.begin() as conn:
+        if esquema:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS "{esquema}" CASCADE'))
+        else:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+
+
+@asynccontextmanager
+async def banco_efemero(url: str = SQLITE_MEMORIA, fixtures: bool = False):
+    """
+    Engine com um esquema descartável, para testes e benchmarks:
+
+        async with banco_efemero() as engine:
+            async with AsyncSession(engine) as session: ...
+
+    Em PostgreSQL, as tabelas ficam em um schema exclusivo, apagado na saída
+    (vários testes podem rodar em paralelo no mesmo banco).
+    """
+    url = normalizar_url(url)
+    esquema = None
+    if make_url(url).get_backend_name() == "postgresql":
+        esquema = f"apf_teste_{uuid.uuid4().hex[:12]}"
+    engine = criar_engine(url, esquema=esquema)
+    try:
+        await criar_esquema(engine, esquema)
+        if fixtures:
+            from app.fixtures import semear_fixtures
+
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                await semear_fixtures(session)
+        yield engine
+    finally:
+        if esquema or not sqlite_em_memoria(url):
+            await descartar_esquema(engine, esquema)
+        await engine.dispose()
+
+
+# --- Engine da aplicação ---
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 # Verifica se a URL do banco de dados foi definida
 if not DATABASE_URL:
     raise ValueError("A variável de ambiente DATABASE_URL não foi definida!")
 
-# Modificamos a string de conexão para usar o driver asyncpg
-async_database_url = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+async_database_url = normalizar_url(DATABASE_URL)
+# Schema exclusivo deste processo quando DATABASE_EPHEMERAL=1 em PostgreSQL
+ESQUEMA_EFEMERO = (
+    f"apf_teste_{uuid.uuid4().hex[:12]}"
+    if os.getenv("DATABASE_EPHEMERAL") == "1" and make_url(async_database_url).get_backend_name() == "postgresql"
+    else None
+)
+# Banco efêmero: o esquema é criado na inicialização da aplicação (e apagado no fim)
+EFEMERO = ESQUEMA_EFEMERO is not None or sqlite_em_memoria(async_database_url)
+if sqlite_em_memoria(async_database_url):
+    logger.warning("DATABASE_URL aponta para um SQLite em memória: os dados somem quando o processo termina.")
+SEMEAR_FIXTURES = os.getenv("DATABASE_FIXTURES") == "1"
+
+async_engine = criar_engine(async_database_url, esquema=ESQUEMA_EFEMERO)
+# Fábrica de sessões criada uma vez (não a cada requisição)
+async_session = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def iniciar_banco_efemero():
+    """Cria o esquema do banco efêmero da aplicação (e o popula, se configurado)."""
+    if not EFEMERO:
+        return
+    await criar_esquema(async_engine, ESQUEMA_EFEMERO)
+    if SEMEAR_FIXTURES:
+        from app.fixtures import semear_fixtures
+
+        async with async_session() as session:
+            await semear_fixtures(session)
+    logger.info("Banco efêmero pronto ({}).", ESQUEMA_EFEMERO or "SQLite em memória")
+
 
-# Criamos o "motor" assíncrono.
-# O `echo=True` continua útil para ver as queries SQL durante o desenvolvimento.
-async_engine = create_async_engine(async_database_url, echo=True, future=True)
+async def encerrar_banco_efemero():
+    if ESQUEMA_EFEMERO:
+        await descartar_esquema(async_engine, ESQUEMA_EFEMERO)
 
 
 async def get_session() -> AsyncSession:
     """
     Função de dependência que cria e fornece uma sessão de banco de dados por requisição.
     """
-    async_session = sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
     async with async_session() as session:
-        yield session
\ No newline at end of file
+        yield session
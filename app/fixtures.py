@@ -0,0 +1,139 @@
+# app/fixtures.py
+#
+# Dados de exemplo para bancos efêmeros (testes, benchmarks e DATABASE_FIXTURES=1):
+# um conjunto pequeno e determinístico de fatores de ajuste, clientes,
+# projetos, sistemas, contagens e funções, com os PFs calculados pelo
+# serviço de cálculo.
+
+from datetime import datetime, timedelta
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import (
+    Cliente,
+    Contagem,
+    FatorAjuste,
+    Funcao,
+    MetodoContagemEnum,
+    Projeto,
+    Sistema,
+    TipoAjuste,
+    TipoContagemEnum,
+    TipoFuncaoEnum,
+)
+from app.services import calculation
+
+FATORES_PADRAO = {
+    "Inclusão": 1.0,
+    "Alteração": 0.75,
+    "Exclusão": 0.4,
+    "Alteração - Redocumentação": 0.25,
+    "Manutenção Cosmética": 0.2,
+    "Migração de Dados": 0.5,
+}
+# (tipo, qtd_der, qtd_rlr) das funções criadas em cada contagem
+FUNCOES_MODELO = (
+    (TipoFuncaoEnum.ALI, 12, 2),
+    (TipoFuncaoEnum.AIE, 25, 1),
+    (TipoFuncaoEnum.EE, 8, 2),
+    (TipoFuncaoEnum.CE, 5, 1),
+    (TipoFuncaoEnum.SE, 14, 3),
+    (TipoFuncaoEnum.INM, 3, 0),
+)
+
+
+async def semear_fixtures(
+    session: AsyncSession,
+    clientes: int = 3,
+    projetos_por_cliente: int = 2,
+    sistemas_por_projeto: int = 2,
+    contagens_por_projeto: int = 3,
+) -> dict:
+    """
+    Popula o banco e retorna os ids criados por tabela, por exemplo
+    {"clientes": [1, 2, 3], "contagens": [...], ...}.
+    """
+    fatores = [
+        FatorAjuste(nome=nome, fator=fator, tipo_ajuste=TipoAjuste.PERCENTUAL)
+        for nome, fator in FATORES_PADRAO.items()
+    ]
+    session.add_all(fatores)
+
+    lista_clientes = [Cliente(nome=f"Cliente {n}") for n in range(1, clientes + 1)]
+    session.add_all(lista_clientes)
+    await session.flush()
+
+    lista_projetos = [
+        Projeto(nome=f"Projeto {cliente.id}.{n}", cliente_id=cliente.id)
+        for cliente in lista_clientes
+        for n in range(1, projetos_por_cliente + 1)
+    ]
+    session.add_all(lista_projetos)
+    await session.flush()
+
+    lista_sistemas = [
+        Sistema(nome=f"Sistema {projeto.id}.{n}", projeto_id=projeto.id)
+        for projeto in lista_projetos
+        for n in range(1, sistemas_por_projeto + 1)
+    ]
+    session.add_all(lista_sistemas)
+    await session.flush()
+    sistemas_do_projeto = {}
+    for sistema in lista_sistemas:
+        sistemas_do_projeto.setdefault(sistema.projeto_id, []).append(sistema)
+
+    tipos_contagem = list(TipoContagemEnum)
+    metodos = list(MetodoContagemEnum)
+    lista_contagens = []
+    for projeto in lista_projetos:
+        for n in range(contagens_por_projeto):
+            sistemas = sistemas_do_projeto.get(projeto.id, [])
+            lista_contagens.append(Contagem(
+                descricao=f"Contagem {projeto.nome} #{n + 1}",
+                tipo_contagem=tipos_contagem[n % len(tipos_contagem)],
+                metodo_contagem=metodos[n % len(metodos)],
+                data_criacao=datetime(2025, 1, 1) + timedelta(days=len(lista_contagens)),
+                responsavel="Fixtures",
+                cliente_id=projeto.cliente_id,
+                projeto_id=projeto.id,
+                sistema_id=sistemas[n % len(sistemas)].id if sistemas and n % 3 else None,
+            ))
+    session.add_all(lista_contagens)
+    await session.flush()
+
+    lista_funcoes = []
+    for contagem in lista_contagens:
+        for n, (tipo, qtd_der, qtd_rlr) in enumerate(FUNCOES_MODELO):
+            fator = fatores[(contagem.id + n) % len(fatores)]
+            calculada = calculation.calcular_pontos_de_funcao({
+                "tipo_funcao": tipo.value,
+                "qtd_der": qtd_der,
+                "qtd_rlr": qtd_rlr,
+                "fator_ajuste": fator.fator,
+            })
+            lista_funcoes.append(Funcao(
+                modulo=f"Módulo {n % 2 + 1}",
+                funcionalidade=f"Funcionalidade {n + 1}",
+                nome=f"{tipo.value} {n + 1} da contagem {contagem.id}",
+                tipo_funcao=tipo,
+                qtd_der=qtd_der,
+                qtd_rlr=qtd_rlr,
+                qtd_inm=qtd_der if tipo == TipoFuncaoEnum.INM else 0,
+                complexidade=calculada["complexidade"],
+                ponto_de_funcao_bruto=int(round(calculada["ponto_de_funcao_bruto"])),
+                ponto_de_funcao_liquido=calculada["ponto_de_funcao_liquido"],
+                contagem_id=contagem.id,
+                fator_ajuste_id=fator.id,
+                sistema_id=contagem.sistema_id,
+            ))
+    session.add_all(lista_funcoes)
+    await session.commit()
+
+    return {
+        "fatores_ajuste": [f.id for f in fatores],
+        "clientes": [c.id for c in lista_clientes],
+        "projetos": [p.id for p in lista_projetos],
+        "sistemas": [s.id for s in lista_sistemas],
+        "contagens": [c.id for c in lista_contagens],
+        "funcoes": [f.id for f in lista_funcoes],
+    }
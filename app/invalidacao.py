@@ -0,0 +1,39 @@
+# app/invalidacao.py
+#
+# Invalidação dos caches em memória derivados do banco. Cada cache registra as
+# tabelas de que depende; quem altera essas tabelas chama `invalidar` logo
+# depois do commit, no mesmo fluxo da requisição (ou da tarefa), para que
+# nenhuma leitura seguinte veja um valor anterior à alteração.
+#
+#     @ao_alterar("cliente", "projeto")
+#     def _limpar_lookup():
+#         _LOOKUP.clear()
+
+from typing import Callable, Dict, List
+
+from loguru import logger
+
+_ouvintes: Dict[str, List[Callable[[], None]]] = {}
+
+
+def ao_alterar(*tabelas: str):
+    """Decorador: registra a função para ser chamada quando alguma das tabelas mudar."""
+    def registrar(funcao: Callable[[], None]):
+        for tabela in tabelas:
+            _ouvintes.setdefault(tabela, []).append(funcao)
+        return funcao
+    return registrar
+
+
+def invalidar(*tabelas: str):
+    """Chama (uma vez cada) os caches registrados para as tabelas alteradas."""
+    chamadas = set()
+    for tabela in tabelas:
+        for funcao in _ouvintes.get(tabela, ()):
+            if funcao in chamadas:
+                continue
+            chamadas.add(funcao)
+            try:
+                funcao()
+            except Exception:
+                logger.exception("Falha ao invalidar o cache {}.", getattr(funcao, "__qualname__", funcao))
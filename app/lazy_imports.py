@@ -0,0 +1,41 @@
+# app/lazy_imports.py
+#
+# Importação sob demanda de dependências pesadas (pandas, numpy): o módulo só
+# é executado no primeiro acesso a um atributo. Assim, importar app.main (a
+# cada worker do uvicorn ou ciclo do --reload) não paga o custo do pandas,
+# que só as rotas de importação de planilhas usam.
+#
+# Uso (no lugar de "import pandas as pd"):
+#     pd = modulo_sob_demanda("pandas")
+# Anotações de tipo com esses módulos precisam de
+# "from __future__ import annotations" para não disparar a importação.
+
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+_trava = threading.Lock()
+
+
+def modulo_sob_demanda(nome: str) -> ModuleType:
+    """Retorna o módulo `nome`, adiando sua execução até o primeiro uso."""
+    with _trava:
+        modulo = sys.modules.get(nome)
+        if modulo is not None:
+            return modulo
+        spec = importlib.util.find_spec(nome)
+        if spec is None:
+            raise ModuleNotFoundError(f"Módulo {nome!r} não encontrado.", name=nome)
+        carregador = importlib.util.LazyLoader(spec.loader)
+        spec.loader = carregador
+        modulo = importlib.util.module_from_spec(spec)
+        sys.modules[nome] = modulo
+        carregador.exec_module(modulo)
+        return modulo
+
+
+def carregado(nome: str) -> bool:
+    """Indica se o módulo já foi de fato executado (não é só o proxy sob demanda)."""
+    modulo = sys.modules.get(nome)
+    return modulo is not None and not isinstance(modulo, importlib.util._LazyModule)
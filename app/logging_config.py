@@ -0,0 +1,134 @@
+# app/logging_config.py
+#
+# Configuração do loguru para não bloquear o event loop:
+# - os sinks usam enqueue=True: a escrita em disco/terminal acontece em uma
+#   thread de fundo, a requisição só coloca a mensagem na fila;
+# - o arquivo (logs/app.log) recebe uma linha JSON por evento, com o
+#   request_id da requisição que o gerou;
+# - eventos de níveis muito frequentes (DEBUG/TRACE) podem ser amostrados
+#   por nível (LOG_SAMPLE_DEBUG=0.1 mantém ~10% deles).
+#
+# Chamadas como logger.debug("... {}", valor) não formatam nada quando
+# nenhum sink aceita o nível; para argumentos caros use
+# logger.opt(lazy=True).debug("... {}", lambda: calculo()).
+
+import os
+import random
+import sys
+import traceback
+import uuid
+from contextvars import ContextVar
+
+import orjson
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FILE_LEVEL = os.getenv("LOG_FILE_LEVEL", "DEBUG")
+# Fração dos eventos mantida por nível (1.0 = todos)
+LOG_SAMPLING = {
+    "TRACE": float(os.getenv("LOG_SAMPLE_TRACE", "1.0")),
+    "DEBUG": float(os.getenv("LOG_SAMPLE_DEBUG", "1.0")),
+}
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+def _adicionar_request_id(record):
+    record["extra"].setdefault("request_id", _request_id.get())
+
+
+def _amostrar(record) -> bool:
+    taxa = LOG_SAMPLING.get(record["level"].name, 1.0)
+    return taxa >= 1.0 or random.random() < taxa
+
+
+def _formatar_json(record) -> str:
+    evento = {
+        "ts": record["time"].isoformat(),
+        "level": record["level"].name,
+        "request_id": record["extra"].get("request_id", "-"),
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    extras = {k: v for k, v in record["extra"].items() if k not in ("request_id", "_json")}
+    if extras:
+        evento["extra"] = extras
+    if record["exception"] is not None:
+        evento["exception"] = "".join(_formatar_excecao(record["exception"]))
+    record["extra"]["_json"] = orjson.dumps(evento, default=str).decode()
+    return "{extra[_json]}\n"
+
+
+def _formatar_excecao(excecao) -> list:
+    return traceback.format_exception(excecao.type, excecao.value, excecao.traceback)
+
+
+FORMATO_TERMINAL = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "{extra[request_id]} | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
+)
+
+
+def configurar_logging():
+    """Substitui os sinks padrão do loguru pelos sinks enfileirados da aplicação."""
+    logger.remove()
+    logger.configure(patcher=_adicionar_request_id)
+    # diagnose=False: os tracebacks não incluem os valores das variáveis locais
+    logger.add(
+        sys.stderr,
+        level=LOG_LEVEL,
+        format=FORMATO_TERMINAL,
+        filter=_amostrar,
+        enqueue=True,
+        diagnose=False,
+    )
+    logger.add(
+        LOG_FILE,
+        level=LOG_FILE_LEVEL,
+        format=_formatar_json,
+        filter=_amostrar,
+        rotation="500 MB",
+        retention="10 days",
+        enqueue=True,
+        diagnose=False,
+    )
+
+
+class RequestIdMiddleware:
+    """
+    Define o request_id de cada requisição (reaproveita o X-Request-ID
+    recebido, se houver) e devolve o mesmo valor no cabeçalho da resposta.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for nome, valor in scope["headers"]:
+            if nome == b"x-request-id":
+                request_id = valor.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+
+        async def send_com_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_com_id)
+        finally:
+            _request_id.reset(token)
@@ -1,9 +1,10 @@
 # app/main.py
 
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import ORJSONResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 from loguru import logger
 
 # Importa os roteadores da API e das páginas
@@ -15,27 +16,80 @@ from app.routers import (
     contagens,
     fatores_ajuste,
     funcoes,
+    metrics,
+    admin,
+    health,
+    exclusoes,
+    lookup,
 )
+from app.templating import templates, precompilar_templates
+from app.assets import PrecompressedStaticFiles, preparar_assets
+from app.compression import CompressionMiddleware
+from app.database import async_engine, encerrar_banco_efemero, iniciar_banco_efemero
+from app.metrics import MetricsMiddleware
+from app.sql_instrumentation import SQLInstrumentationMiddleware, instrumentar_sql
+from app.logging_config import RequestIdMiddleware, configurar_logging
+from app.warmup import aquecer
+
+# Logs em JSON (logs/app.log) gravados por uma thread de fundo, com request_id
+configurar_logging()
 
-# ... (configuração do logger) ...
-logger.add("logs/app.log", rotation="500 MB", retention="10 days", level="DEBUG")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    inicio = time.perf_counter()
+    logger.info("Iniciando a aplicação...")
+    # /health/ready responde 503 até o fim do aquecimento
+    app.state.pronto = False
+    # Sem efeito com um banco persistente (o esquema vem das migrações)
+    await iniciar_banco_efemero()
+    total = precompilar_templates()
+    logger.info("{} templates pré-compilados.", total)
+    assets = preparar_assets()
+    logger.info("{} assets estáticos com hash disponíveis.", len(assets))
+    app.state.aquecimento = await aquecer(app, async_engine)
+    app.state.pronto = True
+    logger.info(
+        "Aplicação pronta em {:.0f} ms (aquecimento: {}).",
+        (time.perf_counter() - inicio) * 1000, app.state.aquecimento,
+    )
+
+    yield
+
+    logger.info("Encerrando a aplicação...")
+    app.state.pronto = False
+    await encerrar_banco_efemero()
+    # Espera a thread de escrita esvaziar a fila de logs
+    await logger.complete()
 
 
 app = FastAPI(
     title="Sistema de Gerenciamento de Contagens de Pontos de Função",
     version="0.1.0",
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+# Compressão gzip/brotli das respostas JSON e HTML (inclusive em streaming)
+app.add_middleware(CompressionMiddleware)
+# Agrupa os comandos SQL de cada requisição (detecção de N+1)
+app.add_middleware(SQLInstrumentationMiddleware)
+# Métricas Prometheus (/metrics); adicionado por último para ficar por fora e
+# medir a latência completa e o tamanho das respostas já comprimidas
+app.add_middleware(MetricsMiddleware)
+# Mais externo: o request_id vale para tudo que for registrado na requisição
+app.add_middleware(RequestIdMiddleware)
+instrumentar_sql(async_engine.sync_engine)
+
 # --- CONFIGURAÇÃO DO FRONT-END ---
 # Aponta para a pasta onde os templates HTML estão localizados
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+# Arquivos com hash em /static/dist/ saem pré-comprimidos (.br/.gz) e com cache imutável
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+# Ambiente de templates único, também acessível pelas rotas via request.app.state
+app.state.templates = templates
 # ---------------------------------
 
 # Inclui os roteadores na aplicação principal
-app.include_router(clientes.router, prefix="/api")
-app.include_router(fatores_ajuste.router, prefix="/api")
 app.include_router(pages.router)
 app.include_router(clientes.router, prefix="/api")
 app.include_router(fatores_ajuste.router, prefix="/api")
@@ -43,14 +97,11 @@ app.include_router(projetos.router, prefix="/api")
 app.include_router(sistemas.router, prefix="/api")
 app.include_router(contagens.router, prefix="/api")
 app.include_router(funcoes.router, prefix="/api")
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Iniciando a aplicação...")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Encerrando a aplicação...")
+app.include_router(admin.router, prefix="/api")
+app.include_router(exclusoes.router, prefix="/api")
+app.include_router(lookup.router, prefix="/api")
+app.include_router(metrics.router)
+app.include_router(health.router)
 
 # A rota raiz agora vai redirecionar para a nossa página de clientes
 @app.get("/", tags=["Root"], response_class=HTMLResponse, include_in_schema=False)
@@ -0,0 +1,206 @@
+# app/metrics.py
+#
+# Métricas das requisições no formato de texto do Prometheus (exposto em
+# /metrics por app/routers/metrics.py): contagem por rota e status, histograma
+# de latência, requisições em andamento, tamanho das respostas e tempo gasto
+# no banco por requisição (medido pelos eventos de cursor registrados em
+# app.sql_instrumentation, que chamam registrar_comando_banco).
+#
+# As rotas são identificadas pelo caminho "templado" (/api/contagens/{contagem_id}),
+# nunca pelo caminho real, para manter a cardinalidade fixa. Cada rota ganha
+# um conjunto pré-alocado de contadores na primeira requisição; depois disso
+# registrar uma requisição só incrementa posições de listas.
+#
+# Os valores são por processo: com vários workers do uvicorn, cada um expõe
+# os próprios contadores.
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCIA_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TAMANHO_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+ROTA_DESCONHECIDA = "__nao_encontrada__"
+
+# Medição da requisição em andamento (acumula o tempo de banco)
+_medicao_requisicao: ContextVar[Optional["_Medicao"]] = ContextVar("medicao_requisicao", default=None)
+
+
+def _linhas_histograma(nome: str, rotulos: str, buckets: tuple, contagens: list, soma: float, total: int) -> list:
+    saida = []
+    acumulado = 0
+    for limite, quantidade in zip(buckets, contagens):
+        acumulado += quantidade
+        saida.append(f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+    saida.append(f'{nome}_bucket{{{rotulos},le="+Inf"}} {total}')
+    saida.append(f"{nome}_sum{{{rotulos}}} {soma}")
+    saida.append(f"{nome}_count{{{rotulos}}} {total}")
+    return saida
+
+
+class _SerieRota:
+    """
+    Contadores de uma combinação (método, rota). Os histogramas guardam uma
+    posição por bucket + uma para valores acima do último (+Inf), sem acumular;
+    o acumulado é calculado só na exportação.
+    """
+
+    __slots__ = ("status", "latencia", "tamanho", "db_tempo", "somas")
+
+    def __init__(self):
+        self.status = {}
+        self.latencia = [0] * (len(LATENCIA_BUCKETS) + 1)
+        self.tamanho = [0] * (len(TAMANHO_BUCKETS) + 1)
+        self.db_tempo = [0] * (len(LATENCIA_BUCKETS) + 1)
+        # [requisições, soma latência, soma bytes, soma tempo de banco, consultas]
+        self.somas = [0, 0.0, 0, 0.0, 0]
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self.series = {}
+        self.em_andamento = 0
+
+    def observar(
+        self, metodo: str, rota: str, status: int, duracao: float, tamanho: int, db_tempo: float, db_consultas: int
+    ):
+        serie = self.series.get((metodo, rota))
+        if serie is None:
+            serie = self.series[(metodo, rota)] = _SerieRota()
+        contagem_status = serie.status
+        contagem_status[status] = contagem_status.get(status, 0) + 1
+        serie.latencia[bisect_left(LATENCIA_BUCKETS, duracao)] += 1
+        serie.tamanho[bisect_left(TAMANHO_BUCKETS, tamanho)] += 1
+        serie.db_tempo[bisect_left(LATENCIA_BUCKETS, db_tempo)] += 1
+        somas = serie.somas
+        somas[0] += 1
+        somas[1] += duracao
+        somas[2] += tamanho
+        somas[3] += db_tempo
+        somas[4] += db_consultas
+
+    def exportar(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        requisicoes = [
+            "# HELP apf_http_requests_total Requisições HTTP por método, rota e status.",
+            "# TYPE apf_http_requests_total counter",
+        ]
+        latencia = [
+            "# HELP apf_http_request_duration_seconds Latência das requisições HTTP.",
+            "# TYPE apf_http_request_duration_seconds histogram",
+        ]
+        tamanho = [
+            "# HELP apf_http_response_size_bytes Tamanho do corpo das respostas (como enviado).",
+            "# TYPE apf_http_response_size_bytes histogram",
+        ]
+        db_tempo = [
+            "# HELP apf_db_duration_seconds Tempo gasto no banco por requisição.",
+            "# TYPE apf_db_duration_seconds histogram",
+        ]
+        db_consultas = [
+            "# HELP apf_db_queries_total Comandos SQL executados, por rota.",
+            "# TYPE apf_db_queries_total counter",
+        ]
+        for (metodo, rota), serie in list(self.series.items()):
+            rotulos = f'method="{metodo}",route="{_escapar(rota)}"'
+            total, soma_latencia, soma_tamanho, soma_db, consultas = serie.somas
+            for status, quantidade in list(serie.status.items()):
+                requisicoes.append(f'apf_http_requests_total{{{rotulos},status="{status}"}} {quantidade}')
+            latencia.extend(_linhas_histograma(
+                "apf_http_request_duration_seconds", rotulos, LATENCIA_BUCKETS, serie.latencia, soma_latencia, total
+            ))
+            tamanho.extend(_linhas_histograma(
+                "apf_http_response_size_bytes", rotulos, TAMANHO_BUCKETS, serie.tamanho, soma_tamanho, total
+            ))
+            db_tempo.extend(_linhas_histograma(
+                "apf_db_duration_seconds", rotulos, LATENCIA_BUCKETS, serie.db_tempo, soma_db, total
+            ))
+            db_consultas.append(f"apf_db_queries_total{{{rotulos}}} {consultas}")
+
+        em_andamento = [
+            "# HELP apf_http_requests_in_flight Requisições HTTP em andamento.",
+            "# TYPE apf_http_requests_in_flight gauge",
+            f"apf_http_requests_in_flight {self.em_andamento}",
+        ]
+        return "\n".join(requisicoes + latencia + tamanho + db_tempo + db_consultas + em_andamento) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"')
+
+
+REGISTRO = RegistroMetricas()
+
+
+def rota_templada(scope: Scope) -> str:
+    """Caminho declarado da rota que atendeu a requisição (ou do Mount, como /static)."""
+    rota = scope.get("route")
+    if rota is not None:
+        return rota.path
+    if "endpoint" in scope:
+        return f"{scope.get('root_path', '')}/{{path}}"
+    return ROTA_DESCONHECIDA
+
+
+class _Medicao:
+    """
+    Estado de uma requisição: é o próprio `send` repassado à aplicação, então
+    cada requisição aloca só este objeto (sem closure nem listas).
+    """
+
+    __slots__ = ("send", "status", "tamanho", "db_tempo", "db_consultas")
+
+    def __init__(self, send: Send):
+        self.send = send
+        self.status = 500
+        self.tamanho = 0
+        self.db_tempo = 0.0
+        self.db_consultas = 0
+
+    async def __call__(self, message: Message):
+        tipo = message["type"]
+        if tipo == "http.response.body":
+            self.tamanho += len(message.get("body", b""))
+        elif tipo == "http.response.start":
+            self.status = message["status"]
+        await self.send(message)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, registro: RegistroMetricas = REGISTRO):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registro = self.registro
+        medicao = _Medicao(send)
+        registro.em_andamento += 1
+        token = _medicao_requisicao.set(medicao)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, medicao)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _medicao_requisicao.reset(token)
+            registro.em_andamento -= 1
+            registro.observar(
+                scope["method"], rota_templada(scope), medicao.status, duracao, medicao.tamanho,
+                medicao.db_tempo, medicao.db_consultas,
+            )
+
+
+# --- Tempo de banco ---
+
+def registrar_comando_banco(duracao: float):
+    """Soma um comando SQL (já cronometrado) ao tempo de banco da requisição em andamento."""
+    medicao = _medicao_requisicao.get()
+    if medicao is not None:
+        medicao.db_tempo += duracao
+        medicao.db_consultas += 1
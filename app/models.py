@@ -5,6 +5,7 @@ from typing import Optional, List
 from datetime import datetime
 from sqlmodel import Field, SQLModel, Relationship
 from sqlalchemy import (
+    DDL,
     Column,
     Integer,
     String,
@@ -12,7 +13,8 @@ from sqlalchemy import (
     Date,
     Numeric,
     Text,
-    DateTime
+    DateTime,
+    event,
 )
 
 
@@ -44,8 +46,9 @@ class Cliente(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     nome: str = Field(index=True, max_length=100)
     
-    projetos: List["Projeto"] = Relationship(back_populates="cliente")
-    contagens: List["Contagem"] = Relationship(back_populates="cliente")
+    # As exclusões em cascata ficam no banco (ON DELETE); veja app/services/exclusao.py
+    projetos: List["Projeto"] = Relationship(back_populates="cliente", sa_relationship_kwargs={"passive_deletes": True})
+    contagens: List["Contagem"] = Relationship(back_populates="cliente", sa_relationship_kwargs={"passive_deletes": True})
 
 
 class FatorAjuste(SQLModel, table=True):
@@ -61,11 +64,13 @@ class Projeto(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     nome: str = Field(index=True, max_length=100)
     
-    cliente_id: int = Field(foreign_key="cliente.id")
+    cliente_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("cliente.id", ondelete="CASCADE"), nullable=False, index=True)
+    )
     cliente: Cliente = Relationship(back_populates="projetos")
     
-    contagens: List["Contagem"] = Relationship(back_populates="projeto") 
-    sistemas: List["Sistema"] = Relationship(back_populates="projeto")
+    contagens: List["Contagem"] = Relationship(back_populates="projeto", sa_relationship_kwargs={"passive_deletes": True})
+    sistemas: List["Sistema"] = Relationship(back_populates="projeto", sa_relationship_kwargs={"passive_deletes": True})
 
 class Contagem(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -79,15 +84,21 @@ class Contagem(SQLModel, table=True):
 
     responsavel: str = Field(max_length=100)
     
-    cliente_id: int = Field(foreign_key="cliente.id")
+    cliente_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("cliente.id", ondelete="CASCADE"), nullable=False, index=True)
+    )
     cliente: Cliente = Relationship(back_populates="contagens")
     
-    projeto_id: int = Field(foreign_key="projeto.id")
+    projeto_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("projeto.id", ondelete="CASCADE"), nullable=False, index=True)
+    )
     projeto: "Projeto" = Relationship(back_populates="contagens")
-    sistema_id: Optional[int] = Field(default=None, foreign_key="sistema.id")
+    sistema_id: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, ForeignKey("sistema.id", ondelete="SET NULL"), index=True)
+    )
     sistema: Optional["Sistema"] = Relationship(back_populates="contagens") 
     
-    funcoes: List["Funcao"] = Relationship(back_populates="contagem")
+    funcoes: List["Funcao"] = Relationship(back_populates="contagem", sa_relationship_kwargs={"passive_deletes": True})
 
 
 class Funcao(SQLModel, table=True):
@@ -108,19 +119,47 @@ class Funcao(SQLModel, table=True):
     ponto_de_funcao_bruto: Optional[int] = Field(default=None)
     ponto_de_funcao_liquido: Optional[float] = Field(default=None)
     
-    contagem_id: int = Field(foreign_key="contagem.id")
+    contagem_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("contagem.id", ondelete="CASCADE"), nullable=False, index=True)
+    )
     contagem: Contagem = Relationship(back_populates="funcoes")
     
     fator_ajuste_id: int = Field(foreign_key="fatorajuste.id")
     fator_ajuste: FatorAjuste = Relationship(back_populates="funcoes")
-    sistema_id: Optional[int] = Field(default=None, foreign_key="sistema.id")
+    sistema_id: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, ForeignKey("sistema.id", ondelete="SET NULL"), index=True)
+    )
     sistema: Optional["Sistema"] = Relationship(back_populates="funcoes")
 
+
+# Busca textual (app.services.busca): coluna gerada `busca` (tsvector em
+# português, com pesos) e índice GIN, só no PostgreSQL. Fica fora do modelo
+# para o SQLite continuar criando a tabela; em bancos existentes vem da
+# migração c41d8e2f7a60, aqui é criada junto com a tabela (create_all).
+BUSCA_FUNCAO_SQL = (
+    "setweight(to_tsvector('portuguese', coalesce(modulo, '') || ' ' || coalesce(funcionalidade, '') || ' ' || coalesce(nome, '')), 'A')"
+    " || setweight(to_tsvector('portuguese', coalesce(desc_der, '') || ' ' || coalesce(desc_rlr, '')), 'B')"
+    " || setweight(to_tsvector('portuguese', coalesce(insumos, '') || ' ' || coalesce(observacoes, '')), 'C')"
+)
+event.listen(
+    Funcao.__table__,
+    "after_create",
+    DDL(f"ALTER TABLE %(fullname)s ADD COLUMN busca tsvector GENERATED ALWAYS AS ({BUSCA_FUNCAO_SQL}) STORED")
+    .execute_if(dialect="postgresql"),
+)
+event.listen(
+    Funcao.__table__,
+    "after_create",
+    DDL("CREATE INDEX ix_funcao_busca ON %(fullname)s USING gin (busca)").execute_if(dialect="postgresql"),
+)
+
 class Sistema(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     nome: str = Field(index=True, max_length=100)
 
-    projeto_id: int = Field(foreign_key="projeto.id")
+    projeto_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("projeto.id", ondelete="CASCADE"), nullable=False, index=True)
+    )
     projeto: Projeto = Relationship(back_populates="sistemas")
-    contagens: List["Contagem"] = Relationship(back_populates="sistema")
-    funcoes: List["Funcao"] = Relationship(back_populates="sistema")
\ No newline at end of file
+    contagens: List["Contagem"] = Relationship(back_populates="sistema", sa_relationship_kwargs={"passive_deletes": True})
+    funcoes: List["Funcao"] = Relationship(back_populates="sistema", sa_relationship_kwargs={"passive_deletes": True})
\ No newline at end of file
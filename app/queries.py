@@ -0,0 +1,131 @@
+# app/queries.py
+#
+# Consultas somente leitura das listagens. Em vez de hidratar objetos SQLModel
+# e seus relacionamentos (um SELECT ... IN por relacionamento), cada consulta
+# projeta apenas as colunas do schema de resposta e traz as entidades
+# relacionadas no mesmo SELECT via JOIN. Os rótulos "relacao__campo" são
+# aninhados por `app.serialization.aninhar`.
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.models import Cliente, Contagem, Funcao, MetodoContagemEnum, Projeto, Sistema, TipoContagemEnum
+
+
+def _colunas(entidade, *nomes, prefixo: str = ""):
+    return [getattr(entidade, nome).label(f"{prefixo}{nome}") for nome in nomes]
+
+
+def select_contagens(
+    sort: Optional[str] = "-data_criacao",
+    cliente_id: Optional[int] = None,
+    projeto_id: Optional[int] = None,
+    descricao: Optional[str] = None,
+    tipo_contagem: Optional[TipoContagemEnum] = None,
+    metodo_contagem: Optional[MetodoContagemEnum] = None,
+):
+    """Listagem de contagens no formato de ContagemReadWithRelations."""
+    cliente = aliased(Cliente, name="c")
+    projeto = aliased(Projeto, name="p")
+    sistema = aliased(Sistema, name="s")
+
+    query = (
+        select(
+            *_colunas(
+                Contagem, "id", "descricao", "tipo_contagem", "metodo_contagem",
+                "data_criacao", "responsavel", "cliente_id", "projeto_id", "sistema_id",
+            ),
+            *_colunas(cliente, "id", "nome", prefixo="cliente__"),
+            *_colunas(projeto, "id", "nome", "cliente_id", prefixo="projeto__"),
+            *_colunas(sistema, "id", "nome", "projeto_id", prefixo="sistema__"),
+        )
+        .join(cliente, cliente.id == Contagem.cliente_id)
+        .join(projeto, projeto.id == Contagem.projeto_id)
+        .outerjoin(sistema, sistema.id == Contagem.sistema_id)
+    )
+
+    # Aplicação dos filtros
+    if cliente_id:
+        query = query.where(Contagem.cliente_id == cliente_id)
+    if projeto_id:
+        query = query.where(Contagem.projeto_id == projeto_id)
+    # Futuramente, adicionaremos o filtro de sistema aqui, após o relacionamento ser criado.
+    # if sistema_id:
+    #     query = query.where(Contagem.sistema_id == sistema_id) # Descomentar quando o modelo for atualizado
+    if descricao:
+        query = query.where(Contagem.descricao.ilike(f"%{descricao}%"))
+    if tipo_contagem:
+        query = query.where(Contagem.tipo_contagem == tipo_contagem)
+    if metodo_contagem:
+        query = query.where(Contagem.metodo_contagem == metodo_contagem)
+
+    # Lógica de Ordenação
+    if sort:
+        is_desc = sort.startswith("-")
+        column_name = sort[1:] if is_desc else sort
+        relacionadas = {"cliente": cliente.nome, "projeto": projeto.nome, "sistema": sistema.nome}
+
+        column = relacionadas.get(column_name)
+        if column is None and column_name in Contagem.__table__.c:
+            column = Contagem.__table__.c[column_name]
+        if column is not None:
+            query = query.order_by(column.desc() if is_desc else column.asc())
+
+    return query
+
+
+def select_sistemas(
+    nome_filter: Optional[str] = None,
+    projeto_id_filter: Optional[int] = None,
+):
+    """Listagem de sistemas no formato de SistemaReadWithProjeto."""
+    projeto = aliased(Projeto, name="p")
+    cliente = aliased(Cliente, name="c")
+
+    query = (
+        select(
+            *_colunas(Sistema, "id", "nome", "projeto_id"),
+            *_colunas(projeto, "id", "nome", "cliente_id", prefixo="projeto__"),
+            *_colunas(cliente, "id", "nome", prefixo="projeto__cliente__"),
+        )
+        .join(projeto, projeto.id == Sistema.projeto_id)
+        .join(cliente, cliente.id == projeto.cliente_id)
+    )
+
+    if nome_filter:
+        query = query.where(Sistema.nome.ilike(f"%{nome_filter}%"))
+    if projeto_id_filter:
+        query = query.where(Sistema.projeto_id == projeto_id_filter)
+
+    return query.order_by(Sistema.nome)
+
+
+def select_funcoes(
+    contagem_id: Optional[int] = None,
+    cliente_id: Optional[int] = None,
+    projeto_id: Optional[int] = None,
+    sistema_id: Optional[int] = None,
+    apos_id: Optional[int] = None,
+):
+    """
+    Todas as colunas das funções, ordenadas por id. `apos_id` continua uma
+    leitura interrompida (paginação por chave, sem OFFSET).
+    """
+    query = select(*Funcao.__table__.c)
+
+    if cliente_id or projeto_id:
+        query = query.join(Contagem, Contagem.id == Funcao.contagem_id)
+        if cliente_id:
+            query = query.where(Contagem.cliente_id == cliente_id)
+        if projeto_id:
+            query = query.where(Contagem.projeto_id == projeto_id)
+    if contagem_id:
+        query = query.where(Funcao.contagem_id == contagem_id)
+    if sistema_id:
+        query = query.where(Funcao.sistema_id == sistema_id)
+    if apos_id:
+        query = query.where(Funcao.id > apos_id)
+
+    return query.order_by(Funcao.id)
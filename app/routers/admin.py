@@ -0,0 +1,30 @@
+# app/routers/admin.py
+
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from app.serialization import FastORJSONResponse
+from app.sql_instrumentation import REGISTRO_SQL
+
+router = APIRouter(prefix="/admin", tags=["Administração"])
+
+
+@router.get("/sql-stats")
+async def read_sql_stats(
+    *,
+    sort: Literal["tempo_total_ms", "tempo_medio_ms", "tempo_max_ms", "chamadas", "lentas", "requisicoes_n_mais_um"] = "tempo_total_ms",
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    """
+    Estatísticas por impressão digital de SQL (comando normalizado) desde a
+    inicialização deste processo: chamadas, tempos, consultas lentas e
+    requisições sinalizadas como N+1.
+    """
+    return FastORJSONResponse(content=REGISTRO_SQL.relatorio(ordenar_por=sort, limite=limit))
+
+
+@router.delete("/sql-stats", status_code=204)
+async def reset_sql_stats():
+    """Zera as estatísticas acumuladas de SQL."""
+    REGISTRO_SQL.limpar()
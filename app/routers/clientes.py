@@ -2,12 +2,16 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.database import get_session
 from app.models import Cliente
 from app.schemas import ClienteCreate, ClienteRead, ClienteUpdate
+from app.serialization import resposta_lista
+from app.invalidacao import invalidar
+from app.services import exclusao
 
 # Cria um novo roteador com um prefixo e tags para organização na documentação
 router = APIRouter(prefix="/clientes", tags=["Clientes"])
@@ -26,6 +30,7 @@ async def create_cliente(
     
     session.add(db_cliente)
     await session.commit()
+    invalidar("cliente")
     await session.refresh(db_cliente)
     
     return db_cliente
@@ -61,7 +66,7 @@ async def read_clientes(
     result = await session.execute(query)
     clientes = result.scalars().all()
     
-    return clientes
+    return resposta_lista(clientes, ClienteRead)
 
 
 @router.get("/{cliente_id}", response_model=ClienteRead)
@@ -102,6 +107,7 @@ async def update_cliente(
         
     session.add(db_cliente)
     await session.commit()
+    invalidar("cliente")
     await session.refresh(db_cliente)
     
     return db_cliente
@@ -114,14 +120,16 @@ async def delete_cliente(
     cliente_id: int
 ):
     """
-    Deleta um cliente.
+    Deleta um cliente com seus projetos, sistemas, contagens e funções.
     """
     db_cliente = await session.get(Cliente, cliente_id)
     if not db_cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
-        
-    await session.delete(db_cliente)
-    await session.commit()
+
+    tarefa = await exclusao.excluir_ou_agendar(session, "cliente", cliente_id)
+    if tarefa:
+        # Exclusão grande: segue em segundo plano, com progresso em status_url
+        return ORJSONResponse(status_code=202, content=tarefa.para_dict())
     
     # Retorna uma resposta 204 No Content, que é o padrão para deletes bem-sucedidos
     return
\ No newline at end of file
@@ -4,13 +4,21 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import insert, literal
 from sqlalchemy.orm import selectinload
+from loguru import logger
 from fastapi import Form, Body, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse
 from datetime import datetime, date, time
 from app.database import get_session
-from app.models import Contagem, Cliente, Projeto, Sistema, TipoContagemEnum, MetodoContagemEnum, Funcao
-from app.schemas import ContagemReadWithRelations, ContagemRead, ContagemUpdate, ContagemCreate
+from app.models import Contagem, Projeto, TipoContagemEnum, MetodoContagemEnum, Funcao
+from app.schemas import ContagemReadWithRelations, ContagemRead, ContagemUpdate, ContagemCreate, ContagemClonar, SimulacaoContagem
+from app.serialization import FastORJSONResponse, aninhar, resposta_linhas
+from app.streaming import MEDIA_TYPE_NDJSON, resposta_ndjson
+from app import queries
+from app.services import exclusao, simulacao
+from app.services.comparacao import CategoriaComparacao, comparar
+from app.invalidacao import invalidar
 
 router = APIRouter(prefix="/contagens", tags=["Contagens"])
 
@@ -72,55 +80,43 @@ async def read_contagens(
 ):
     """
     Lista as contagens com filtros avançados e ordenação.
+    Consulta somente leitura: projeta as colunas da resposta com JOINs,
+    sem hidratar os objetos do ORM.
     """
-    query = (
-        select(Contagem)
-        .options(
-            selectinload(Contagem.projeto).selectinload(Projeto.cliente),
-            selectinload(Contagem.cliente),
-            selectinload(Contagem.sistema),
-        )
+    query = queries.select_contagens(
+        sort=sort,
+        cliente_id=cliente_id,
+        projeto_id=projeto_id,
+        descricao=descricao,
+        tipo_contagem=tipo_contagem,
+        metodo_contagem=metodo_contagem,
     )
-
-    # Aplicação dos filtros
-    if cliente_id:
-        query = query.where(Contagem.cliente_id == cliente_id)
-    if projeto_id:
-        query = query.where(Contagem.projeto_id == projeto_id)
-    # Futuramente, adicionaremos o filtro de sistema aqui, após o relacionamento ser criado.
-    # if sistema_id:
-    #     query = query.where(Contagem.sistema_id == sistema_id) # Descomentar quando o modelo for atualizado
-    if descricao:
-        query = query.where(Contagem.descricao.ilike(f"%{descricao}%"))
-    if tipo_contagem:
-        query = query.where(Contagem.tipo_contagem == tipo_contagem)
-    if metodo_contagem:
-        query = query.where(Contagem.metodo_contagem == metodo_contagem)
-
-    # Lógica de Ordenação
-    order_by_column = None
-    if sort:
-        is_desc = sort.startswith("-")
-        column_name = sort[1:] if is_desc else sort
-
-        if hasattr(Contagem, column_name):
-            column = getattr(Contagem, column_name)
-            order_by_column = column.desc() if is_desc else column.asc()
-        elif column_name == "cliente":
-            order_by_column = Cliente.nome.desc() if is_desc else Cliente.nome.asc()
-            query = query.join(Cliente)
-        elif column_name == "projeto":
-             order_by_column = Projeto.nome.desc() if is_desc else Projeto.nome.asc()
-             query = query.join(Projeto)
-
-
-    if order_by_column is not None:
-        query = query.order_by(order_by_column)
-
-
     result = await session.execute(query)
-    contagens = result.scalars().all()
-    return contagens
+    return resposta_linhas(result.all())
+
+@router.get("/stream", responses={200: {"content": {MEDIA_TYPE_NDJSON: {}}}})
+async def stream_contagens(
+    *,
+    sort: str = Query("-data_criacao"),
+    cliente_id: Optional[int] = Query(None),
+    projeto_id: Optional[int] = Query(None),
+    descricao: Optional[str] = Query(None),
+    tipo_contagem: Optional[TipoContagemEnum] = Query(None),
+    metodo_contagem: Optional[MetodoContagemEnum] = Query(None),
+):
+    """
+    Mesma listagem de read_contagens, em NDJSON (uma contagem por linha), lida
+    de um cursor do servidor: memória constante para qualquer volume.
+    """
+    query = queries.select_contagens(
+        sort=sort,
+        cliente_id=cliente_id,
+        projeto_id=projeto_id,
+        descricao=descricao,
+        tipo_contagem=tipo_contagem,
+        metodo_contagem=metodo_contagem,
+    )
+    return resposta_ndjson(query)
 
 @router.get("/{contagem_id}", response_model=ContagemReadWithRelations)
 async def read_contagem(*, session: AsyncSession = Depends(get_session), contagem_id: int):
@@ -183,6 +179,106 @@ async def update_contagem(
     await session.refresh(db_contagem)
     return db_contagem
 
+@router.post("/{contagem_id}/clonar", response_model=ContagemRead, status_code=201)
+async def clonar_contagem(
+    *,
+    session: AsyncSession = Depends(get_session),
+    contagem_id: int,
+    dados: Optional[ContagemClonar] = Body(default=None),
+):
+    """
+    Cria uma nova contagem a partir de outra (por exemplo, a Melhoria a partir
+    da baseline de Aplicação do sistema), copiando todas as funções, com a
+    complexidade e os PFs já calculados, em um único INSERT ... SELECT feito
+    no banco (as linhas não passam pelo Python).
+    """
+    origem = await session.get(Contagem, contagem_id)
+    if not origem:
+        raise HTTPException(status_code=404, detail="Contagem não encontrada")
+
+    dados = dados.model_dump(exclude_none=True) if dados else {}
+    dc = dados.get("data_criacao")
+    if isinstance(dc, date) and not isinstance(dc, datetime):
+        dados["data_criacao"] = datetime.combine(dc, time.min)
+
+    nova = Contagem(
+        descricao=dados.get("descricao", f"{origem.descricao} (cópia)"),
+        tipo_contagem=dados.get("tipo_contagem", origem.tipo_contagem),
+        metodo_contagem=origem.metodo_contagem,
+        responsavel=dados.get("responsavel", origem.responsavel),
+        cliente_id=origem.cliente_id,
+        projeto_id=origem.projeto_id,
+        sistema_id=dados.get("sistema_id", origem.sistema_id),
+    )
+    if "data_criacao" in dados:
+        nova.data_criacao = dados["data_criacao"]
+    session.add(nova)
+    # Gera o id da nova contagem, usado no SELECT abaixo
+    await session.flush()
+
+    tabela = Funcao.__table__
+    colunas = [c.name for c in tabela.columns if c.name not in ("id", "contagem_id")]
+    copia = insert(tabela).from_select(
+        [*colunas, "contagem_id"],
+        select(*(tabela.c[nome] for nome in colunas), literal(nova.id).label("contagem_id"))
+        .where(tabela.c.contagem_id == contagem_id)
+        .order_by(tabela.c.id),
+    )
+    resultado = await session.execute(copia)
+    await session.commit()
+    invalidar("contagem", "funcao")
+    logger.info("Contagem {} clonada em {} ({} funções).", contagem_id, nova.id, resultado.rowcount)
+    return nova
+
+@router.get("/{contagem_id}/comparar/{outra_id}")
+async def comparar_contagens(
+    *,
+    session: AsyncSession = Depends(get_session),
+    contagem_id: int,
+    outra_id: int,
+    categoria: Optional[List[CategoriaComparacao]] = Query(None),
+    pagina: int = Query(1, ge=1),
+    tamanho: int = Query(100, ge=1, le=1000),
+):
+    """
+    Compara a contagem (baseline) com outra (nova), classificando as funções
+    em incluídas, alteradas, excluídas e inalteradas. Retorna os totais de
+    funções e PFs por categoria e uma página das funções (filtrável por
+    categoria), com os dados de cada lado.
+    """
+    if contagem_id == outra_id:
+        raise HTTPException(status_code=400, detail="Informe duas contagens diferentes para comparar")
+    for id_ in (contagem_id, outra_id):
+        if not await session.get(Contagem, id_):
+            raise HTTPException(status_code=404, detail=f"Contagem {id_} não encontrada")
+
+    resultado = await comparar(session, contagem_id, outra_id, categoria, pagina, tamanho)
+    resultado["itens"] = [aninhar(linha) for linha in resultado["itens"]]
+    return FastORJSONResponse(content=resultado)
+
+@router.post("/{contagem_id}/simular")
+async def simular_contagem(
+    *,
+    session: AsyncSession = Depends(get_session),
+    contagem_id: int,
+    parametros: SimulacaoContagem = Body(default=SimulacaoContagem()),
+):
+    """
+    Simula o valor da contagem com outros fatores, tipos de ajuste, o método
+    estimado ou outra matriz de complexidade/pesos, sem gravar nada.
+    Retorna os totais atuais e simulados (gerais e por tipo de função) e as
+    diferenças. As funções ficam em cache entre simulações da mesma contagem.
+    """
+    if not await session.get(Contagem, contagem_id):
+        raise HTTPException(status_code=404, detail="Contagem não encontrada")
+    snapshot, do_cache = await simulacao.carregar_snapshot(session, contagem_id)
+    try:
+        resultado = simulacao.simular(snapshot, parametros)
+    except simulacao.SimulacaoInvalida as erro:
+        raise HTTPException(status_code=422, detail=str(erro))
+    resultado["cache"] = do_cache
+    return FastORJSONResponse(content=resultado)
+
 @router.delete("/{contagem_id}", status_code=204)
 async def delete_contagem(
     *, 
@@ -190,14 +286,16 @@ async def delete_contagem(
     contagem_id: int
 ):
     """
-    Deleta uma contagem.
+    Deleta uma contagem e suas funções com comandos em conjunto.
     """
     db_contagem = await session.get(Contagem, contagem_id)
     if not db_contagem:
         raise HTTPException(status_code=404, detail="Contagem não encontrada")
-        
-    await session.delete(db_contagem)
-    await session.commit()
+
+    tarefa = await exclusao.excluir_ou_agendar(session, "contagem", contagem_id)
+    if tarefa:
+        # Exclusão grande: segue em segundo plano, com progresso em status_url
+        return ORJSONResponse(status_code=202, content=tarefa.para_dict())
     
     # Retorna uma resposta 204 No Content, que é o padrão para deletes bem-sucedidos
     return
@@ -224,19 +322,15 @@ async def get_edit_contagem_page(
     if not contagem:
         raise HTTPException(status_code=404, detail="Contagem não encontrada")
     
-    # Carrega os dados para preencher os <select> no formulário
-    result_projetos = await session.exec(select(Projeto))
-    result_clientes = await session.exec(select(Cliente))
-    result_sistemas = await session.exec(select(Sistema))
-
+    # Os <select> do formulário são preenchidos pelo navegador via /api/lookup
+    # (listas id/nome em cache); aqui só vão o cliente, projeto e sistema atuais
     return request.app.state.templates.TemplateResponse(
         "contagens/edit.html", 
         {
             "request": request, 
             "contagem": contagem, 
             "funcoes": contagem.funcoes, # as funções já foram carregadas com o selectinload
-            "projetos": result_projetos.all(),
-            "clientes": result_clientes.all(),
-            "sistemas": result_sistemas.all()
+            "tipos_contagem": [e.value for e in TipoContagemEnum],
+            "metodos_contagem": [e.value for e in MetodoContagemEnum],
         }
     )
\ No newline at end of file
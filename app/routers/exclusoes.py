@@ -0,0 +1,22 @@
+# app/routers/exclusoes.py
+
+from fastapi import APIRouter, HTTPException
+
+from app.services.exclusao import REGISTRO_TAREFAS
+
+router = APIRouter(prefix="/exclusoes", tags=["Exclusões"])
+
+
+@router.get("/")
+async def read_exclusoes():
+    """Exclusões em segundo plano deste processo (em andamento e as últimas concluídas)."""
+    return [tarefa.para_dict() for tarefa in REGISTRO_TAREFAS.tarefas.values()]
+
+
+@router.get("/{tarefa_id}")
+async def read_exclusao(tarefa_id: str):
+    """Progresso de uma exclusão em segundo plano."""
+    tarefa = REGISTRO_TAREFAS.obter(tarefa_id)
+    if not tarefa:
+        raise HTTPException(status_code=404, detail="Tarefa de exclusão não encontrada")
+    return tarefa.para_dict()
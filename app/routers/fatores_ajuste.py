@@ -8,6 +8,8 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.database import get_session
 from app.models import FatorAjuste, TipoAjuste
 from app.schemas import FatorAjusteCreate, FatorAjusteRead, FatorAjusteUpdate
+from app.serialization import resposta_lista
+from app.invalidacao import invalidar
 
 router = APIRouter(prefix="/fatores-ajuste", tags=["Fatores de Ajuste"])
 
@@ -19,6 +21,7 @@ async def create_fator_ajuste(
     db_fator_ajuste = FatorAjuste.model_validate(fator_ajuste)
     session.add(db_fator_ajuste)
     await session.commit()
+    invalidar("fatorajuste")
     await session.refresh(db_fator_ajuste)
     return db_fator_ajuste
 
@@ -66,7 +69,7 @@ async def read_fatores_ajuste(
     result = await session.execute(query)
     fatores = result.scalars().all()
 
-    return fatores
+    return resposta_lista(fatores, FatorAjusteRead)
 
 
 @router.get("/{fator_id}", response_model=FatorAjusteRead)
@@ -92,6 +95,7 @@ async def update_fator_ajuste(
         setattr(db_fator, key, value)
     session.add(db_fator)
     await session.commit()
+    invalidar("fatorajuste")
     await session.refresh(db_fator)
     return db_fator
 
@@ -103,4 +107,5 @@ async def delete_fator_ajuste(*, session: AsyncSession = Depends(get_session), f
         raise HTTPException(status_code=404, detail="Fator de ajuste não encontrado")
     await session.delete(db_fator)
     await session.commit()
+    invalidar("fatorajuste")
     return
\ No newline at end of file
@@ -1,19 +1,26 @@
 # app/routers/funcoes.py
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
 from fastapi.params import Body
 from fastapi import Body
-from fastapi.responses import JSONResponse
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-import pandas as pd
 import io
 from pydantic import BaseModel
-from typing import List
-from app.services import calculation
+from typing import List, Optional
+from loguru import logger
+from app.services import busca, calculation, edicao_lote, staging, validation
 
 from app.database import get_session
 from app.models import Contagem, FatorAjuste
+from app.schemas import FuncaoLote
+from app.serialization import FastORJSONResponse, aninhar
+from app.streaming import MEDIA_TYPE_NDJSON, resposta_ndjson
+from app import queries
+from app.lazy_imports import modulo_sob_demanda
+
+# pandas (e o openpyxl, usado pelo read_excel) só é carregado na primeira importação de planilha
+pd = modulo_sob_demanda("pandas")
 
 router = APIRouter(
     prefix="/funcoes",
@@ -22,13 +29,86 @@ router = APIRouter(
 
 db_temp = {}
 
+@router.get("/stream", responses={200: {"content": {MEDIA_TYPE_NDJSON: {}}}})
+async def stream_funcoes(
+    contagem_id: Optional[int] = Query(None),
+    cliente_id: Optional[int] = Query(None),
+    projeto_id: Optional[int] = Query(None),
+    sistema_id: Optional[int] = Query(None),
+    apos_id: Optional[int] = Query(None, description="Continua a leitura depois desta função"),
+):
+    """
+    Todas as funções (filtradas por contagem, cliente, projeto ou sistema) em
+    NDJSON, uma por linha e em ordem de id, lidas de um cursor do servidor.
+    Para sincronizações completas: uma leitura interrompida continua com
+    `apos_id` igual ao último id recebido.
+    """
+    query = queries.select_funcoes(
+        contagem_id=contagem_id,
+        cliente_id=cliente_id,
+        projeto_id=projeto_id,
+        sistema_id=sistema_id,
+        apos_id=apos_id,
+    )
+    return resposta_ndjson(query)
+
+
+@router.get("/busca")
+async def buscar_funcoes(
+    q: str = Query(..., min_length=2, max_length=200, description='Termos, "frases", OR e -exclusão'),
+    cliente_id: Optional[int] = Query(None),
+    projeto_id: Optional[int] = Query(None),
+    sistema_id: Optional[int] = Query(None),
+    contagem_id: Optional[int] = Query(None),
+    pagina: int = Query(1, ge=1),
+    tamanho: int = Query(50, ge=1, le=200),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Busca textual nas funções de todas as contagens (nome, descrições de DER
+    e RLR, insumos e observações), das mais relevantes para as menos. Cada
+    item traz um trecho com os termos encontrados entre <mark> e </mark>.
+    """
+    resultado = await busca.buscar_funcoes(
+        session, q.strip(),
+        cliente_id=cliente_id,
+        projeto_id=projeto_id,
+        sistema_id=sistema_id,
+        contagem_id=contagem_id,
+        pagina=pagina,
+        tamanho=tamanho,
+    )
+    resultado["itens"] = [aninhar(item) for item in resultado["itens"]]
+    return FastORJSONResponse(content=resultado)
+
+@router.post("/contagem/{contagem_id}/lote")
+async def aplicar_lote(
+    contagem_id: int,
+    lote: FuncaoLote,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Inclui, altera (parcialmente) e exclui funções da contagem em uma única
+    transação. O cálculo de complexidade e PFs roda uma vez sobre o lote;
+    a resposta traz as funções incluídas e alteradas, já calculadas, e os
+    novos totais da contagem.
+    """
+    if not await session.get(Contagem, contagem_id):
+        raise HTTPException(status_code=404, detail="Contagem não encontrada.")
+    try:
+        resultado = await edicao_lote.aplicar_lote(session, contagem_id, lote)
+    except edicao_lote.LoteInvalido as erro:
+        raise HTTPException(status_code=422, detail=str(erro))
+    return FastORJSONResponse(status_code=200, content=resultado)
+
+
 @router.post("/contagem/{contagem_id}/upload_step1")
 async def upload_step1(
     contagem_id: int,
     session: AsyncSession = Depends(get_session),
     file: UploadFile = File(...)
 ):
-    print("[DEBUG] Iniciando upload_step1 para contagem_id:", contagem_id)
+    logger.debug("Iniciando upload_step1 para contagem_id: {}", contagem_id)
     contagem = await session.get(Contagem, contagem_id)
     if not contagem:
         raise HTTPException(status_code=404, detail="Contagem não encontrada")
@@ -46,7 +126,7 @@ async def upload_step1(
         if sheet_name not in xls.sheet_names:
             raise HTTPException(status_code=400, detail=f"A guia '{sheet_name}' não foi encontrada.")
 
-        print(f"[DEBUG] Lendo a guia: {sheet_name}")
+        logger.debug("Lendo a guia: {}", sheet_name)
 
         df_header_8 = pd.read_excel(xls, sheet_name=sheet_name, header=None, skiprows=7, nrows=1)
         df_header_9 = pd.read_excel(xls, sheet_name=sheet_name, header=None, skiprows=8, nrows=1)
@@ -72,7 +152,7 @@ async def upload_step1(
             header_list.append(header)
         # --- FIM DA CORREÇÃO ---
         
-        print("[DEBUG] Cabeçalhos gerados antes da unicidade:", header_list)
+        logger.debug("Cabeçalhos gerados antes da unicidade: {}", header_list)
 
         final_headers = []
         counts = {}
@@ -84,9 +164,11 @@ async def upload_step1(
                 counts[h] = 0
                 final_headers.append(h)
 
-        print("[DEBUG] Cabeçalhos finais e únicos:", final_headers)
+        logger.debug("Cabeçalhos finais e únicos: {}", final_headers)
 
         df_data = pd.read_excel(xls, sheet_name=sheet_name, skiprows=9, header=None)
+        # O índice passa a ser o número da linha na planilha (os dados começam na linha 10)
+        df_data.index = df_data.index + 10
         
         num_cols = min(len(final_headers), len(df_data.columns))
         df_data = df_data.iloc[:, :num_cols]
@@ -95,26 +177,22 @@ async def upload_step1(
         df_data.dropna(axis=1, how='all', inplace=True)
         df_data.dropna(axis=0, how='all', inplace=True)
         
-        df_data = df_data.astype(object).where(pd.notnull(df_data), None)
-        
-        print("[DEBUG] Colunas do DataFrame antes de converter para dict:", list(df_data.columns))
-        data_records = df_data.to_dict(orient='records')
-        print("[DEBUG] Conversão para dicionário bem-sucedida.")
+        # Mantém os dados em formato colunar compacto em vez de uma lista de dicionários
+        dados_importados = staging.compactar_dataframe(df_data)
+        logger.opt(lazy=True).debug("Colunas da tabela importada: {}", lambda: list(dados_importados.columns))
 
         db_temp[contagem_id] = {
             "original_filename": file.filename,
-            "dados_importados": data_records
+            "dados_importados": dados_importados
         }
         
-        return JSONResponse(status_code=200, content={
+        return FastORJSONResponse(status_code=200, content={
             "message": "Arquivo lido com sucesso!", "filename": file.filename,
-            "total_records": len(data_records), "headers": list(df_data.columns),
-            "data_preview": data_records[:5]
+            "total_records": len(dados_importados), "headers": list(dados_importados.columns),
+            "data_preview": staging.para_registros(dados_importados.head(5))
         })
     except Exception as e:
-        print(f"ERRO DETALHADO NO PROCESSAMENTO DO ARQUIVO: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao processar o arquivo importado da contagem {}", contagem_id)
         raise HTTPException(status_code=500, detail=f"Ocorreu um erro no servidor ao processar o arquivo: {e}")
 
 
@@ -123,71 +201,71 @@ async def validate_step2(
     contagem_id: int,
     session: AsyncSession = Depends(get_session),
 ):
-    print("[DEBUG] Iniciando validate_step2")
+    logger.debug("Iniciando validate_step2 para contagem_id: {}", contagem_id)
     if contagem_id not in db_temp or "dados_importados" not in db_temp[contagem_id]:
         raise HTTPException(status_code=404, detail="Dados da importação não encontrados.")
 
     dados_planilha = db_temp[contagem_id]["dados_importados"]
-    if not dados_planilha:
-        return JSONResponse(status_code=200, content={"fatores_novos": []})
+    if dados_planilha.empty:
+        return FastORJSONResponse(status_code=200, content={"fatores_novos": []})
 
     # --- INÍCIO DA LÓGICA CORRIGIDA ---
     # 1. Encontra dinamicamente todas as colunas de "Tipo Projeto"
-    colunas_tipo_projeto = [col for col in dados_planilha[0].keys() if col.startswith('Tipo Projeto')]
-    print(f"[DEBUG] Colunas de 'Tipo Projeto' encontradas: {colunas_tipo_projeto}")
-
-    # 2. Coleta valores de todas essas colunas
+    colunas_tipo_projeto = [col for col in dados_planilha.columns if col.startswith('Tipo Projeto')]
+    logger.debug("Colunas de 'Tipo Projeto' encontradas: {}", colunas_tipo_projeto)
+
+    # 2. Coleta valores de todas essas colunas (operando coluna a coluna)
+    valores_tipo_projeto = {
+        coluna: dados_planilha[coluna].astype(object).fillna("").astype(str).str.strip()
+        for coluna in colunas_tipo_projeto
+    }
     tipos_projeto_planilha = set()
-    for linha in dados_planilha:
-        for coluna in colunas_tipo_projeto:
-            valor = linha.get(coluna)
-            if valor and pd.notna(valor):
-                tipos_projeto_planilha.add(str(valor).strip())
+    for valores in valores_tipo_projeto.values():
+        tipos_projeto_planilha.update(valor for valor in valores.unique() if valor)
     
     # 3. Remove a string a ser ignorada, como solicitado anteriormente
     texto_a_ignorar = "Só inserir linhas antes desta."
     if texto_a_ignorar in tipos_projeto_planilha:
         tipos_projeto_planilha.remove(texto_a_ignorar)
-    print(f"[DEBUG] Tipos de projeto únicos encontrados na planilha: {tipos_projeto_planilha}")
+    logger.debug("Tipos de projeto únicos encontrados na planilha: {}", tipos_projeto_planilha)
     # --- FIM DA LÓGICA CORRIGIDA ---
 
     result = await session.exec(select(FatorAjuste))
     fatores_existentes_db = result.all()
     nomes_fatores_db = {fator.nome for fator in fatores_existentes_db}
-    print(f"[DEBUG] Fatores existentes no banco: {nomes_fatores_db}")
+    logger.debug("Fatores existentes no banco: {}", nomes_fatores_db)
 
     nomes_fatores_novos = tipos_projeto_planilha - nomes_fatores_db
-    print(f"[DEBUG] Fatores novos a serem cadastrados: {nomes_fatores_novos}")
+    logger.debug("Fatores novos a serem cadastrados: {}", nomes_fatores_novos)
 
     # --- LÓGICA DE BUSCA DO FATOR CORRIGIDA ---
-    colunas_fator_ajuste = [col for col in dados_planilha[0].keys() if col.startswith('Fator Ajuste')]
-    print(f"[DEBUG] Colunas de 'Fator Ajuste' encontradas: {colunas_fator_ajuste}")
+    colunas_fator_ajuste = [col for col in dados_planilha.columns if col.startswith('Fator Ajuste')]
+    logger.debug("Colunas de 'Fator Ajuste' encontradas: {}", colunas_fator_ajuste)
 
     fatores_novos_para_frontend = []
     for nome_novo in nomes_fatores_novos:
-        linha_correspondente = None
-        for linha in dados_planilha:
-            for coluna_tp in colunas_tipo_projeto:
-                if str(linha.get(coluna_tp, '')).strip() == nome_novo:
-                    linha_correspondente = linha
-                    break
-            if linha_correspondente:
+        # Primeira linha em que alguma coluna de "Tipo Projeto" contém o nome
+        encontrados = pd.Series(False, index=dados_planilha.index)
+        for coluna_tp in colunas_tipo_projeto:
+            encontrados |= valores_tipo_projeto[coluna_tp] == nome_novo
+        if not encontrados.any():
+            continue
+        idx_linha = encontrados.idxmax()
+
+        fator_valor = 0.0
+        for col_fator in colunas_fator_ajuste:
+            valor = dados_planilha.at[idx_linha, col_fator]
+            if valor is not None and pd.notna(valor):
+                fator_valor = valor
                 break
         
-        if linha_correspondente:
-            fator_valor = 0.0
-            for col_fator in colunas_fator_ajuste:
-                if linha_correspondente.get(col_fator) is not None and pd.notna(linha_correspondente.get(col_fator)):
-                    fator_valor = linha_correspondente.get(col_fator)
-                    break
-            
-            fatores_novos_para_frontend.append({
-                "nome": nome_novo,
-                "fator": float(fator_valor)
-            })
+        fatores_novos_para_frontend.append({
+            "nome": nome_novo,
+            "fator": float(fator_valor)
+        })
             
-    print("[DEBUG] Enviando para o frontend:", fatores_novos_para_frontend)
-    return JSONResponse(
+    logger.debug("Enviando para o frontend: {}", fatores_novos_para_frontend)
+    return FastORJSONResponse(
         status_code=200,
         content={"fatores_novos": fatores_novos_para_frontend}
     )
@@ -205,7 +283,7 @@ async def create_fatores_step2(
     session: AsyncSession = Depends(get_session)
 ):
     if not novos_fatores:
-        return JSONResponse(status_code=200, content={"message": "Nenhum novo fator para adicionar. Prosseguindo."})
+        return FastORJSONResponse(status_code=200, content={"message": "Nenhum novo fator para adicionar. Prosseguindo."})
 
     try:
         for fator_data in novos_fatores:
@@ -214,11 +292,11 @@ async def create_fatores_step2(
         
         await session.commit()
         
-        return JSONResponse(status_code=201, content={"message": "Fatores de ajuste criados com sucesso!"})
+        return FastORJSONResponse(status_code=201, content={"message": "Fatores de ajuste criados com sucesso!"})
 
-    except Exception as e:
+    except Exception:
         await session.rollback()
-        print(f"Erro ao criar fatores de ajuste: {e}")
+        logger.exception("Erro ao criar fatores de ajuste")
         raise HTTPException(status_code=500, detail="Ocorreu um erro ao salvar os novos fatores de ajuste.")
     
 @router.post("/contagem/{contagem_id}/process_mapping_step3")
@@ -236,51 +314,129 @@ async def process_mapping_step3(
 
     dados_originais = db_temp[contagem_id]["dados_importados"]
     
-    # 1. Renomeia as chaves dos dicionários com base no mapeamento recebido
-    dados_mapeados = []
-    for linha in dados_originais:
-        nova_linha = {}
-        for coluna_planilha, campo_db in mapeamento.items():
-            if coluna_planilha in linha:
-                nova_linha[campo_db] = linha[coluna_planilha]
-        dados_mapeados.append(nova_linha)
+    # 1. Renomeia as colunas com base no mapeamento recebido, mantendo apenas as mapeadas
+    dados_mapeados = staging.projetar_mapeamento(dados_originais, mapeamento)
+
+    # Descarta a linha que marca o fim das funções na planilha modelo
+    ignoradas = validation.linhas_ignoradas(dados_mapeados)
+    if ignoradas.any():
+        dados_mapeados = dados_mapeados[~ignoradas]
 
     # 2. Busca todos os fatores de ajuste (incluindo os novos) para criar um mapa de nome -> id
     result = await session.exec(select(FatorAjuste))
     mapa_fatores = {fator.nome: fator for fator in result.all()}
 
-    # 3. Enriquece os dados e executa os cálculos
+    # 3. Valida o lote inteiro de uma vez; os erros viram um relatório em vez de exceções
+    erros = validation.validar_lote(dados_mapeados, set(mapa_fatores))
+    db_temp[contagem_id]["erros_validacao"] = erros
+    problemas_linha = validation.problemas_por_linha(erros)
+
+    def coluna_texto(campo):
+        if campo not in dados_mapeados.columns:
+            return [""] * len(dados_mapeados)
+        return validation.textos(dados_mapeados[campo])
+
+    def coluna_inteira(campo):
+        if campo not in dados_mapeados.columns:
+            return [0] * len(dados_mapeados)
+        return validation.inteiros_validos(dados_mapeados[campo])
+
+    # Colunas normalizadas para o cálculo (valores inválidos já constam no relatório)
+    nomes_fator = coluna_texto("nome_fator_ajuste")
+    tipos_funcao = coluna_texto("tipo_funcao")
+    qtds_der = coluna_inteira("qtd_der")
+    qtds_rlr = coluna_inteira("qtd_rlr")
+    numeros_linha = dados_mapeados.index.tolist()
+
+    # 4. Enriquece os dados e executa os cálculos
     dados_processados = []
-    for linha in dados_mapeados:
-        # Pula linhas que não têm um 'Tipo Projeto' (agora mapeado para 'nome_fator_ajuste')
-        nome_fator = linha.get("nome_fator_ajuste")
-        if not nome_fator or pd.isna(nome_fator):
-            continue
-
-        fator_obj = mapa_fatores.get(str(nome_fator).strip())
+    for i, linha in enumerate(staging.para_registros(dados_mapeados)):
+        fator_obj = mapa_fatores.get(nomes_fator[i])
         
         if fator_obj:
             linha['fator_ajuste_id'] = fator_obj.id
             # Adiciona o valor do fator para o cálculo
             linha['fator_ajuste'] = fator_obj.fator
         else:
-            # Se por algum motivo não encontrar (não deveria acontecer), define valores padrão
+            # Fator ausente ou desconhecido (reportado na validação): usa valores padrão
             linha['fator_ajuste_id'] = None
             linha['fator_ajuste'] = 1.0
 
-        # Garante que os campos numéricos são tratados corretamente
-        linha['qtd_der'] = int(linha.get('qtd_der', 0) or 0)
-        linha['qtd_rlr'] = int(linha.get('qtd_rlr', 0) or 0)
+        linha['tipo_funcao'] = tipos_funcao[i]
+        linha['qtd_der'] = int(qtds_der[i])
+        linha['qtd_rlr'] = int(qtds_rlr[i])
 
         # Executa o cálculo
         linha_calculada = calculation.calcular_pontos_de_funcao(linha)
+
+        problemas = [problemas_linha[numeros_linha[i]]] if numeros_linha[i] in problemas_linha else []
+        if linha_calculada["complexidade"] == "N/A" and linha_calculada.get("tipo_funcao") != "INM":
+            problemas.append("complexidade_indefinida")
+        linha_calculada["problemas"] = ",".join(problemas) or None
         dados_processados.append(linha_calculada)
 
-    # Salva os dados processados e prontos para a etapa final
-    db_temp[contagem_id]["dados_processados"] = dados_processados
+    # Salva os dados processados e prontos para a etapa final (também em formato colunar)
+    db_temp[contagem_id]["dados_processados"] = staging.compactar_dataframe(
+        pd.DataFrame(dados_processados, index=dados_mapeados.index)
+    )
     
-    return JSONResponse(status_code=200, content={
+    return FastORJSONResponse(status_code=200, content={
         "message": "Mapeamento processado e cálculos realizados com sucesso.",
         "total_records": len(dados_processados),
+        "validacao": validation.resumir_erros(erros),
         "preview": dados_processados[:10] # Envia uma prévia para a Etapa 4
-    })
\ No newline at end of file
+    })
+
+
+@router.get("/contagem/{contagem_id}/preview")
+async def preview_importacao(
+    contagem_id: int,
+    fonte: str = Query("importados", pattern="^(importados|processados|erros)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    sort: Optional[str] = Query(None),
+    coluna: Optional[str] = Query(None),
+    valor: Optional[str] = Query(None),
+    complexidade: Optional[str] = Query(None),
+    com_problemas: bool = Query(False),
+):
+    """
+    Pré-visualização paginada dos dados em staging (etapa 1), já processados (etapa 3)
+    ou do índice de erros da validação (etapa 3).
+    Ordenação e filtros (por valor de coluna, complexidade ou linhas com problemas)
+    são aplicados no servidor, devolvendo apenas a página solicitada.
+    """
+    chave = {
+        "importados": "dados_importados",
+        "processados": "dados_processados",
+        "erros": "erros_validacao",
+    }[fonte]
+    if contagem_id not in db_temp or chave not in db_temp[contagem_id]:
+        raise HTTPException(status_code=404, detail="Dados da importação não encontrados.")
+
+    dados = db_temp[contagem_id][chave]
+    mascara = pd.Series(True, index=dados.index)
+
+    if coluna and valor:
+        if coluna not in dados.columns:
+            raise HTTPException(status_code=400, detail=f"Coluna '{coluna}' não encontrada.")
+        mascara &= staging.filtrar_por_valor(dados, coluna, valor)
+    if complexidade or com_problemas:
+        if "complexidade" not in dados.columns:
+            raise HTTPException(status_code=400, detail="Filtro disponível apenas para os dados processados.")
+        if complexidade:
+            mascara &= (dados["complexidade"] == complexidade).fillna(False).astype(bool)
+        if com_problemas:
+            mascara &= dados["problemas"].notna()
+
+    filtrados = dados if mascara.all() else dados[mascara.to_numpy()]
+    pagina = staging.paginar(filtrados, offset=offset, limit=limit, sort=sort)
+
+    return FastORJSONResponse(status_code=200, content={
+        "total_records": len(dados),
+        "total_filtrados": len(filtrados),
+        "offset": offset,
+        "limit": limit,
+        "headers": list(dados.columns),
+        "rows": staging.para_registros(pagina, com_linha=fonte != "erros"),
+    })
@@ -0,0 +1,20 @@
+# app/routers/health.py
+
+from fastapi import APIRouter, Request
+from fastapi.responses import ORJSONResponse
+
+router = APIRouter(prefix="/health", tags=["Monitoramento"])
+
+
+@router.get("/live", include_in_schema=False)
+async def liveness():
+    """O processo está de pé (não depende do banco nem do aquecimento)."""
+    return {"status": "ok"}
+
+
+@router.get("/ready", include_in_schema=False)
+async def readiness(request: Request):
+    """Pronto para tráfego só depois do aquecimento feito pelo lifespan."""
+    if not getattr(request.app.state, "pronto", False):
+        return ORJSONResponse(status_code=503, content={"status": "aquecendo"})
+    return {"status": "pronto", "aquecimento": request.app.state.aquecimento}
@@ -0,0 +1,47 @@
+# app/routers/lookup.py
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import get_session
+from app.serialization import FastORJSONResponse
+from app.services.lookup import LIMITE_MAXIMO, LIMITE_PADRAO, LOOKUPS
+
+# Listas (id, nome) para os combos dos formulários, servidas do cache em memória
+router = APIRouter(prefix="/lookup", tags=["Lookup"])
+
+
+@router.get("/clientes")
+async def lookup_clientes(
+    *,
+    session: AsyncSession = Depends(get_session),
+    q: Optional[str] = None,
+    limit: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+):
+    """Clientes cujo nome começa com `q` (sem diferenciar maiúsculas e acentos), ordenados por nome."""
+    return FastORJSONResponse(await LOOKUPS["clientes"].buscar(session, q, limit))
+
+
+@router.get("/projetos")
+async def lookup_projetos(
+    *,
+    session: AsyncSession = Depends(get_session),
+    q: Optional[str] = None,
+    cliente_id: Optional[int] = None,
+    limit: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+):
+    """Projetos cujo nome começa com `q`, opcionalmente só os de um cliente."""
+    return FastORJSONResponse(await LOOKUPS["projetos"].buscar(session, q, limit, cliente_id))
+
+
+@router.get("/sistemas")
+async def lookup_sistemas(
+    *,
+    session: AsyncSession = Depends(get_session),
+    q: Optional[str] = None,
+    projeto_id: Optional[int] = None,
+    limit: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+):
+    """Sistemas cujo nome começa com `q`, opcionalmente só os de um projeto."""
+    return FastORJSONResponse(await LOOKUPS["sistemas"].buscar(session, q, limit, projeto_id))
@@ -0,0 +1,16 @@
+# app/routers/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import REGISTRO
+
+router = APIRouter(tags=["Monitoramento"])
+
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """Métricas das requisições no formato de texto do Prometheus."""
+    return PlainTextResponse(REGISTRO.exportar(), media_type=CONTENT_TYPE_PROMETHEUS)
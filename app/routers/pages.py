@@ -1,52 +1,19 @@
 # app/routers/pages.py
 
-import httpx
 from typing import Optional
 from fastapi import APIRouter, Request, Depends, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from loguru import logger
-from datetime import datetime
 from datetime import date
-from urllib.parse import urlencode
 
 from app.models import TipoAjuste, TipoContagemEnum, MetodoContagemEnum
+from app.templating import templates
+from app.lazy_imports import modulo_sob_demanda
 
-router = APIRouter(tags=["Pages"])
-templates = Jinja2Templates(directory="templates")
-
-# --- FUNÇÃO DE FILTRO PERSONALIZADO ---
-def format_datetime(value, fmt="%d/%m/%Y %H:%M"):
-    """Filtro Jinja2 para formatar um datetime."""
-    if isinstance(value, str):
-        # Tenta converter de string ISO para datetime, se necessário
-        try:
-            value = datetime.fromisoformat(value)
-        except ValueError:
-            return value # Retorna o valor original se não puder converter
-    if isinstance(value, datetime):
-        return value.strftime(fmt)
-    return value
-
-# --- REGISTRE O FILTRO NO AMBIENTE DO JINJA ---
-templates.env.filters["datetimeformat"] = format_datetime
-
-# --- CRIE E REGISTRE O FILTRO urlencode_exclude ---
-def urlencode_with_exclude(query_params, **kwargs):
-    # Converte o MultiDict do Starlette para um dict simples
-    params = dict(query_params)
-    # Pega a chave a ser excluída a partir dos kwargs do filtro
-    exclude_key = kwargs.get("exclude")
-    
-    # Remove a chave, se ela existir no dicionário
-    if exclude_key and exclude_key in params:
-        del params[exclude_key]
-        
-    # Codifica os parâmetros restantes e retorna a string
-    return urlencode(params)
+# Carregado na primeira página renderizada (as rotas /api não precisam dele)
+httpx = modulo_sob_demanda("httpx")
 
-# Registra o novo filtro com um nome único
-templates.env.filters["urlencode_with_exclude"] = urlencode_with_exclude
+router = APIRouter(tags=["Pages"])
 
 # URL base da nossa própria API
 API_BASE_URL = "http://127.0.0.1:8000/api"
@@ -60,7 +27,7 @@ async def list_clientes_page(
     """
     Renderiza a página que lista os clientes, aplicando filtros.
     """
-    logger.info("Acessando a página de listagem de clientes.")
+    logger.debug("Acessando a página de listagem de clientes.")
     clientefs = []
     
     # Constrói os parâmetros da query para a chamada da API
@@ -75,15 +42,15 @@ async def list_clientes_page(
             # ADICIONADO: Envia os parâmetros de filtro para a API
             response = await client.get(f"{API_BASE_URL}/clientes/", params=params)
         
-        logger.debug(f"Página de listagem chamou API. Status: {response.status_code}")
+        logger.debug("Página de listagem chamou API. Status: {}", response.status_code)
         if response.status_code == 200:
             clientes = response.json()
-            logger.info(f"Clientes encontrados via API: {len(clientes)}")
+            logger.debug("Clientes encontrados via API: {}", len(clientes))
         else:
-            logger.error(f"Erro ao buscar clientes da API. Resposta: {response.text}")
+            logger.error("Erro ao buscar clientes da API. Resposta: {}", response.text)
 
     except httpx.RequestError as exc:
-        logger.critical(f"Erro de conexão ao tentar chamar a API de clientes: {exc}")
+        logger.critical("Erro de conexão ao tentar chamar a API de clientes: {}", exc)
 
     # Renderiza o template, passando os filtros de volta para preencher os campos
     return templates.TemplateResponse("clientes/list.html", {
@@ -108,13 +75,13 @@ async def handle_create_cliente(request: Request, nome: str = Form(...)):
     """
     Recebe os dados do formulário e chama a API para criar o cliente.
     """
-    logger.info(f"Recebido formulário para criar cliente: {nome}")
+    logger.info("Recebido formulário para criar cliente: {}", nome)
     async with httpx.AsyncClient() as client:
         response = await client.post(f"{API_BASE_URL}/clientes/", json={"nome": nome})
     
     # --- LOGS DE DIAGNÓSTICO ---
-    logger.debug(f"API respondeu com status: {response.status_code}")
-    logger.debug(f"Conteúdo da resposta da API: {response.text}")
+    logger.debug("API respondeu com status: {}", response.status_code)
+    logger.opt(lazy=True).debug("Conteúdo da resposta da API: {}", lambda: response.text)
     # ---------------------------
 
     if response.status_code == 201:
@@ -150,7 +117,7 @@ async def edit_cliente_form(request: Request, cliente_id: int):
             # Se o cliente não for encontrado, redireciona para a lista
             return RedirectResponse(url="/clientes", status_code=303)
     except httpx.RequestError as exc:
-        logger.critical(f"Erro de conexão ao buscar cliente para edição: {exc}")
+        logger.critical("Erro de conexão ao buscar cliente para edição: {}", exc)
         return RedirectResponse(url="/clientes", status_code=303)
 
 @router.post("/clientes/{cliente_id}/editar", response_class=HTMLResponse)
@@ -178,7 +145,7 @@ async def handle_edit_cliente(request: Request, cliente_id: int, nome: str = For
                 "error": f"Erro ao atualizar: {error_msg}"
             })
     except httpx.RequestError as exc:
-        logger.critical(f"Erro de conexão ao editar cliente: {exc}")
+        logger.critical("Erro de conexão ao editar cliente: {}", exc)
         # Lógica de erro similar à anterior
 
 # app/routers/pages.py (adicionar ao final do arquivo)
@@ -362,11 +329,8 @@ async def list_projetos_page(
 
 @router.get("/projetos/novo", response_class=HTMLResponse)
 async def create_projeto_form(request: Request):
-    # Busca a lista de clientes para popular o combobox
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{API_BASE_URL}/clientes/")
-    clientes = response.json() if response.status_code == 200 else []
-    return templates.TemplateResponse("projetos/form.html", {"request": request, "clientes": clientes})
+    # O combo de clientes é preenchido pelo navegador via /api/lookup/clientes
+    return templates.TemplateResponse("projetos/form.html", {"request": request})
 
 @router.post("/projetos/novo", response_class=HTMLResponse)
 async def handle_create_projeto(request: Request, nome: str = Form(...), cliente_id: int = Form(...)):
@@ -381,18 +345,14 @@ async def handle_create_projeto(request: Request, nome: str = Form(...), cliente
 @router.get("/projetos/{projeto_id}/editar", response_class=HTMLResponse)
 async def edit_projeto_form(request: Request, projeto_id: int):
     async with httpx.AsyncClient() as client:
-        # Busca o projeto específico
+        # Busca o projeto específico (o combo de clientes usa /api/lookup/clientes)
         proj_resp = await client.get(f"{API_BASE_URL}/projetos/{projeto_id}")
-        # Busca TODOS os clientes para o combobox
-        cli_resp = await client.get(f"{API_BASE_URL}/clientes/")
     
     if proj_resp.status_code == 200:
         projeto = proj_resp.json()
-        clientes = cli_resp.json() if cli_resp.status_code == 200 else []
         return templates.TemplateResponse("projetos/edit.html", {
             "request": request,
             "projeto": projeto,
-            "clientes": clientes
         })
     return RedirectResponse(url="/projetos", status_code=303)
 
@@ -449,10 +409,8 @@ async def list_sistemas_page(
 
 @router.get("/sistemas/novo", response_class=HTMLResponse)
 async def create_sistema_form(request: Request):
-    async with httpx.AsyncClient() as client:
-        resp_projetos = await client.get(f"{API_BASE_URL}/projetos/")
-    projetos = resp_projetos.json() if resp_projetos.status_code == 200 else []
-    return templates.TemplateResponse("sistemas/form.html", {"request": request, "projetos": projetos})
+    # O combo de projetos é preenchido pelo navegador via /api/lookup/projetos
+    return templates.TemplateResponse("sistemas/form.html", {"request": request})
 
 @router.post("/sistemas/novo", response_class=HTMLResponse)
 async def handle_create_sistema(request: Request, nome: str = Form(...), projeto_id: int = Form(...)):
@@ -465,16 +423,14 @@ async def handle_create_sistema(request: Request, nome: str = Form(...), projeto
 @router.get("/sistemas/{sistema_id}/editar", response_class=HTMLResponse)
 async def edit_sistema_form(request: Request, sistema_id: int):
     async with httpx.AsyncClient() as client:
+        # O combo de projetos usa /api/lookup/projetos
         resp_sistema = await client.get(f"{API_BASE_URL}/sistemas/{sistema_id}")
-        resp_projetos = await client.get(f"{API_BASE_URL}/projetos/")
     
     if resp_sistema.status_code == 200:
         sistema = resp_sistema.json()
-        projetos = resp_projetos.json() if resp_projetos.status_code == 200 else []
         return templates.TemplateResponse("sistemas/edit.html", {
             "request": request,
             "sistema": sistema,
-            "projetos": projetos,
         })
     return RedirectResponse(url="/sistemas", status_code=303)
 
@@ -559,16 +515,11 @@ async def create_contagem_form(request: Request):
     """
     Renderiza a primeira etapa do formulário de criação de contagem (Aba Identificação).
     """
-    # Para o primeiro combo, buscamos todos os clientes
-    async with httpx.AsyncClient() as client:
-        resp_clientes = await client.get(f"{API_BASE_URL}/clientes/")
-    clientes = resp_clientes.json() if resp_clientes.status_code == 200 else []
-
+    # Os combos de cliente, projeto e sistema são preenchidos via /api/lookup
     return templates.TemplateResponse(
         "contagens/form.html",
         {
             "request": request,
-            "clientes": clientes,
             "tipos_contagem": [e.value for e in TipoContagemEnum],
             "metodos_contagem": [e.value for e in MetodoContagemEnum],
         },
@@ -618,23 +569,19 @@ async def edit_contagem_form(request: Request, contagem_id: int):
     Renderiza o formulário de edição para uma contagem (Aba Identificação).
     """
     async with httpx.AsyncClient() as client:
-        # Busca os dados da contagem específica
+        # Busca os dados da contagem específica (já com cliente, projeto e sistema)
         resp_contagem = await client.get(f"{API_BASE_URL}/contagens/{contagem_id}")
         if resp_contagem.status_code != 200:
             return RedirectResponse(url="/contagens?error=notfound", status_code=303)
-        
-        # Busca todas as listas para popular os combos
-        resp_clientes = await client.get(f"{API_BASE_URL}/clientes/")
 
+    # Os combos são preenchidos pelo navegador via /api/lookup
     contagem = resp_contagem.json()
-    clientes = resp_clientes.json() if resp_clientes.status_code == 200 else []
 
     return templates.TemplateResponse(
         "contagens/edit.html",
         {
             "request": request,
             "contagem": contagem,
-            "clientes": clientes,
             "tipos_contagem": [e.value for e in TipoContagemEnum],
             "metodos_contagem": [e.value for e in MetodoContagemEnum],
         },
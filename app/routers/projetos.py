@@ -2,12 +2,15 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload, Session
 from app import models, schemas
 
 from app.database import get_session
+from app.invalidacao import invalidar
+from app.services import exclusao
 from app.models import Projeto
 from app.schemas import (
     ProjetoCreate,
@@ -16,6 +19,7 @@ from app.schemas import (
     ProjetoReadWithCliente,
     ClienteRead
 )
+from app.serialization import resposta_lista
 
 router = APIRouter(prefix="/projetos", tags=["Projetos"])
 
@@ -24,6 +28,7 @@ async def create_projeto(*, session: AsyncSession = Depends(get_session), projet
     db_projeto = Projeto.model_validate(projeto)
     session.add(db_projeto)
     await session.commit()
+    invalidar("projeto")
     await session.refresh(db_projeto)
     return db_projeto
 
@@ -51,7 +56,7 @@ async def read_projetos(
     
     result = await session.execute(query)
     projetos = result.scalars().all()
-    return projetos
+    return resposta_lista(projetos, ProjetoReadWithCliente)
 
 @router.get("/{projeto_id}", response_model=ProjetoReadWithCliente)
 async def read_projeto(*, session: AsyncSession = Depends(get_session), projeto_id: int):
@@ -72,6 +77,7 @@ async def update_projeto(*, session: AsyncSession = Depends(get_session), projet
         setattr(db_projeto, key, value)
     session.add(db_projeto)
     await session.commit()
+    invalidar("projeto")
     await session.refresh(db_projeto)
     return db_projeto
 
@@ -80,8 +86,11 @@ async def delete_projeto(*, session: AsyncSession = Depends(get_session), projet
     db_projeto = await session.get(Projeto, projeto_id)
     if not db_projeto:
         raise HTTPException(status_code=404, detail="Projeto não encontrado")
-    await session.delete(db_projeto)
-    await session.commit()
+    # Sistemas, contagens e funções do projeto saem juntos, em conjunto
+    tarefa = await exclusao.excluir_ou_agendar(session, "projeto", projeto_id)
+    if tarefa:
+        # Exclusão grande: segue em segundo plano, com progresso em status_url
+        return ORJSONResponse(status_code=202, content=tarefa.para_dict())
     return
 
 # --- NOVO ENDPOINT ---
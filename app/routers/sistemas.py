@@ -8,6 +8,8 @@ from sqlalchemy.orm import selectinload, Session
 from app import models, schemas
 
 from app.database import get_session
+from app.invalidacao import invalidar
+from app.services import exclusao
 from app.models import Projeto, Sistema
 from app.schemas import (
     SistemaCreate,
@@ -16,6 +18,8 @@ from app.schemas import (
     SistemaReadWithProjeto,
     ProjetoRead
 )
+from app.serialization import resposta_linhas
+from app import queries
 
 router = APIRouter(prefix="/sistemas", tags=["Sistemas"])
 
@@ -25,6 +29,7 @@ async def create_sistema(*, session: AsyncSession = Depends(get_session), sistem
     db_sistema = Sistema.model_validate(sistema)
     session.add(db_sistema)
     await session.commit()
+    invalidar("sistema")
     await session.refresh(db_sistema)
     return db_sistema
 
@@ -36,19 +41,10 @@ async def read_sistemas(
     nome_filter: Optional[str] = None,
     projeto_id_filter: Optional[int] = None
 ):
-    query = select(Sistema).options(
-        selectinload(Sistema.projeto).selectinload(Projeto.cliente)
-    )
-
-    if nome_filter:
-        query = query.where(Sistema.nome.ilike(f"%{nome_filter}%"))
-    if projeto_id_filter:
-        query = query.where(Sistema.projeto_id == projeto_id_filter)
-
-    query = query.order_by(Sistema.nome)
+    # Consulta somente leitura: sistema, projeto e cliente em um único SELECT com JOIN
+    query = queries.select_sistemas(nome_filter=nome_filter, projeto_id_filter=projeto_id_filter)
     result = await session.execute(query)
-    sistemas = result.scalars().all()
-    return sistemas
+    return resposta_linhas(result.all())
 
 
 @router.get("/{sistema_id}", response_model=SistemaReadWithProjeto)
@@ -80,6 +76,7 @@ async def update_sistema(
         setattr(db_sistema, key, value)
     session.add(db_sistema)
     await session.commit()
+    invalidar("sistema")
     await session.refresh(db_sistema)
     return db_sistema
 
@@ -89,8 +86,8 @@ async def delete_sistema(*, session: AsyncSession = Depends(get_session), sistem
     db_sistema = await session.get(Sistema, sistema_id)
     if not db_sistema:
         raise HTTPException(status_code=404, detail="Sistema não encontrado")
-    await session.delete(db_sistema)
-    await session.commit()
+    # Contagens e funções do sistema ficam, apenas sem sistema
+    await exclusao.excluir_ou_agendar(session, "sistema", sistema_id)
     return
 
 @router.get("/projeto/{projeto_id}", response_model=List[SistemaRead])
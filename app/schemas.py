@@ -1,6 +1,6 @@
 # app/schemas.py
 
-from typing import Optional, List 
+from typing import Dict, Optional, List 
 from datetime import datetime, date
 from sqlmodel import SQLModel
 
@@ -88,6 +88,31 @@ class ContagemUpdate(SQLModel):
     projeto_id: Optional[int] = None
     sistema_id: Optional[int] = None
 
+class ContagemClonar(SQLModel):
+    """Campos da nova contagem; o que não for informado vem da contagem de origem."""
+    descricao: Optional[str] = None
+    tipo_contagem: Optional[TipoContagemEnum] = None
+    data_criacao: Optional[date | datetime] = None
+    responsavel: Optional[str] = None
+    sistema_id: Optional[int] = None
+
+class MatrizComplexidade(SQLModel):
+    """Limites inferiores das faixas de RLR e DER e a complexidade de cada célula."""
+    rlr: List[int]
+    der: List[int]
+    tabela: List[List[str]]
+
+class SimulacaoContagem(SQLModel):
+    metodo_contagem: Optional[MetodoContagemEnum] = None
+    # Fator aplicado a todas as funções (tem precedência sobre `fatores`)
+    fator_global: Optional[float] = None
+    # fator_ajuste_id -> novo valor do fator
+    fatores: Dict[int, float] = {}
+    # fator_ajuste_id -> tipo de ajuste simulado
+    tipos_ajuste: Dict[int, TipoAjuste] = {}
+    matrizes: Dict[TipoFuncaoEnum, MatrizComplexidade] = {}
+    pesos: Dict[TipoFuncaoEnum, Dict[str, int]] = {}
+
 class ContagemReadWithRelations(ContagemRead):
     cliente: ClienteRead
     projeto: ProjetoRead
@@ -133,6 +158,43 @@ class FuncaoReadWithRelations(FuncaoRead):
     contagem: ContagemRead
     fator_ajuste: FatorAjusteRead
 
+# Edição em lote das funções de uma contagem (POST /api/funcoes/contagem/{id}/lote)
+class FuncaoLoteCriar(SQLModel):
+    modulo: str
+    funcionalidade: str
+    nome: str
+    tipo_funcao: TipoFuncaoEnum
+    qtd_der: int
+    qtd_rlr: int
+    qtd_inm: int = 0
+    desc_der: Optional[str] = None
+    desc_rlr: Optional[str] = None
+    insumos: Optional[str] = None
+    observacoes: Optional[str] = None
+    fator_ajuste_id: int
+    sistema_id: Optional[int] = None
+
+class FuncaoLoteAlterar(SQLModel):
+    id: int
+    modulo: Optional[str] = None
+    funcionalidade: Optional[str] = None
+    nome: Optional[str] = None
+    tipo_funcao: Optional[TipoFuncaoEnum] = None
+    qtd_der: Optional[int] = None
+    qtd_rlr: Optional[int] = None
+    qtd_inm: Optional[int] = None
+    desc_der: Optional[str] = None
+    desc_rlr: Optional[str] = None
+    insumos: Optional[str] = None
+    observacoes: Optional[str] = None
+    fator_ajuste_id: Optional[int] = None
+    sistema_id: Optional[int] = None
+
+class FuncaoLote(SQLModel):
+    criar: List[FuncaoLoteCriar] = []
+    alterar: List[FuncaoLoteAlterar] = []
+    excluir: List[int] = []
+
 # --- Schemas para Sistema ---
 
 class SistemaBase(SQLModel):
@@ -151,3 +213,7 @@ class SistemaUpdate(SQLModel):
 
 class SistemaReadWithProjeto(SistemaRead):
     projeto: ProjetoReadWithCliente
+
+
+# Resolve a referência adiante para SistemaRead, declarado depois de ContagemReadWithRelations
+ContagemReadWithRelations.model_rebuild()
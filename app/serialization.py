@@ -0,0 +1,142 @@
+# app/serialization.py
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, Optional, get_args, get_origin
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# numpy é serializado nativamente pelo orjson; NaN/Infinity viram null
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def orjson_default(obj: Any) -> Any:
+    """
+    Converte os tipos que o orjson não conhece: Decimal, pandas.Timestamp,
+    pandas.NA, escalares numpy fora do padrão e conjuntos.
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # Antes do isoformat: pd.NaT também tem isoformat() (retornaria "NaT")
+    if type(obj).__name__ in ("NAType", "NaTType"):
+        return None
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "item"):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+class FastORJSONResponse(ORJSONResponse):
+    """
+    Resposta JSON serializada direto com orjson, aceitando valores vindos do
+    pandas/numpy (inclusive NaN), Decimal e datetime.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _plano_campos(schema: type) -> tuple:
+    """
+    Lista (nome, schema aninhado, é_lista) dos campos de um schema, calculada
+    uma única vez por schema.
+    """
+    plano = []
+    for nome, campo in schema.model_fields.items():
+        anotacao = campo.annotation
+        eh_lista = get_origin(anotacao) in (list, tuple)
+        candidatos = get_args(anotacao) or (anotacao,)
+        if eh_lista:
+            candidatos = get_args(candidatos[0]) or candidatos
+        aninhado = next(
+            (c for c in candidatos if isinstance(c, type) and issubclass(c, BaseModel)),
+            None,
+        )
+        plano.append((nome, aninhado, eh_lista))
+    return tuple(plano)
+
+
+def para_dict(obj: Any, schema: type) -> Optional[dict]:
+    """
+    Monta o dicionário de saída de `obj` (objeto ORM, linha ou mapeamento)
+    seguindo os campos do schema, sem a validação item a item do pydantic.
+    """
+    if obj is None:
+        return None
+    ler = obj.get if isinstance(obj, dict) else lambda nome: getattr(obj, nome, None)
+    saida = {}
+    for nome, aninhado, eh_lista in _plano_campos(schema):
+        valor = ler(nome)
+        if aninhado is not None and valor is not None:
+            if eh_lista:
+                valor = [para_dict(item, aninhado) for item in valor]
+            else:
+                valor = para_dict(valor, aninhado)
+        saida[nome] = valor
+    return saida
+
+
+def resposta_lista(itens: Iterable[Any], schema: type, status_code: int = 200) -> FastORJSONResponse:
+    """
+    Caminho rápido para endpoints de listagem: converte os itens seguindo o
+    schema e gera os bytes com orjson. A rota continua declarando
+    `response_model`, então o contrato do OpenAPI não muda.
+    """
+    return FastORJSONResponse(
+        content=[para_dict(item, schema) for item in itens],
+        status_code=status_code,
+    )
+
+
+def aninhar(linha: Any) -> dict:
+    """
+    Converte uma linha de consulta com rótulos "relacao__campo" em um
+    dicionário aninhado. Relações cujos campos são todos nulos (OUTER JOIN
+    sem correspondência) viram None.
+    """
+    mapping = getattr(linha, "_mapping", linha)
+    saida = {}
+    for chave, valor in mapping.items():
+        if "__" not in chave:
+            saida[chave] = valor
+            continue
+        *caminho, campo = _dividir_rotulo(chave)
+        destino = saida
+        for parte in caminho:
+            destino = destino.setdefault(parte, {})
+        destino[campo] = valor
+    return _anular_vazios(saida)
+
+
+@lru_cache(maxsize=1024)
+def _dividir_rotulo(chave: str) -> tuple:
+    return tuple(chave.split("__"))
+
+
+def _anular_vazios(saida: dict) -> dict:
+    for chave, valor in saida.items():
+        if isinstance(valor, dict):
+            valor = _anular_vazios(valor)
+            saida[chave] = valor if any(v is not None for v in valor.values()) else None
+    return saida
+
+
+def resposta_linhas(linhas: Iterable[Any], status_code: int = 200) -> FastORJSONResponse:
+    """
+    Caminho rápido para consultas que já projetam exatamente as colunas do
+    schema de resposta (ver app.queries): só aninha e serializa.
+    """
+    return FastORJSONResponse(
+        content=[aninhar(linha) for linha in linhas],
+        status_code=status_code,
+    )
@@ -0,0 +1,196 @@
+# app/services/busca.py
+#
+# Busca textual nas funções de todas as contagens (nome, descrições de DER e
+# RLR, insumos e observações), com filtros por cliente, projeto, sistema e
+# contagem.
+#
+# No PostgreSQL a busca usa a coluna gerada `funcao.busca` (tsvector em
+# português com pesos, índice GIN; ver app.models.BUSCA_FUNCAO_SQL): a
+# consulta do usuário passa por websearch_to_tsquery (aceita "frases entre
+# aspas", OR e -exclusão), o casamento sai do índice e a relevância é o
+# ts_rank_cd. O trecho destacado (ts_headline, o passo mais caro) é gerado só
+# para as funções da página. O total é contado até BUSCA_LIMITE_TOTAL, para
+# termos muito comuns não exigirem a contagem de milhões de linhas.
+#
+# Nos demais bancos (SQLite local) cada termo vira um ILIKE nas colunas de
+# texto, sem relevância; o trecho é montado em Python com a mesma marcação.
+
+import html
+import os
+import re
+from typing import List, Optional
+
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Cliente, Contagem, Funcao, Projeto
+
+LIMITE_TOTAL = int(os.getenv("BUSCA_LIMITE_TOTAL", "10000"))
+
+# Configuração textual como literal: o asyncpg tiparia um parâmetro como VARCHAR
+_CONFIG = literal_column("'portuguese'::regconfig")
+_BUSCA = literal_column("funcao.busca", TSVECTOR)
+MARCA_INICIO, MARCA_FIM = "<mark>", "</mark>"
+_OPCOES_TRECHO = (
+    f"StartSel={MARCA_INICIO}, StopSel={MARCA_FIM}, "
+    "MaxFragments=3, MinWords=5, MaxWords=20, FragmentDelimiter=\" … \""
+)
+CAMPOS_TEXTO = ("desc_der", "desc_rlr", "insumos", "observacoes")
+_JANELA_TRECHO = 80
+
+
+def _texto_funcao():
+    """Descrições da função em um só texto, já escapado (o trecho só leva <mark> como marcação)."""
+    texto = literal_column("''")
+    for indice, campo in enumerate(CAMPOS_TEXTO):
+        if indice:
+            texto = texto + " … "
+        texto = texto + func.coalesce(getattr(Funcao, campo), "")
+    for original, escapado in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;")):
+        texto = func.replace(texto, original, escapado)
+    return texto
+
+
+def _com_filtros(query, cliente_id, projeto_id, sistema_id, contagem_id):
+    query = query.join(Contagem, Contagem.id == Funcao.contagem_id)
+    if cliente_id:
+        query = query.where(Contagem.cliente_id == cliente_id)
+    if projeto_id:
+        query = query.where(Contagem.projeto_id == projeto_id)
+    if sistema_id:
+        # Funções sem sistema próprio ficam com o sistema da contagem
+        query = query.where(func.coalesce(Funcao.sistema_id, Contagem.sistema_id) == sistema_id)
+    if contagem_id:
+        query = query.where(Funcao.contagem_id == contagem_id)
+    return query
+
+
+def _colunas_resultado():
+    return (
+        Funcao.id, Funcao.modulo, Funcao.funcionalidade, Funcao.nome, Funcao.tipo_funcao,
+        Funcao.contagem_id, Funcao.sistema_id,
+        Contagem.id.label("contagem__id"), Contagem.descricao.label("contagem__descricao"),
+        Cliente.id.label("cliente__id"), Cliente.nome.label("cliente__nome"),
+        Projeto.id.label("projeto__id"), Projeto.nome.label("projeto__nome"),
+    )
+
+
+def _termos(q: str) -> tuple:
+    """(termos exigidos, termos excluídos com -) para a busca sem tsvector; OR é ignorado."""
+    exigidos, excluidos = [], []
+    for termo in re.split(r"\s+", q.replace('"', " ")):
+        if termo.startswith("-"):
+            if termo[1:]:
+                excluidos.append(termo[1:])
+        elif termo and termo.upper() != "OR":
+            exigidos.append(termo)
+    return exigidos, excluidos
+
+
+def trecho_destacado(funcao: dict, termos: List[str]) -> Optional[str]:
+    """Trecho da primeira descrição que contém algum termo, escapado e com os termos em <mark>."""
+    padrao = re.compile("|".join(re.escape(termo) for termo in termos), re.IGNORECASE)
+    for campo in CAMPOS_TEXTO:
+        texto = funcao.get(campo) or ""
+        achado = padrao.search(texto)
+        if not achado:
+            continue
+        inicio = max(achado.start() - _JANELA_TRECHO, 0)
+        fim = min(achado.end() + _JANELA_TRECHO, len(texto))
+        trecho = texto[inicio:fim]
+        # Escapa antes de marcar, trecho a trecho (a marcação não pode ser escapada)
+        partes, posicao = ["… " if inicio else ""], 0
+        for encontrado in padrao.finditer(trecho):
+            partes.append(html.escape(trecho[posicao:encontrado.start()], quote=False))
+            partes.append(f"{MARCA_INICIO}{html.escape(encontrado.group(0), quote=False)}{MARCA_FIM}")
+            posicao = encontrado.end()
+        partes.append(html.escape(trecho[posicao:], quote=False))
+        partes.append(" …" if fim < len(texto) else "")
+        return "".join(partes)
+    return None
+
+
+async def _total(session: AsyncSession, filtrada) -> tuple:
+    """(total, exato): conta no máximo LIMITE_TOTAL + 1 funções."""
+    amostra = filtrada.with_only_columns(Funcao.id).order_by(None).limit(LIMITE_TOTAL + 1).subquery()
+    total = (await session.execute(select(func.count()).select_from(amostra))).scalar_one()
+    return min(total, LIMITE_TOTAL), total <= LIMITE_TOTAL
+
+
+async def buscar_funcoes(
+    session: AsyncSession,
+    q: str,
+    cliente_id: Optional[int] = None,
+    projeto_id: Optional[int] = None,
+    sistema_id: Optional[int] = None,
+    contagem_id: Optional[int] = None,
+    pagina: int = 1,
+    tamanho: int = 50,
+) -> dict:
+    """Uma página das funções encontradas, das mais relevantes para as menos, com o total."""
+    filtros = (cliente_id, projeto_id, sistema_id, contagem_id)
+    postgresql = session.get_bind().dialect.name == "postgresql"
+
+    if postgresql:
+        consulta = func.websearch_to_tsquery(_CONFIG, q)
+        relevancia = func.ts_rank_cd(_BUSCA, consulta)
+        filtrada = _com_filtros(select(Funcao.id).where(_BUSCA.op("@@")(consulta)), *filtros)
+        pagina_ids = (
+            filtrada.add_columns(relevancia.label("relevancia"))
+            .order_by(relevancia.desc(), Funcao.id)
+            .limit(tamanho)
+            .offset((pagina - 1) * tamanho)
+            .subquery("pagina")
+        )
+        # Segunda etapa só com as funções da página: colunas de exibição e ts_headline
+        query = (
+            select(
+                *_colunas_resultado(),
+                pagina_ids.c.relevancia,
+                func.ts_headline(_CONFIG, _texto_funcao(), consulta, _OPCOES_TRECHO).label("trecho"),
+            )
+            .select_from(pagina_ids)
+            .join(Funcao, Funcao.id == pagina_ids.c.id)
+            .join(Contagem, Contagem.id == Funcao.contagem_id)
+            .join(Cliente, Cliente.id == Contagem.cliente_id)
+            .join(Projeto, Projeto.id == Contagem.projeto_id)
+            .order_by(pagina_ids.c.relevancia.desc(), Funcao.id)
+        )
+        itens = [dict(linha._mapping) for linha in (await session.execute(query)).all()]
+    else:
+        termos, excluidos = _termos(q)
+        filtrada = _com_filtros(select(Funcao.id), *filtros)
+        for termo in termos:
+            filtrada = filtrada.where(
+                or_(*(getattr(Funcao, campo).ilike(f"%{termo}%") for campo in ("nome", *CAMPOS_TEXTO)))
+            )
+        for termo in excluidos:
+            filtrada = filtrada.where(
+                *(func.coalesce(getattr(Funcao, campo), "").not_ilike(f"%{termo}%") for campo in ("nome", *CAMPOS_TEXTO))
+            )
+        query = (
+            filtrada.with_only_columns(*_colunas_resultado(), *(getattr(Funcao, campo) for campo in CAMPOS_TEXTO))
+            .join(Cliente, Cliente.id == Contagem.cliente_id)
+            .join(Projeto, Projeto.id == Contagem.projeto_id)
+            .order_by(Funcao.id)
+            .limit(tamanho)
+            .offset((pagina - 1) * tamanho)
+        )
+        itens = []
+        for linha in (await session.execute(query)).all():
+            item = dict(linha._mapping)
+            textos = {campo: item.pop(campo) for campo in CAMPOS_TEXTO}
+            item["relevancia"] = None
+            item["trecho"] = trecho_destacado(textos, termos) if termos else None
+            itens.append(item)
+
+    total, exato = await _total(session, filtrada)
+    return {
+        "q": q,
+        "total": total,
+        "total_exato": exato,
+        "pagina": pagina,
+        "tamanho": tamanho,
+        "itens": itens,
+    }
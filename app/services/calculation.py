@@ -58,6 +58,51 @@ def _calcular_complexidade_se(qtd_rlr: int, qtd_der: int) -> str:
     return "N/A"
 
 
+# Pesos do PF Bruto por tipo e complexidade
+PESOS = {
+    "ALI": {"Baixa": 7, "Média": 10, "Alta": 15},
+    "AIE": {"Baixa": 5, "Média": 7, "Alta": 10},
+    "EE":  {"Baixa": 3, "Média": 4, "Alta": 6},
+    "CE":  {"Baixa": 3, "Média": 4, "Alta": 6},
+    "SE":  {"Baixa": 4, "Média": 5, "Alta": 7},
+}
+
+# Contagem estimada: funções de dados valem Baixa e transações, Média
+COMPLEXIDADE_ESTIMADA = {"ALI": "Baixa", "AIE": "Baixa", "EE": "Média", "CE": "Média", "SE": "Média"}
+
+
+def calcular_complexidade(tipo: str, qtd_rlr: int, qtd_der: int) -> str:
+    if tipo in ["ALI", "AIE"]:
+        return _calcular_complexidade_ali(qtd_rlr, qtd_der)
+    if tipo == "EE":
+        return _calcular_complexidade_ee_ce(qtd_rlr, qtd_der)
+    if tipo == "CE":
+        return _calcular_complexidade_ee_ce(qtd_rlr, qtd_der) # Usa a mesma matriz de EE
+    if tipo == "SE":
+        return _calcular_complexidade_se(qtd_rlr, qtd_der)
+    return "N/A"
+
+
+def complexidade_por_matriz(matriz: dict, qtd_rlr: int, qtd_der: int) -> str:
+    """
+    Complexidade por uma matriz alternativa: {"rlr": [limites inferiores das
+    faixas], "der": [...], "tabela": [[complexidade por faixa de DER], ...]}.
+    Valores abaixo da primeira faixa não têm complexidade (N/A).
+    """
+    faixa_rlr = sum(1 for limite in matriz["rlr"] if qtd_rlr >= limite) - 1
+    faixa_der = sum(1 for limite in matriz["der"] if qtd_der >= limite) - 1
+    if faixa_rlr < 0 or faixa_der < 0:
+        return "N/A"
+    return matriz["tabela"][faixa_rlr][faixa_der]
+
+
+def aplicar_fator(pf_bruto: float, fator_ajuste: float) -> float:
+    # Arredondamento bancário (duas casas decimais)
+    return float(
+        Decimal(pf_bruto * fator_ajuste).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    )
+
+
 def calcular_pontos_de_funcao(linha_funcao: dict) -> dict:
     """
     Calcula Complexidade, PF Bruto e PF Líquido para uma única função.
@@ -68,29 +113,11 @@ def calcular_pontos_de_funcao(linha_funcao: dict) -> dict:
     qtd_rlr = int(linha_funcao.get("qtd_rlr", 0))
     fator_ajuste = float(linha_funcao.get("fator_ajuste", 1.0))
 
-    complexidade = "N/A"
+    complexidade = calcular_complexidade(tipo, qtd_rlr, qtd_der)
     pf_bruto = 0
 
-    # Pesos do PF Bruto por tipo e complexidade
-    pesos = {
-        "ALI": {"Baixa": 7, "Média": 10, "Alta": 15},
-        "AIE": {"Baixa": 5, "Média": 7, "Alta": 10},
-        "EE":  {"Baixa": 3, "Média": 4, "Alta": 6},
-        "CE":  {"Baixa": 3, "Média": 4, "Alta": 6},
-        "SE":  {"Baixa": 4, "Média": 5, "Alta": 7},
-    }
-
-    if tipo in ["ALI", "AIE"]:
-        complexidade = _calcular_complexidade_ali(qtd_rlr, qtd_der)
-    elif tipo == "EE":
-        complexidade = _calcular_complexidade_ee_ce(qtd_rlr, qtd_der)
-    elif tipo == "CE":
-        complexidade = _calcular_complexidade_ee_ce(qtd_rlr, qtd_der) # Usa a mesma matriz de EE
-    elif tipo == "SE":
-        complexidade = _calcular_complexidade_se(qtd_rlr, qtd_der)
-    
-    if tipo in pesos and complexidade in pesos[tipo]:
-        pf_bruto = pesos[tipo][complexidade]
+    if tipo in PESOS and complexidade in PESOS[tipo]:
+        pf_bruto = PESOS[tipo][complexidade]
 
     # Caso especial para INM
     if tipo == "INM":
@@ -100,13 +127,22 @@ def calcular_pontos_de_funcao(linha_funcao: dict) -> dict:
         pf_liquido = pf_bruto
         complexidade = "N/A"
     else:
-        # Arredondamento bancário (duas casas decimais)
-        pf_liquido = float(
-            Decimal(pf_bruto * fator_ajuste).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        )
+        pf_liquido = aplicar_fator(pf_bruto, fator_ajuste)
 
     linha_funcao["complexidade"] = complexidade
     linha_funcao["ponto_de_funcao_bruto"] = pf_bruto
     linha_funcao["ponto_de_funcao_liquido"] = pf_liquido
     
-    return linha_funcao
\ No newline at end of file
+    return linha_funcao
+
+
+def calcular_lote(linhas: list, fatores: dict) -> list:
+    """
+    Calcula um lote de funções em uma única passada. `fatores` mapeia
+    fator_ajuste_id -> valor do fator; cada linha recebe complexidade e PFs.
+    """
+    for linha in linhas:
+        linha["fator_ajuste"] = fatores.get(linha.get("fator_ajuste_id"), 1.0)
+        calcular_pontos_de_funcao(linha)
+        del linha["fator_ajuste"]
+    return linhas
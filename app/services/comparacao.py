@@ -0,0 +1,194 @@
+# app/services/comparacao.py
+#
+# Comparação entre duas contagens (baseline x nova) para contagens de
+# Melhoria. As funções são casadas por uma chave de identidade normalizada
+# (módulo, funcionalidade e nome sem espaços nas pontas e em minúsculas, mais
+# o tipo da função) com um FULL OUTER JOIN entre as funções de cada contagem,
+# que o PostgreSQL executa como um hash full join: uma leitura de cada lado,
+# linear no número de funções. O SQLite (banco local de desenvolvimento) não
+# tem hash join nem índice automático sobre CTEs e executa o mesmo comando
+# como um laço aninhado, quadrático: serve para contagens de alguns milhares
+# de funções, não para medir desempenho.
+#
+# A comparação é uma CTE usada duas vezes no mesmo comando (materializada
+# uma única vez): os totais por categoria saem de uma agregação sobre ela e a
+# página de funções, de um ORDER BY/LIMIT sobre ela.
+#
+# A chave identifica a função dentro da contagem; funções repetidas (mesma
+# chave na mesma contagem) são casadas com todas as do outro lado que tenham
+# a mesma chave.
+#
+# Categorias:
+# - incluida: só existe na nova contagem;
+# - excluida: só existe na baseline;
+# - alterada: existe nas duas, com hash de conteúdo (DER, RLR, INM e as
+#   descrições de DER e RLR) diferente;
+# - inalterada: existe nas duas com o mesmo conteúdo.
+
+import enum
+from typing import Optional, Sequence
+
+from sqlalchemy import String, and_, case, cast, func, literal, select, true
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Funcao
+
+# Separador entre os campos do conteúdo (não aparece em texto digitado)
+_SEPARADOR = "\x1f"
+CAMPOS_CONTEUDO = ("qtd_der", "qtd_rlr", "qtd_inm", "desc_der", "desc_rlr")
+CAMPOS_FUNCAO = ("id", "qtd_der", "qtd_rlr", "qtd_inm", "complexidade", "ponto_de_funcao_bruto", "ponto_de_funcao_liquido")
+CAMPOS_IDENTIFICACAO = ("modulo", "funcionalidade", "nome", "tipo_funcao")
+CHAVE = ("k_modulo", "k_funcionalidade", "k_nome", "k_tipo")
+_PREFIXO_TOTAIS = "totais__"
+
+
+class CategoriaComparacao(str, enum.Enum):
+    INCLUIDA = "incluida"
+    ALTERADA = "alterada"
+    EXCLUIDA = "excluida"
+    INALTERADA = "inalterada"
+
+
+class hash_conteudo(FunctionElement):
+    """Hash do texto do conteúdo: md5 no PostgreSQL; o próprio texto nos demais bancos."""
+    type = String()
+    inherit_cache = True
+
+
+@compiles(hash_conteudo)
+def _hash_generico(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(hash_conteudo, "postgresql")
+def _hash_postgresql(element, compiler, **kw):
+    return f"md5({compiler.process(element.clauses, **kw)})"
+
+
+def _normalizar(coluna):
+    return func.lower(func.trim(coluna))
+
+
+def _funcoes(contagem_id: int, nome: str):
+    """Funções de uma contagem com a chave normalizada e o hash do conteúdo."""
+    conteudo = literal("")
+    for campo in CAMPOS_CONTEUDO:
+        conteudo = conteudo + func.coalesce(cast(getattr(Funcao, campo), String), "") + _SEPARADOR
+    return (
+        select(
+            _normalizar(Funcao.modulo).label("k_modulo"),
+            _normalizar(Funcao.funcionalidade).label("k_funcionalidade"),
+            _normalizar(Funcao.nome).label("k_nome"),
+            Funcao.tipo_funcao.label("k_tipo"),
+            hash_conteudo(conteudo).label("hash"),
+            *(getattr(Funcao, campo) for campo in CAMPOS_IDENTIFICACAO),
+            *(getattr(Funcao, campo) for campo in CAMPOS_FUNCAO),
+        )
+        .where(Funcao.contagem_id == contagem_id)
+        .cte(nome)
+    )
+
+
+def select_comparacao(base_id: int, nova_id: int):
+    """CTE com uma linha por par casado ou função sem par, com a categoria e os dois lados."""
+    base = _funcoes(base_id, "base")
+    nova = _funcoes(nova_id, "nova")
+
+    categoria = case(
+        (base.c.id.is_(None), CategoriaComparacao.INCLUIDA.value),
+        (nova.c.id.is_(None), CategoriaComparacao.EXCLUIDA.value),
+        (base.c.hash != nova.c.hash, CategoriaComparacao.ALTERADA.value),
+        else_=CategoriaComparacao.INALTERADA.value,
+    )
+    # Identificação: da nova contagem quando existir (o texto atual), senão da baseline
+    return (
+        select(
+            categoria.label("categoria"),
+            *(func.coalesce(nova.c[campo], base.c[campo]).label(campo) for campo in CAMPOS_IDENTIFICACAO),
+            *(base.c[campo].label(f"base__{campo}") for campo in CAMPOS_FUNCAO),
+            *(nova.c[campo].label(f"nova__{campo}") for campo in CAMPOS_FUNCAO),
+        )
+        .select_from(
+            base.join(nova, and_(*(base.c[chave] == nova.c[chave] for chave in CHAVE)), full=True)
+        )
+        .cte("comparacao")
+    )
+
+
+def _metricas_totais(comparacao):
+    """Uma coluna por (categoria, métrica): os totais cabem em uma única linha."""
+    colunas = []
+    for categoria in CategoriaComparacao:
+        da_categoria = comparacao.c.categoria == categoria.value
+
+        def somar(coluna):
+            return func.coalesce(func.sum(case((da_categoria, coluna))), 0)
+
+        prefixo = f"{_PREFIXO_TOTAIS}{categoria.value}__"
+        colunas += [
+            func.count(case((da_categoria, 1))).label(f"{prefixo}funcoes"),
+            somar(comparacao.c.base__ponto_de_funcao_bruto).label(f"{prefixo}pf_bruto_base"),
+            somar(comparacao.c.nova__ponto_de_funcao_bruto).label(f"{prefixo}pf_bruto_nova"),
+            somar(comparacao.c.base__ponto_de_funcao_liquido).label(f"{prefixo}pf_liquido_base"),
+            somar(comparacao.c.nova__ponto_de_funcao_liquido).label(f"{prefixo}pf_liquido_nova"),
+        ]
+    return colunas
+
+
+async def comparar(
+    session: AsyncSession,
+    base_id: int,
+    nova_id: int,
+    categorias: Optional[Sequence[CategoriaComparacao]] = None,
+    pagina: int = 1,
+    tamanho: int = 100,
+) -> dict:
+    """Totais por categoria (funções e PFs de cada lado) e uma página das funções."""
+    comparacao = select_comparacao(base_id, nova_id)
+    totais = select(*_metricas_totais(comparacao)).cte("totais")
+
+    pagina_query = select(comparacao)
+    valores = [c.value for c in categorias] if categorias else [c.value for c in CategoriaComparacao]
+    if categorias:
+        pagina_query = pagina_query.where(comparacao.c.categoria.in_(valores))
+    ordem = (
+        "modulo", "funcionalidade", "nome", "tipo_funcao", "base__id", "nova__id",
+    )
+    pagina_cte = (
+        pagina_query.order_by(*(comparacao.c[coluna] for coluna in ordem))
+        .limit(tamanho)
+        .offset((pagina - 1) * tamanho)
+        .cte("pagina")
+    )
+    # Os totais (sempre uma linha) à esquerda: a página vazia ainda traz os totais
+    query = (
+        select(totais, pagina_cte)
+        .select_from(totais.outerjoin(pagina_cte, true()))
+        .order_by(*(pagina_cte.c[coluna] for coluna in ordem))
+    )
+    linhas = [dict(linha._mapping) for linha in (await session.execute(query)).all()]
+
+    resumo = {}
+    for chave, valor in linhas[0].items():
+        if chave.startswith(_PREFIXO_TOTAIS):
+            categoria, metrica = chave[len(_PREFIXO_TOTAIS):].split("__")
+            if metrica.startswith("pf_liquido"):
+                valor = round(float(valor), 2)
+            resumo.setdefault(categoria, {})[metrica] = valor
+    itens = [
+        {chave: valor for chave, valor in linha.items() if not chave.startswith(_PREFIXO_TOTAIS)}
+        for linha in linhas
+        if linha["categoria"] is not None
+    ]
+
+    return {
+        "base_id": base_id,
+        "nova_id": nova_id,
+        "totais": resumo,
+        "total": sum(resumo[valor]["funcoes"] for valor in valores),
+        "pagina": pagina,
+        "tamanho": tamanho,
+        "itens": itens,
+    }
@@ -0,0 +1,132 @@
+# app/services/edicao_lote.py
+#
+# Edição em lote das funções de uma contagem: inclusões, alterações parciais
+# e exclusões aplicadas em uma transação, com comandos de várias linhas
+# (um DELETE ... IN, um UPDATE executemany por chave primária e um INSERT de
+# várias linhas com RETURNING). O cálculo de complexidade e PFs roda uma vez
+# sobre todas as funções incluídas e alteradas do lote.
+
+import enum
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.invalidacao import invalidar
+from app.models import FatorAjuste, Funcao, Sistema
+from app.schemas import FuncaoLote
+from app.services import calculation
+
+# Funções por lote (inclusões + alterações + exclusões)
+MAX_LOTE = 10000
+
+# Colunas gravadas a partir do lote (as demais são calculadas ou fixas)
+CAMPOS_EDITAVEIS = (
+    "modulo", "funcionalidade", "nome", "tipo_funcao", "qtd_der", "qtd_rlr", "qtd_inm",
+    "desc_der", "desc_rlr", "insumos", "observacoes", "fator_ajuste_id", "sistema_id",
+)
+
+
+class LoteInvalido(ValueError):
+    """Lote que referencia funções, fatores ou sistemas inexistentes."""
+
+
+def _valor(valor):
+    # O cálculo compara o tipo da função com strings ("ALI", "EE", ...)
+    return valor.value if isinstance(valor, enum.Enum) else valor
+
+
+async def _ids_existentes(session: AsyncSession, coluna, ids: set) -> set:
+    if not ids:
+        return set()
+    return set((await session.execute(select(coluna).where(coluna.in_(ids)))).scalars().all())
+
+
+async def totais_contagem(session: AsyncSession, contagem_id: int) -> dict:
+    linha = (
+        await session.execute(
+            select(
+                func.count().label("funcoes"),
+                func.coalesce(func.sum(Funcao.ponto_de_funcao_bruto), 0).label("pf_bruto"),
+                func.coalesce(func.sum(Funcao.ponto_de_funcao_liquido), 0).label("pf_liquido"),
+            ).where(Funcao.contagem_id == contagem_id)
+        )
+    ).one()
+    return {"funcoes": linha.funcoes, "pf_bruto": linha.pf_bruto, "pf_liquido": round(float(linha.pf_liquido), 2)}
+
+
+async def aplicar_lote(session: AsyncSession, contagem_id: int, lote: FuncaoLote) -> dict:
+    """
+    Aplica o lote e faz o commit. Retorna as funções incluídas e alteradas (já
+    recalculadas), a quantidade excluída e os novos totais da contagem.
+    """
+    tamanho = len(lote.criar) + len(lote.alterar) + len(lote.excluir)
+    if tamanho > MAX_LOTE:
+        raise LoteInvalido(f"O lote tem {tamanho} funções; o máximo é {MAX_LOTE}.")
+
+    tabela = Funcao.__table__
+    ids_alterar = [item.id for item in lote.alterar]
+    if len(set(ids_alterar)) != len(ids_alterar):
+        raise LoteInvalido("Uma função aparece mais de uma vez em 'alterar'.")
+    if set(ids_alterar) & set(lote.excluir):
+        raise LoteInvalido("Uma função não pode ser alterada e excluída no mesmo lote.")
+
+    # Estado atual das funções alteradas (e confirmação de que são da contagem)
+    atuais = {}
+    referenciadas = set(ids_alterar) | set(lote.excluir)
+    if referenciadas:
+        resultado = await session.execute(
+            select(tabela).where(tabela.c.id.in_(referenciadas), tabela.c.contagem_id == contagem_id)
+        )
+        atuais = {linha.id: dict(linha._mapping) for linha in resultado}
+        ausentes = sorted(referenciadas - set(atuais))
+        if ausentes:
+            raise LoteInvalido(f"Funções não encontradas na contagem {contagem_id}: {ausentes}")
+
+    novas = [{**item.model_dump(), "contagem_id": contagem_id} for item in lote.criar]
+    alteradas = []
+    for item in lote.alterar:
+        linha = {campo: atuais[item.id][campo] for campo in ("id", *CAMPOS_EDITAVEIS)}
+        linha.update(item.model_dump(exclude_unset=True))
+        alteradas.append(linha)
+    linhas = novas + alteradas
+    for linha in linhas:
+        linha["tipo_funcao"] = _valor(linha["tipo_funcao"])
+
+    # Fatores e sistemas referenciados, verificados com uma consulta cada
+    ids_fatores = {linha["fator_ajuste_id"] for linha in linhas}
+    fatores = dict(
+        (await session.execute(select(FatorAjuste.id, FatorAjuste.fator).where(FatorAjuste.id.in_(ids_fatores)))).all()
+    ) if ids_fatores else {}
+    if ids_fatores - set(fatores):
+        raise LoteInvalido(f"Fatores de ajuste inexistentes: {sorted(ids_fatores - set(fatores))}")
+    ids_sistemas = {linha["sistema_id"] for linha in linhas if linha.get("sistema_id") is not None}
+    sistemas = await _ids_existentes(session, Sistema.id, ids_sistemas)
+    if ids_sistemas - sistemas:
+        raise LoteInvalido(f"Sistemas inexistentes: {sorted(ids_sistemas - sistemas)}")
+
+    calculation.calcular_lote(linhas, fatores)
+
+    if lote.excluir:
+        await session.execute(
+            delete(tabela).where(tabela.c.id.in_(lote.excluir), tabela.c.contagem_id == contagem_id)
+        )
+    if alteradas:
+        # executemany por chave primária (todas as linhas com as mesmas colunas)
+        await session.execute(update(Funcao), alteradas)
+    criadas = []
+    if novas:
+        resultado = await session.execute(
+            insert(Funcao).returning(*tabela.c, sort_by_parameter_order=True), novas
+        )
+        criadas = [dict(linha._mapping) for linha in resultado]
+
+    totais = await totais_contagem(session, contagem_id)
+    await session.commit()
+    invalidar("funcao")
+
+    return {
+        "criadas": criadas,
+        "alteradas": [{**atuais[linha["id"]], **linha} for linha in alteradas],
+        "excluidas": len(lote.excluir),
+        "totais": totais,
+    }
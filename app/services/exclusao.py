@@ -0,0 +1,249 @@
+# app/services/exclusao.py
+#
+# Exclusão de contagens, sistemas, projetos e clientes com comandos em
+# conjunto (DELETE/UPDATE ... WHERE ... IN (subconsulta)), sem carregar os
+# objetos na sessão: uma contagem com 50 mil funções sai com um único DELETE
+# em funcao e outro em contagem. Os mesmos efeitos estão declarados no banco
+# (ON DELETE CASCADE / SET NULL, migração 5e2a7c91d4b3), mas os comandos
+# explícitos não dependem da migração e informam quantas funções saíram.
+#
+# A exclusão síncrona acontece em uma transação; os caches derivados das
+# tabelas afetadas são invalidados logo após o commit (app.invalidacao).
+#
+# Exclusões com mais de EXCLUSAO_LIMITE_SINCRONO funções viram uma tarefa em
+# segundo plano e NÃO são atômicas: as funções saem em lotes de EXCLUSAO_LOTE,
+# cada lote na sua própria transação (os bloqueios duram um lote e o
+# progresso em /api/exclusoes/{id} é o que já está gravado). Só depois do
+# último lote os demais comandos (contagens, sistemas, projetos, cliente)
+# rodam, juntos, em uma transação final. Enquanto a tarefa roda, as
+# contagens ainda existem com parte das funções; se ela falhar no meio, as
+# funções já apagadas não voltam, e repetir a exclusão termina o trabalho
+# (o plano é o mesmo). O registro de tarefas é por processo: com vários
+# workers, consulte o worker que a criou.
+
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import Callable, Optional
+
+from loguru import logger
+from sqlalchemy import delete, func, or_, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.invalidacao import invalidar
+from app.models import Cliente, Contagem, Funcao, Projeto, Sistema
+
+LIMITE_SINCRONO = int(os.getenv("EXCLUSAO_LIMITE_SINCRONO", "100000"))
+TAMANHO_LOTE = int(os.getenv("EXCLUSAO_LOTE", "10000"))
+# Tarefas concluídas mantidas para consulta
+MAX_TAREFAS = 100
+
+# Sem sincronizar a sessão: nada do que é apagado está carregado nela
+_SEM_SINCRONIZAR = {"synchronize_session": False}
+
+
+class PlanoExclusao:
+    """Filtro das funções a apagar e os demais comandos, na ordem de execução."""
+
+    __slots__ = ("filtro_funcoes", "comandos", "tabelas")
+
+    def __init__(self, filtro_funcoes, comandos: list, tabelas: tuple):
+        self.filtro_funcoes = filtro_funcoes
+        self.comandos = comandos
+        self.tabelas = tabelas
+
+
+def planejar(alvo: str, alvo_id: int) -> PlanoExclusao:
+    contagens = sistemas = projetos = None
+    if alvo == "contagem":
+        contagens = select(Contagem.id).where(Contagem.id == alvo_id)
+    elif alvo == "sistema":
+        sistemas = select(Sistema.id).where(Sistema.id == alvo_id)
+    elif alvo == "projeto":
+        contagens = select(Contagem.id).where(Contagem.projeto_id == alvo_id)
+        sistemas = select(Sistema.id).where(Sistema.projeto_id == alvo_id)
+        projetos = select(Projeto.id).where(Projeto.id == alvo_id)
+    elif alvo == "cliente":
+        projetos = select(Projeto.id).where(Projeto.cliente_id == alvo_id)
+        contagens = select(Contagem.id).where(
+            or_(Contagem.cliente_id == alvo_id, Contagem.projeto_id.in_(projetos))
+        )
+        sistemas = select(Sistema.id).where(Sistema.projeto_id.in_(projetos))
+    else:
+        raise ValueError(f"Entidade sem exclusão em conjunto: {alvo!r}")
+
+    comandos = []
+    tabelas = []
+    if sistemas is not None:
+        # Funções e contagens de outros projetos que apontam para os sistemas
+        comandos.append(update(Funcao).where(Funcao.sistema_id.in_(sistemas)).values(sistema_id=None))
+        comandos.append(update(Contagem).where(Contagem.sistema_id.in_(sistemas)).values(sistema_id=None))
+    if contagens is not None:
+        comandos.append(delete(Contagem).where(Contagem.id.in_(contagens)))
+        tabelas += ["funcao", "contagem"]
+    if sistemas is not None:
+        comandos.append(delete(Sistema).where(Sistema.id.in_(sistemas)))
+        tabelas.append("sistema")
+    if projetos is not None:
+        comandos.append(delete(Projeto).where(Projeto.id.in_(projetos)))
+        tabelas.append("projeto")
+    if alvo == "cliente":
+        comandos.append(delete(Cliente).where(Cliente.id == alvo_id))
+        tabelas.append("cliente")
+
+    filtro = Funcao.contagem_id.in_(contagens) if contagens is not None else None
+    return PlanoExclusao(filtro, comandos, tuple(tabelas))
+
+
+async def contar_funcoes(session: AsyncSession, plano: PlanoExclusao) -> int:
+    if plano.filtro_funcoes is None:
+        return 0
+    return (
+        await session.execute(select(func.count()).select_from(Funcao).where(plano.filtro_funcoes))
+    ).scalar_one()
+
+
+async def executar(
+    session: AsyncSession,
+    plano: PlanoExclusao,
+    lote: Optional[int] = None,
+    progresso: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Executa o plano e faz o commit; retorna o número de funções apagadas.
+
+    Sem `lote`, tudo vai em uma única transação. Com `lote`, a exclusão não é
+    atômica: as funções saem em DELETEs de até `lote` linhas, com um commit
+    por lote (e `progresso` chamado com o total já gravado); os demais
+    comandos vão na transação do último DELETE, o que não encontra mais
+    funções.
+    """
+    excluidas = 0
+    if plano.filtro_funcoes is not None:
+        if lote:
+            while True:
+                ids = select(Funcao.id).where(plano.filtro_funcoes).limit(lote)
+                resultado = await session.execute(
+                    delete(Funcao).where(Funcao.id.in_(ids)), execution_options=_SEM_SINCRONIZAR
+                )
+                if not resultado.rowcount:
+                    break
+                await session.commit()
+                invalidar("funcao")
+                excluidas += resultado.rowcount
+                if progresso:
+                    progresso(excluidas)
+        else:
+            resultado = await session.execute(
+                delete(Funcao).where(plano.filtro_funcoes), execution_options=_SEM_SINCRONIZAR
+            )
+            excluidas = resultado.rowcount
+    for comando in plano.comandos:
+        await session.execute(comando, execution_options=_SEM_SINCRONIZAR)
+    await session.commit()
+    invalidar(*plano.tabelas)
+    return excluidas
+
+
+# --- Tarefas em segundo plano ---
+
+class TarefaExclusao:
+    __slots__ = ("id", "alvo", "alvo_id", "status", "funcoes_total", "funcoes_excluidas", "erro", "criada_em", "concluida_em")
+
+    def __init__(self, alvo: str, alvo_id: int, funcoes_total: int):
+        self.id = uuid.uuid4().hex
+        self.alvo = alvo
+        self.alvo_id = alvo_id
+        self.status = "pendente"
+        self.funcoes_total = funcoes_total
+        self.funcoes_excluidas = 0
+        self.erro = None
+        self.criada_em = datetime.utcnow()
+        self.concluida_em = None
+
+    def para_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "alvo": self.alvo,
+            "alvo_id": self.alvo_id,
+            "status": self.status,
+            "funcoes_total": self.funcoes_total,
+            "funcoes_excluidas": self.funcoes_excluidas,
+            "percentual": round(100 * self.funcoes_excluidas / self.funcoes_total, 1) if self.funcoes_total else 100.0,
+            "erro": self.erro,
+            "criada_em": self.criada_em,
+            "concluida_em": self.concluida_em,
+            "status_url": f"/api/exclusoes/{self.id}",
+        }
+
+
+class RegistroTarefas:
+    def __init__(self):
+        self.tarefas = {}
+        # Referências às tasks do asyncio (o loop só guarda referências fracas)
+        self._em_execucao = set()
+
+    def obter(self, tarefa_id: str) -> Optional[TarefaExclusao]:
+        return self.tarefas.get(tarefa_id)
+
+    def em_andamento(self, alvo: str, alvo_id: int) -> Optional[TarefaExclusao]:
+        for tarefa in self.tarefas.values():
+            if tarefa.alvo == alvo and tarefa.alvo_id == alvo_id and tarefa.status in ("pendente", "executando"):
+                return tarefa
+        return None
+
+    def agendar(self, alvo: str, alvo_id: int, funcoes_total: int) -> TarefaExclusao:
+        tarefa = TarefaExclusao(alvo, alvo_id, funcoes_total)
+        self.tarefas[tarefa.id] = tarefa
+        self._descartar_antigas()
+        task = asyncio.create_task(_executar_tarefa(tarefa))
+        self._em_execucao.add(task)
+        task.add_done_callback(self._em_execucao.discard)
+        return tarefa
+
+    def _descartar_antigas(self):
+        concluidas = [t.id for t in self.tarefas.values() if t.status in ("concluida", "erro")]
+        for tarefa_id in concluidas[: max(len(self.tarefas) - MAX_TAREFAS, 0)]:
+            del self.tarefas[tarefa_id]
+
+
+REGISTRO_TAREFAS = RegistroTarefas()
+
+
+async def _executar_tarefa(tarefa: TarefaExclusao):
+    # Importado aqui: a sessão da tarefa não é a da requisição que a criou
+    from app.database import async_session
+
+    def progresso(excluidas: int):
+        tarefa.funcoes_excluidas = excluidas
+
+    tarefa.status = "executando"
+    try:
+        async with async_session() as session:
+            await executar(session, planejar(tarefa.alvo, tarefa.alvo_id), lote=TAMANHO_LOTE, progresso=progresso)
+        tarefa.status = "concluida"
+    except Exception as erro:
+        logger.exception("Falha na exclusão de {} {}.", tarefa.alvo, tarefa.alvo_id)
+        tarefa.status = "erro"
+        tarefa.erro = str(erro)
+    tarefa.concluida_em = datetime.utcnow()
+
+
+async def excluir_ou_agendar(session: AsyncSession, alvo: str, alvo_id: int) -> Optional[TarefaExclusao]:
+    """
+    Exclui na hora (retorna None) ou, acima de LIMITE_SINCRONO funções, agenda
+    uma tarefa em segundo plano e a retorna. Uma exclusão já em andamento para
+    o mesmo registro é reaproveitada.
+    """
+    tarefa = REGISTRO_TAREFAS.em_andamento(alvo, alvo_id)
+    if tarefa:
+        return tarefa
+    plano = planejar(alvo, alvo_id)
+    total = await contar_funcoes(session, plano)
+    if total > LIMITE_SINCRONO:
+        # Libera a conexão da requisição antes de a tarefa começar
+        await session.rollback()
+        return REGISTRO_TAREFAS.agendar(alvo, alvo_id, total)
+    await executar(session, plano)
+    return None
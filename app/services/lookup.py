@@ -0,0 +1,128 @@
+# app/services/lookup.py
+#
+# Listas compactas (id, nome) de clientes, projetos e sistemas para os
+# <select> dos formulários, com busca por prefixo (typeahead) e limite. Cada
+# entidade fica em memória como uma lista ordenada pelo nome normalizado
+# (minúsculas, sem acentos), então a busca por prefixo é uma busca binária
+# seguida de uma leitura sequencial de até `limite` itens. Projetos e
+# sistemas também têm um índice por registro pai (cliente e projeto).
+#
+# O índice é carregado com um único SELECT id, nome[, pai] na primeira busca
+# e descartado quando a tabela muda (app.invalidacao) ou após LOOKUP_TTL
+# segundos.
+
+import asyncio
+import os
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.invalidacao import ao_alterar
+from app.models import Cliente, Projeto, Sistema
+
+LOOKUP_TTL = float(os.getenv("LOOKUP_TTL", "600"))
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 200
+
+
+def normalizar(texto: str) -> str:
+    """Chave de busca: sem espaços nas pontas, sem acentos e em minúsculas."""
+    decomposto = unicodedata.normalize("NFKD", texto.strip())
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+class IndiceNomes:
+    """Itens (chave, id, nome) ordenados pela chave, com busca por prefixo."""
+
+    __slots__ = ("chaves", "itens")
+
+    def __init__(self, itens: list):
+        itens.sort()
+        self.chaves = [item[0] for item in itens]
+        self.itens = itens
+
+    def buscar(self, prefixo: str, limite: int) -> List[dict]:
+        inicio = bisect_left(self.chaves, prefixo) if prefixo else 0
+        resultado = []
+        for chave, item_id, nome in self.itens[inicio:inicio + limite]:
+            if not chave.startswith(prefixo):
+                break
+            resultado.append({"id": item_id, "nome": nome})
+        return resultado
+
+
+class LookupEntidade:
+    """Índice em memória de uma entidade, com um índice por pai quando houver."""
+
+    def __init__(self, tabela: str, modelo, coluna_pai=None):
+        self.tabela = tabela
+        self.modelo = modelo
+        self.coluna_pai = coluna_pai
+        self.todos: Optional[IndiceNomes] = None
+        self.por_pai: Dict[int, IndiceNomes] = {}
+        self.carregado_em = 0.0
+        # Incrementada a cada invalidação: uma carga iniciada antes dela não é guardada
+        self.versao = 0
+        self._carga = asyncio.Lock()
+        ao_alterar(tabela)(self.limpar)
+
+    def limpar(self):
+        self.versao += 1
+        self.todos = None
+        self.por_pai = {}
+
+    def _valido(self) -> bool:
+        return self.todos is not None and time.monotonic() - self.carregado_em <= LOOKUP_TTL
+
+    async def _carregar(self, session: AsyncSession):
+        versao = self.versao
+        colunas = [self.modelo.id, self.modelo.nome]
+        if self.coluna_pai is not None:
+            colunas.append(self.coluna_pai)
+        linhas = (await session.execute(select(*colunas))).all()
+
+        todos = []
+        por_pai: Dict[int, list] = {}
+        for linha in linhas:
+            item = (normalizar(linha[1]), linha[0], linha[1])
+            todos.append(item)
+            if self.coluna_pai is not None:
+                por_pai.setdefault(linha[2], []).append(item)
+        indice = IndiceNomes(todos)
+        indices_pai = {pai_id: IndiceNomes(itens) for pai_id, itens in por_pai.items()}
+        if versao == self.versao:
+            self.todos, self.por_pai = indice, indices_pai
+            self.carregado_em = time.monotonic()
+        return indice, indices_pai
+
+    async def buscar(
+        self,
+        session: AsyncSession,
+        q: Optional[str] = None,
+        limite: int = LIMITE_PADRAO,
+        pai_id: Optional[int] = None,
+    ) -> List[dict]:
+        todos, por_pai = self.todos, self.por_pai
+        if not self._valido():
+            async with self._carga:
+                # Outra requisição pode ter carregado enquanto esta esperava
+                if self._valido():
+                    todos, por_pai = self.todos, self.por_pai
+                else:
+                    todos, por_pai = await self._carregar(session)
+        indice = todos if pai_id is None else por_pai.get(pai_id)
+        if indice is None:
+            return []
+        return indice.buscar(normalizar(q or ""), limite)
+
+
+LOOKUPS = {
+    "clientes": LookupEntidade("cliente", Cliente),
+    "projetos": LookupEntidade("projeto", Projeto, Projeto.cliente_id),
+    "sistemas": LookupEntidade("sistema", Sistema, Sistema.projeto_id),
+}
+
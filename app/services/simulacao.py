@@ -0,0 +1,254 @@
+# app/services/simulacao.py
+#
+# Simulação ("e se?") do valor de uma contagem sem gravar nada: outro fator
+# para todas as funções ou para fatores específicos, o método estimado, uma
+# matriz de complexidade ou pesos alternativos.
+#
+# As funções da contagem são lidas uma vez para um snapshot colunar (arrays
+# numpy) mantido em cache por processo. O cálculo usa as regras do serviço de
+# cálculo, mas só sobre as combinações distintas: a complexidade é calculada
+# uma vez por (tipo, RLR, DER) e o PF líquido uma vez por (PF bruto, fator),
+# e os resultados voltam para as linhas por indexação. Simulações repetidas na
+# mesma contagem custam milissegundos.
+#
+# Sem alterações, a simulação reproduz o cálculo gravado, que aplica todos os
+# fatores como percentuais; `tipos_ajuste` permite simular um fator como
+# unitário (o fator passa a ser o PF líquido de cada função).
+#
+# O cache é invalidado quando funções, contagens ou fatores mudam neste
+# processo (app.invalidacao); SIMULACAO_TTL limita a idade de um snapshot,
+# já que alterações feitas por outros workers não chegam aqui.
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.invalidacao import ao_alterar
+from app.lazy_imports import modulo_sob_demanda
+from app.models import FatorAjuste, Funcao, MetodoContagemEnum, TipoAjuste
+from app.schemas import SimulacaoContagem
+from app.services import calculation
+
+np = modulo_sob_demanda("numpy")
+
+SIMULACAO_CACHE = int(os.getenv("SIMULACAO_CACHE", "32"))
+SIMULACAO_TTL = float(os.getenv("SIMULACAO_TTL", "300"))
+
+TIPOS = ("ALI", "AIE", "EE", "CE", "SE", "INM")
+COMPLEXIDADES = ("Baixa", "Média", "Alta")
+
+
+class SimulacaoInvalida(ValueError):
+    """Parâmetros de simulação inconsistentes (matriz malformada, fator inexistente...)."""
+
+
+class SnapshotContagem:
+    """Colunas das funções de uma contagem, com as combinações distintas já separadas."""
+
+    __slots__ = (
+        "contagem_id", "carregado_em", "funcoes", "tipo", "der", "pf_bruto", "pf_liquido",
+        "combinacoes", "combinacao", "complexidade_atual", "fatores", "ids_fatores", "posicao_fator",
+    )
+
+    def __init__(self, contagem_id: int, linhas: list, fatores: dict):
+        self.contagem_id = contagem_id
+        self.carregado_em = time.monotonic()
+        self.funcoes = len(linhas)
+        colunas = list(zip(*linhas)) if linhas else [(), (), (), (), (), ()]
+        tipos, rlrs, ders, fator_ids, brutos, liquidos = colunas
+        self.tipo = np.array([TIPOS.index(getattr(t, "value", t)) for t in tipos], dtype=np.int8)
+        rlr = np.array(rlrs, dtype=np.int64)
+        self.der = np.array(ders, dtype=np.int64)
+        self.pf_bruto = np.array([b or 0 for b in brutos], dtype=np.float64)
+        self.pf_liquido = np.array([l or 0 for l in liquidos], dtype=np.float64)
+        # (tipo, RLR, DER) distintos e o índice da combinação de cada linha
+        if self.funcoes:
+            self.combinacoes, self.combinacao = np.unique(
+                np.stack([self.tipo.astype(np.int64), rlr, self.der]), axis=1, return_inverse=True
+            )
+            self.combinacao = self.combinacao.reshape(-1)
+        else:
+            self.combinacoes = np.empty((3, 0), dtype=np.int64)
+            self.combinacao = np.empty(0, dtype=np.int64)
+        self.complexidade_atual = [
+            calculation.calcular_complexidade(TIPOS[t], int(r), int(d)) for t, r, d in self.combinacoes.T
+        ]
+        # fator_ajuste_id -> (fator, tipo_ajuste); cada linha guarda a posição do seu fator
+        self.fatores = fatores
+        self.ids_fatores = sorted(fatores)
+        self.posicao_fator = np.searchsorted(
+            np.array(self.ids_fatores, dtype=np.int64), np.array(fator_ids, dtype=np.int64)
+        )
+
+
+class CacheSnapshots:
+    def __init__(self, tamanho: int, ttl: float):
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self.snapshots = OrderedDict()
+
+    def obter(self, contagem_id: int) -> Optional[SnapshotContagem]:
+        snapshot = self.snapshots.get(contagem_id)
+        if snapshot is None:
+            return None
+        if time.monotonic() - snapshot.carregado_em > self.ttl:
+            del self.snapshots[contagem_id]
+            return None
+        self.snapshots.move_to_end(contagem_id)
+        return snapshot
+
+    def guardar(self, snapshot: SnapshotContagem):
+        self.snapshots[snapshot.contagem_id] = snapshot
+        self.snapshots.move_to_end(snapshot.contagem_id)
+        while len(self.snapshots) > self.tamanho:
+            self.snapshots.popitem(last=False)
+
+    def limpar(self):
+        self.snapshots.clear()
+
+
+CACHE_SNAPSHOTS = CacheSnapshots(SIMULACAO_CACHE, SIMULACAO_TTL)
+
+
+@ao_alterar("funcao", "contagem", "fatorajuste")
+def _invalidar_snapshots():
+    CACHE_SNAPSHOTS.limpar()
+
+
+async def carregar_snapshot(session: AsyncSession, contagem_id: int) -> tuple:
+    """Retorna (snapshot, veio_do_cache)."""
+    snapshot = CACHE_SNAPSHOTS.obter(contagem_id)
+    if snapshot is not None:
+        return snapshot, True
+    linhas = (
+        await session.execute(
+            select(
+                Funcao.tipo_funcao, Funcao.qtd_rlr, Funcao.qtd_der, Funcao.fator_ajuste_id,
+                Funcao.ponto_de_funcao_bruto, Funcao.ponto_de_funcao_liquido,
+            ).where(Funcao.contagem_id == contagem_id)
+        )
+    ).all()
+    fatores = {
+        fator_id: (fator, tipo_ajuste)
+        for fator_id, fator, tipo_ajuste in (
+            await session.execute(select(FatorAjuste.id, FatorAjuste.fator, FatorAjuste.tipo_ajuste))
+        ).all()
+    }
+    snapshot = SnapshotContagem(contagem_id, linhas, fatores)
+    CACHE_SNAPSHOTS.guardar(snapshot)
+    return snapshot, False
+
+
+def _validar(parametros: SimulacaoContagem, snapshot: SnapshotContagem):
+    desconhecidos = (set(parametros.fatores) | set(parametros.tipos_ajuste)) - set(snapshot.fatores)
+    if desconhecidos:
+        raise SimulacaoInvalida(f"Fatores de ajuste inexistentes: {sorted(desconhecidos)}")
+    for tipo, matriz in parametros.matrizes.items():
+        if not matriz.tabela or len(matriz.tabela) != len(matriz.rlr) or any(len(l) != len(matriz.der) for l in matriz.tabela):
+            raise SimulacaoInvalida(f"Matriz de {tipo.value}: a tabela deve ter uma linha por faixa de RLR e uma coluna por faixa de DER.")
+        if matriz.rlr != sorted(matriz.rlr) or matriz.der != sorted(matriz.der):
+            raise SimulacaoInvalida(f"Matriz de {tipo.value}: os limites das faixas devem ser crescentes.")
+        invalidas = {c for linha in matriz.tabela for c in linha} - set(COMPLEXIDADES)
+        if invalidas:
+            raise SimulacaoInvalida(f"Matriz de {tipo.value}: complexidades inválidas {sorted(invalidas)}.")
+    for tipo, pesos in parametros.pesos.items():
+        if set(pesos) - set(COMPLEXIDADES):
+            raise SimulacaoInvalida(f"Pesos de {tipo.value}: use as complexidades {', '.join(COMPLEXIDADES)}.")
+
+
+def _totais(tipo, pf_bruto, pf_liquido) -> dict:
+    funcoes = np.bincount(tipo, minlength=len(TIPOS))
+    brutos = np.bincount(tipo, weights=pf_bruto, minlength=len(TIPOS))
+    liquidos = np.bincount(tipo, weights=pf_liquido, minlength=len(TIPOS))
+    por_tipo = {
+        nome: {
+            "funcoes": int(funcoes[codigo]),
+            "pf_bruto": round(float(brutos[codigo]), 2),
+            "pf_liquido": round(float(liquidos[codigo]), 2),
+        }
+        for codigo, nome in enumerate(TIPOS)
+        if funcoes[codigo]
+    }
+    return {
+        "pf_bruto": round(float(pf_bruto.sum()), 2),
+        "pf_liquido": round(float(pf_liquido.sum()), 2),
+        "por_tipo": por_tipo,
+    }
+
+
+def _delta(atual: dict, simulado: dict) -> dict:
+    delta = {}
+    for campo in ("pf_bruto", "pf_liquido"):
+        diferenca = round(simulado[campo] - atual[campo], 2)
+        delta[campo] = diferenca
+        delta[f"{campo}_percentual"] = round(100 * diferenca / atual[campo], 2) if atual[campo] else None
+    return delta
+
+
+def simular(snapshot: SnapshotContagem, parametros: SimulacaoContagem) -> dict:
+    """Recalcula o snapshot com os parâmetros; retorna os totais atuais, simulados e as diferenças."""
+    _validar(parametros, snapshot)
+    if not snapshot.funcoes:
+        vazio = {"pf_bruto": 0.0, "pf_liquido": 0.0, "por_tipo": {}}
+        return {"contagem_id": snapshot.contagem_id, "funcoes": 0, "atual": vazio, "simulado": vazio, "delta": _delta(vazio, vazio)}
+    estimada = parametros.metodo_contagem == MetodoContagemEnum.ESTIMADA
+    matrizes = {tipo.value: matriz.model_dump() for tipo, matriz in parametros.matrizes.items()}
+    pesos = {tipo: dict(valores) for tipo, valores in calculation.PESOS.items()}
+    for tipo, valores in parametros.pesos.items():
+        pesos.setdefault(tipo.value, {}).update(valores)
+
+    # 1. PF bruto de cada combinação (tipo, RLR, DER)
+    bruto_combinacao = np.zeros(snapshot.combinacoes.shape[1], dtype=np.float64)
+    for indice, (codigo, rlr, der) in enumerate(snapshot.combinacoes.T):
+        tipo = TIPOS[codigo]
+        if estimada and tipo in calculation.COMPLEXIDADE_ESTIMADA:
+            complexidade = calculation.COMPLEXIDADE_ESTIMADA[tipo]
+        elif tipo in matrizes:
+            complexidade = calculation.complexidade_por_matriz(matrizes[tipo], int(rlr), int(der))
+        else:
+            complexidade = snapshot.complexidade_atual[indice]
+        bruto_combinacao[indice] = pesos.get(tipo, {}).get(complexidade, 0)
+
+    # 2. Valor e tipo de ajuste de cada fator (substituições por id, depois o global)
+    valores = [snapshot.fatores[fator_id][0] for fator_id in snapshot.ids_fatores]
+    unitarios = np.zeros(len(valores), dtype=bool)
+    for posicao, fator_id in enumerate(snapshot.ids_fatores):
+        if fator_id in parametros.fatores:
+            valores[posicao] = parametros.fatores[fator_id]
+        if parametros.tipos_ajuste.get(fator_id) == TipoAjuste.UNITARIO:
+            unitarios[posicao] = True
+    if parametros.fator_global is not None:
+        valores = [parametros.fator_global] * len(valores)
+
+    # 3. PF líquido com o arredondamento do serviço de cálculo, uma vez por
+    # (PF bruto distinto, fator): poucas chamadas, depois só indexação
+    brutos, bruto_da_combinacao = np.unique(bruto_combinacao, return_inverse=True)
+    liquidos = np.array([[calculation.aplicar_fator(float(b), f) for f in valores] for b in brutos], dtype=np.float64)
+    liquidos[:, unitarios] = np.array(valores, dtype=np.float64)[unitarios]
+    bruto_linha = bruto_da_combinacao.reshape(-1)[snapshot.combinacao]
+    pf_bruto = brutos[bruto_linha]
+    pf_liquido = liquidos[bruto_linha, snapshot.posicao_fator]
+
+    # INM: o PF é a quantidade informada vezes o fator, sem arredondamento no
+    # líquido; o bruto é gravado em coluna inteira
+    inm = snapshot.tipo == TIPOS.index("INM")
+    if inm.any():
+        pf_inm = snapshot.der[inm] * np.array(valores, dtype=np.float64)[snapshot.posicao_fator[inm]]
+        pf_bruto[inm] = np.floor(pf_inm + 0.5)
+        pf_liquido[inm] = pf_inm
+
+    atual = _totais(snapshot.tipo, snapshot.pf_bruto, snapshot.pf_liquido)
+    simulado = _totais(snapshot.tipo, pf_bruto, pf_liquido)
+    return {
+        "contagem_id": snapshot.contagem_id,
+        "funcoes": snapshot.funcoes,
+        "atual": atual,
+        "simulado": simulado,
+        "delta": _delta(atual, simulado),
+    }
@@ -0,0 +1,104 @@
+# app/services/staging.py
+
+from __future__ import annotations
+
+from app.lazy_imports import modulo_sob_demanda
+
+# Carregado no primeiro uso (só a importação de planilhas precisa dele)
+pd = modulo_sob_demanda("pandas")
+
+def compactar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte os dados lidos da planilha para uma tabela colunar compacta.
+    Colunas numéricas viram inteiros/decimais anuláveis e as demais viram
+    colunas categóricas (codificadas por dicionário), evitando manter um
+    objeto Python por célula enquanto a importação fica em memória.
+    O índice é preservado (na importação ele guarda o número da linha na planilha).
+    """
+    colunas = {}
+    for nome in df.columns:
+        colunas[nome] = _compactar_coluna(df[nome])
+    # Colunas de tipos de extensão não são consolidadas em blocos 2D,
+    # então cada coluna mantém o próprio buffer (sem cópia).
+    return pd.DataFrame(colunas, index=df.index, copy=False)
+
+
+def _compactar_coluna(coluna: pd.Series) -> pd.Series:
+    preenchidos = coluna.notna()
+
+    if pd.api.types.is_bool_dtype(coluna.dtype):
+        return coluna.astype("boolean")
+    if pd.api.types.is_datetime64_any_dtype(coluna.dtype):
+        return coluna
+
+    # Só colunas que o read_excel já entregou como numéricas: texto com cara de
+    # número ("001", "02") precisa continuar sendo texto
+    if pd.api.types.is_numeric_dtype(coluna.dtype):
+        validos = coluna[preenchidos]
+        if (validos == validos.round()).all():
+            return coluna.astype("Int64")
+        return coluna.astype("Float64")
+
+    # Texto (ou tipos mistos): mantém os valores originais nas categorias
+    return coluna.astype("category")
+
+
+def projetar_mapeamento(df: pd.DataFrame, mapeamento: dict) -> pd.DataFrame:
+    """
+    Aplica o mapeamento {"Coluna Planilha": "campo_db"} como uma projeção:
+    mantém apenas as colunas mapeadas, já renomeadas, reaproveitando os
+    buffers da tabela original (sem copiar os dados).
+    """
+    colunas = {
+        campo_db: df[coluna_planilha]
+        for coluna_planilha, campo_db in mapeamento.items()
+        if coluna_planilha in df.columns
+    }
+    return pd.DataFrame(colunas, index=df.index, copy=False)
+
+
+def para_registros(df: pd.DataFrame, com_linha: bool = False) -> list:
+    """
+    Converte (um recorte de) a tabela em uma lista de dicionários com valores
+    nativos do Python, trocando valores ausentes por None.
+    Com `com_linha=True`, cada registro inclui o índice da tabela em "linha".
+    """
+    if df.empty:
+        return []
+    registros = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    if com_linha:
+        for linha, registro in zip(df.index.tolist(), registros):
+            registro["linha"] = linha
+    return registros
+
+
+def filtrar_por_valor(df: pd.DataFrame, coluna: str, valor: str) -> pd.Series:
+    """
+    Retorna a máscara das linhas cuja coluna contém o valor informado
+    (sem diferenciar maiúsculas/minúsculas). Em colunas categóricas a busca
+    é feita só no dicionário de valores distintos e depois mapeada pelos códigos.
+    """
+    serie = df[coluna]
+    valor = valor.strip().lower()
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = pd.Series(serie.cat.categories.astype(str)).str.lower()
+        aceitas = categorias.str.contains(valor, regex=False).to_numpy()
+        codigos = serie.cat.codes.to_numpy()
+        return pd.Series((codigos >= 0) & aceitas[codigos], index=df.index)
+    textos = serie.astype(object).where(serie.notna(), "").astype(str).str.lower()
+    return textos.str.contains(valor, regex=False)
+
+
+def paginar(df: pd.DataFrame, offset: int = 0, limit: int = 50, sort: str = None) -> pd.DataFrame:
+    """
+    Ordena (opcionalmente) e devolve apenas a página pedida.
+    `sort` segue o padrão da API: "coluna" ou "-coluna" para ordem decrescente.
+    """
+    if sort:
+        is_desc = sort.startswith("-")
+        coluna = sort[1:] if is_desc else sort
+        if coluna in df.columns:
+            # Ordena apenas a coluna escolhida e copia somente as linhas da página
+            ordem = df[coluna].sort_values(ascending=not is_desc, kind="stable", na_position="last")
+            return df.loc[ordem.index[offset:offset + limit]]
+    return df.iloc[offset:offset + limit]
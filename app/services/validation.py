@@ -0,0 +1,166 @@
+# app/services/validation.py
+
+from __future__ import annotations
+
+from app.lazy_imports import modulo_sob_demanda
+from app.models import Funcao, TipoFuncaoEnum
+
+# Texto que a planilha modelo usa para marcar o fim das linhas de funções
+TEXTO_FIM_PLANILHA = "Só inserir linhas antes desta."
+
+CAMPOS_OBRIGATORIOS = ("modulo", "funcionalidade", "nome")
+CAMPOS_INTEIROS = ("qtd_der", "qtd_rlr")
+TIPOS_FUNCAO = {tipo.value for tipo in TipoFuncaoEnum}
+
+# Carregados no primeiro uso (só a importação de planilhas precisa deles)
+np = modulo_sob_demanda("numpy")
+pd = modulo_sob_demanda("pandas")
+
+
+def limite_tamanho(campo: str):
+    """Tamanho máximo do campo texto conforme definido no modelo Funcao."""
+    return getattr(Funcao.__table__.c[campo].type, "length", None)
+
+
+def _aplicar_por_valor(serie: pd.Series, funcao) -> np.ndarray:
+    """
+    Aplica `funcao` (vetorizada, recebendo uma Series de textos sem espaços nas
+    pontas) apenas aos valores distintos da coluna e propaga o resultado para as
+    linhas pelos códigos do dicionário. Valores ausentes são tratados como "".
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype("category")
+    distintos = pd.Series(serie.cat.categories.astype(str)).str.strip()
+    # A última posição representa o valor ausente (código -1)
+    distintos = pd.concat([distintos, pd.Series([""])], ignore_index=True)
+    resultado = np.asarray(funcao(distintos))
+    return resultado[serie.cat.codes.to_numpy()]
+
+
+def textos(serie: pd.Series) -> np.ndarray:
+    """Valores da coluna como texto normalizado ("" quando ausente)."""
+    return _aplicar_por_valor(serie, lambda t: t.to_numpy(dtype=object))
+
+
+def numeros(serie: pd.Series) -> np.ndarray:
+    """Valores da coluna como float (NaN quando ausente ou não numérico)."""
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.astype("Float64").to_numpy(dtype=float, na_value=np.nan)
+    return _aplicar_por_valor(serie, lambda t: pd.to_numeric(t, errors="coerce").to_numpy(dtype=float))
+
+
+def inteiros_validos(serie: pd.Series) -> np.ndarray:
+    """Quantidades como inteiros; vazios e valores inválidos viram 0."""
+    valores = numeros(serie)
+    validos = ~np.isnan(valores) & (valores >= 0) & (valores == np.round(valores))
+    return np.where(validos, valores, 0).astype(np.int64)
+
+
+def linhas_ignoradas(df: pd.DataFrame) -> np.ndarray:
+    """Máscara das linhas de marcação da planilha modelo, que não são funções."""
+    if "nome_fator_ajuste" not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return textos(df["nome_fator_ajuste"]) == TEXTO_FIM_PLANILHA
+
+
+def validar_lote(df: pd.DataFrame, nomes_fatores: set) -> pd.DataFrame:
+    """
+    Valida todas as linhas já mapeadas de uma vez, coluna a coluna.
+    Retorna um índice compacto de erros com as colunas (linha, coluna, codigo),
+    onde `linha` é o índice da tabela em staging (número da linha na planilha).
+    """
+    linhas, colunas, codigos = [], [], []
+
+    def registrar(mascara, coluna, codigo):
+        posicoes = np.flatnonzero(mascara)
+        if len(posicoes):
+            linhas.append(df.index.to_numpy()[posicoes])
+            colunas.append(np.full(len(posicoes), coluna, dtype=object))
+            codigos.append(np.full(len(posicoes), codigo, dtype=object))
+
+    vazio = np.zeros(len(df), dtype=bool)
+
+    for campo in CAMPOS_OBRIGATORIOS:
+        if campo not in df.columns:
+            registrar(~vazio, campo, "obrigatorio")
+            continue
+        texto = textos(df[campo])
+        registrar(texto == "", campo, "obrigatorio")
+        limite = limite_tamanho(campo)
+        if limite:
+            tamanhos = _aplicar_por_valor(df[campo], lambda t: t.str.len().to_numpy())
+            registrar(tamanhos > limite, campo, "tamanho_excedido")
+
+    if "tipo_funcao" in df.columns:
+        tipo = textos(df["tipo_funcao"])
+        registrar(tipo == "", "tipo_funcao", "obrigatorio")
+        registrar((tipo != "") & ~np.isin(tipo, list(TIPOS_FUNCAO)), "tipo_funcao", "tipo_funcao_invalido")
+    else:
+        registrar(~vazio, "tipo_funcao", "obrigatorio")
+
+    for campo in CAMPOS_INTEIROS:
+        if campo not in df.columns:
+            continue
+        valores = numeros(df[campo])
+        if pd.api.types.is_numeric_dtype(df[campo].dtype):
+            em_branco = df[campo].isna().to_numpy()
+        else:
+            em_branco = textos(df[campo]) == ""
+        invalidos = ~em_branco & (np.isnan(valores) | (valores != np.round(valores)))
+        registrar(invalidos, campo, "nao_inteiro")
+        registrar(~invalidos & (valores < 0), campo, "negativo")
+
+    if "nome_fator_ajuste" in df.columns:
+        fator = textos(df["nome_fator_ajuste"])
+        registrar(fator == "", "nome_fator_ajuste", "obrigatorio")
+        registrar((fator != "") & ~np.isin(fator, list(nomes_fatores)), "nome_fator_ajuste", "fator_desconhecido")
+    else:
+        registrar(~vazio, "nome_fator_ajuste", "obrigatorio")
+
+    if not linhas:
+        return pd.DataFrame({
+            "linha": pd.Series([], dtype=df.index.dtype),
+            "coluna": pd.Categorical([]),
+            "codigo": pd.Categorical([]),
+        })
+
+    erros = pd.DataFrame({
+        "linha": np.concatenate(linhas),
+        "coluna": pd.Categorical(np.concatenate(colunas)),
+        "codigo": pd.Categorical(np.concatenate(codigos)),
+    })
+    return erros.sort_values("linha", kind="stable", ignore_index=True)
+
+
+def resumir_erros(erros: pd.DataFrame, limite: int = 500) -> dict:
+    """
+    Resumo do índice de erros para a resposta da API: totais por código e por
+    coluna e as primeiras `limite` ocorrências em formato colunar.
+    """
+    primeiros = erros.head(limite)
+    return {
+        "total_erros": len(erros),
+        "linhas_com_erro": int(erros["linha"].nunique()),
+        "por_codigo": {str(k): int(v) for k, v in erros["codigo"].value_counts().items() if v},
+        "por_coluna": {str(k): int(v) for k, v in erros["coluna"].value_counts().items() if v},
+        "erros": {
+            "linha": primeiros["linha"].tolist(),
+            "coluna": primeiros["coluna"].astype(str).tolist(),
+            "codigo": primeiros["codigo"].astype(str).tolist(),
+        },
+        "truncado": len(erros) > limite,
+    }
+
+
+def problemas_por_linha(erros: pd.DataFrame) -> dict:
+    """Mapa linha -> códigos de erro separados por vírgula."""
+    if erros.empty:
+        return {}
+    # O índice de erros já vem ordenado por linha: basta fatiar os códigos por grupo
+    linhas, inicios = np.unique(erros["linha"].to_numpy(), return_index=True)
+    codigos = erros["codigo"].astype(str).to_numpy()
+    fins = list(inicios[1:]) + [len(codigos)]
+    return {
+        linha: ",".join(codigos[inicio:fim])
+        for linha, inicio, fim in zip(linhas.tolist(), inicios, fins)
+    }
@@ -0,0 +1,230 @@
+# app/sql_instrumentation.py
+#
+# Instrumentação dos comandos SQL (substitui o echo=True do engine):
+# - cada comando é cronometrado e normalizado em uma "impressão digital"
+#   (literais, placeholders e listas IN trocados por ?), agregando
+#   estatísticas por impressão digital (consultadas em /api/admin/sql-stats);
+# - comandos acima de SQL_SLOW_MS são registrados no log, com os parâmetros
+#   redigidos (só tipos e tamanhos, nunca os valores);
+# - por requisição, conta quantas vezes cada impressão digital foi executada
+#   e sinaliza padrões N+1 (o mesmo SELECT repetido SQL_N_MAIS_UM vezes ou mais).
+#
+# O mesmo par de eventos de cursor alimenta o tempo de banco das métricas
+# Prometheus (app.metrics.registrar_comando_banco): cada comando é
+# cronometrado uma única vez.
+
+import hashlib
+import os
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.metrics import registrar_comando_banco, rota_templada
+
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", "200"))
+SQL_N_MAIS_UM = int(os.getenv("SQL_N_MAIS_UM", "5"))
+# Limite de impressões digitais distintas mantidas em memória
+MAX_IMPRESSOES = 2000
+
+_COMENTARIO_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_TEXTO_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMERO_RE = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_LISTA_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_RE = re.compile(r"(VALUES\s*\(\?\.\.\.\))(?:\s*,\s*\(\?\.\.\.\))+", re.IGNORECASE)
+_ESPACOS_RE = re.compile(r"\s+")
+
+# Impressões digitais executadas na requisição em andamento {impressao: vezes}
+_consultas_requisicao: ContextVar[Optional[dict]] = ContextVar("consultas_requisicao", default=None)
+
+
+@lru_cache(maxsize=4096)
+def normalizar(statement: str) -> tuple:
+    """Retorna (impressão digital, SQL normalizado) de um comando."""
+    sql = _COMENTARIO_RE.sub(" ", statement)
+    sql = _TEXTO_RE.sub("?", sql)
+    sql = _NUMERO_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _LISTA_RE.sub("(?...)", sql)
+    sql = _VALUES_RE.sub(r"\1", sql)
+    sql = _ESPACOS_RE.sub(" ", sql).strip()
+    return hashlib.sha1(sql.encode("utf-8")).hexdigest()[:12], sql
+
+
+def redigir_parametros(parameters, executemany: bool = False) -> str:
+    """Descreve os parâmetros sem expor valores: tipos e tamanhos de texto."""
+    if executemany:
+        return f"<executemany: {len(parameters)} conjuntos>"
+
+    def descrever(valor) -> str:
+        if valor is None:
+            return "None"
+        if isinstance(valor, (str, bytes)):
+            return f"{type(valor).__name__}[{len(valor)}]"
+        return type(valor).__name__
+
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{chave}: {descrever(v)}" for chave, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(descrever(v) for v in parameters) + ")"
+    return descrever(parameters)
+
+
+class EstatisticaSQL:
+    __slots__ = ("impressao", "sql", "chamadas", "tempo_total", "tempo_max", "linhas", "lentas", "n_mais_um")
+
+    def __init__(self, impressao: str, sql: str):
+        self.impressao = impressao
+        self.sql = sql
+        self.chamadas = 0
+        self.tempo_total = 0.0
+        self.tempo_max = 0.0
+        self.linhas = 0
+        self.lentas = 0
+        self.n_mais_um = 0
+
+    def para_dict(self) -> dict:
+        return {
+            "impressao": self.impressao,
+            "sql": self.sql,
+            "chamadas": self.chamadas,
+            "tempo_total_ms": round(self.tempo_total * 1000, 3),
+            "tempo_medio_ms": round(self.tempo_total * 1000 / self.chamadas, 3) if self.chamadas else 0.0,
+            "tempo_max_ms": round(self.tempo_max * 1000, 3),
+            "linhas": self.linhas,
+            "lentas": self.lentas,
+            "requisicoes_n_mais_um": self.n_mais_um,
+        }
+
+
+class RegistroSQL:
+    def __init__(self):
+        self.estatisticas = {}
+        self.descartadas = 0
+
+    def registrar(self, impressao: str, sql: str, duracao: float, linhas: int) -> Optional[EstatisticaSQL]:
+        estatistica = self.estatisticas.get(impressao)
+        if estatistica is None:
+            if len(self.estatisticas) >= MAX_IMPRESSOES:
+                self.descartadas += 1
+                return None
+            estatistica = self.estatisticas[impressao] = EstatisticaSQL(impressao, sql)
+        estatistica.chamadas += 1
+        estatistica.tempo_total += duracao
+        if duracao > estatistica.tempo_max:
+            estatistica.tempo_max = duracao
+        if linhas > 0:
+            estatistica.linhas += linhas
+        return estatistica
+
+    def relatorio(self, ordenar_por: str = "tempo_total_ms", limite: int = 50) -> dict:
+        itens = [e.para_dict() for e in list(self.estatisticas.values())]
+        itens.sort(key=lambda item: item[ordenar_por], reverse=True)
+        return {
+            "impressoes_distintas": len(itens),
+            "impressoes_descartadas": self.descartadas,
+            "total_chamadas": sum(item["chamadas"] for item in itens),
+            "tempo_total_ms": round(sum(item["tempo_total_ms"] for item in itens), 3),
+            "lento_acima_de_ms": SQL_SLOW_MS,
+            "estatisticas": itens[:limite],
+        }
+
+    def limpar(self):
+        self.estatisticas.clear()
+        self.descartadas = 0
+
+
+REGISTRO_SQL = RegistroSQL()
+
+
+# --- Eventos do SQLAlchemy ---
+
+def _antes_execucao(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_inicio", []).append(time.perf_counter())
+
+
+def _depois_execucao(conn, cursor, statement, parameters, context, executemany):
+    duracao = time.perf_counter() - conn.info["sql_inicio"].pop()
+    registrar_comando_banco(duracao)
+    impressao, sql = normalizar(statement)
+    estatistica = REGISTRO_SQL.registrar(impressao, sql, duracao, cursor.rowcount or 0)
+
+    if duracao * 1000 >= SQL_SLOW_MS:
+        if estatistica is not None:
+            estatistica.lentas += 1
+        logger.warning(
+            "Consulta lenta ({duracao_ms:.1f} ms) [{impressao}]: {sql} parâmetros={parametros}",
+            duracao_ms=duracao * 1000,
+            impressao=impressao,
+            sql=sql,
+            parametros=redigir_parametros(parameters, executemany),
+        )
+
+    consultas = _consultas_requisicao.get()
+    if consultas is not None:
+        consultas[impressao] = consultas.get(impressao, 0) + 1
+
+
+def _erro_execucao(contexto_erro):
+    # Comando com erro não dispara after_cursor_execute: descarta o início
+    if contexto_erro.connection is not None:
+        inicios = contexto_erro.connection.info.get("sql_inicio")
+        if inicios:
+            inicios.pop()
+
+
+def instrumentar_sql(engine):
+    """
+    Registra os eventos de cursor no engine síncrono (async_engine.sync_engine):
+    estatísticas por impressão digital, log de lentas, N+1 e tempo de banco das métricas.
+    """
+    event.listen(engine, "before_cursor_execute", _antes_execucao)
+    event.listen(engine, "after_cursor_execute", _depois_execucao)
+    event.listen(engine, "handle_error", _erro_execucao)
+
+
+# --- Agregação por requisição ---
+
+def _verificar_n_mais_um(scope: Scope, consultas: dict):
+    for impressao, vezes in consultas.items():
+        if vezes < SQL_N_MAIS_UM:
+            continue
+        estatistica = REGISTRO_SQL.estatisticas.get(impressao)
+        if estatistica is None or not estatistica.sql.upper().startswith("SELECT"):
+            continue
+        estatistica.n_mais_um += 1
+        logger.warning(
+            "Possível N+1 em {metodo} {rota}: [{impressao}] executada {vezes}x ({total} comandos na requisição): {sql}",
+            metodo=scope["method"],
+            rota=rota_templada(scope),
+            impressao=impressao,
+            vezes=vezes,
+            total=sum(consultas.values()),
+            sql=estatistica.sql,
+        )
+
+
+class SQLInstrumentationMiddleware:
+    """Agrupa os comandos SQL por requisição para detectar padrões N+1."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        consultas = {}
+        token = _consultas_requisicao.set(consultas)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _consultas_requisicao.reset(token)
+            if consultas:
+                _verificar_n_mais_um(scope, consultas)
@@ -0,0 +1,105 @@
+# app/startup_report.py
+#
+# Relatório do tempo de importação da aplicação, a partir do
+# `python -X importtime` executado em um processo novo (cache de bytecode já
+# aquecido, como em um worker do uvicorn). Mostra o tempo total, os módulos
+# mais caros (acumulado e próprio), o custo por pacote de nível superior e
+# se as dependências pesadas carregadas sob demanda ficaram de fora.
+#
+# Uso: python -m app.startup_report [--modulo app.main] [--top 20]
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Dependências que não devem ser importadas na inicialização (app.lazy_imports)
+DEPENDENCIAS_SOB_DEMANDA = ("pandas", "numpy", "openpyxl", "httpx")
+
+_LINHA_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def medir_importacao(modulo: str = "app.main") -> tuple:
+    """
+    Importa `modulo` em um processo novo com -X importtime. Retorna os módulos
+    [(nome, próprio_us, acumulado_us, profundidade), ...] na ordem de conclusão
+    e as dependências sob demanda que acabaram carregadas.
+    """
+    verificacao = (
+        f"import {modulo}; "
+        f"from app.lazy_imports import carregado; "
+        f"print(','.join(m for m in {DEPENDENCIAS_SOB_DEMANDA!r} if carregado(m)))"
+    )
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", verificacao],
+        capture_output=True, text=True, env={**os.environ, "LOG_LEVEL": "ERROR"},
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}:\n{resultado.stderr[-2000:]}")
+
+    modulos = []
+    for linha in resultado.stderr.splitlines():
+        encontrado = _LINHA_RE.match(linha)
+        if encontrado:
+            proprio, acumulado, recuo, nome = encontrado.groups()
+            modulos.append((nome, int(proprio), int(acumulado), len(recuo) // 2))
+    carregados = [m for m in resultado.stdout.strip().split(",") if m]
+    return modulos, carregados
+
+
+def por_pacote(modulos: list) -> dict:
+    """Tempo próprio somado por pacote de nível superior (us)."""
+    totais = {}
+    for nome, proprio, _, _ in modulos:
+        pacote = nome.split(".")[0]
+        totais[pacote] = totais.get(pacote, 0) + proprio
+    return dict(sorted(totais.items(), key=lambda item: item[1], reverse=True))
+
+
+def relatorio(modulo: str = "app.main", top: int = 20) -> dict:
+    modulos, carregados = medir_importacao(modulo)
+    total = sum(proprio for _, proprio, _, _ in modulos)
+    return {
+        "modulo": modulo,
+        "total_ms": round(total / 1000, 1),
+        "modulos_importados": len(modulos),
+        "mais_caros_acumulado": [
+            {"modulo": nome, "acumulado_ms": round(acumulado / 1000, 1)}
+            for nome, _, acumulado, _ in sorted(modulos, key=lambda m: m[2], reverse=True)[:top]
+        ],
+        "mais_caros_proprio": [
+            {"modulo": nome, "proprio_ms": round(proprio / 1000, 1)}
+            for nome, proprio, _, _ in sorted(modulos, key=lambda m: m[1], reverse=True)[:top]
+        ],
+        "por_pacote_ms": {
+            pacote: round(us / 1000, 1) for pacote, us in list(por_pacote(modulos).items())[:top]
+        },
+        "sob_demanda_carregadas": carregados,
+    }
+
+
+def imprimir(dados: dict):
+    print(f"Importação de {dados['modulo']}: {dados['total_ms']} ms, {dados['modulos_importados']} módulos")
+    print("\nMais caros (tempo acumulado, inclui dependências):")
+    for item in dados["mais_caros_acumulado"]:
+        print(f"  {item['acumulado_ms']:9.1f} ms  {item['modulo']}")
+    print("\nMais caros (tempo próprio):")
+    for item in dados["mais_caros_proprio"]:
+        print(f"  {item['proprio_ms']:9.1f} ms  {item['modulo']}")
+    print("\nPor pacote (tempo próprio somado):")
+    for pacote, ms in dados["por_pacote_ms"].items():
+        print(f"  {ms:9.1f} ms  {pacote}")
+    carregadas = dados["sob_demanda_carregadas"]
+    print(
+        "\nDependências sob demanda importadas na inicialização: "
+        + (", ".join(carregadas) + "  <-- importação antecipada" if carregadas else "nenhuma")
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório do tempo de importação da aplicação.")
+    parser.add_argument("--modulo", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    argumentos = parser.parse_args()
+    imprimir(relatorio(argumentos.modulo, argumentos.top))
@@ -0,0 +1,51 @@
+# app/streaming.py
+#
+# Respostas NDJSON (um objeto JSON por linha) para listagens grandes, lidas
+# de um cursor do servidor: `AsyncSession.stream` com yield_per busca
+# STREAM_YIELD_PER linhas por vez (cursor nomeado no PostgreSQL) e cada lote
+# vira um único pedaço da resposta. A memória fica constante e o primeiro
+# byte sai assim que o primeiro lote chega.
+#
+# A consulta roda em uma sessão própria, aberta dentro do gerador: as
+# dependências com yield (get_session) são encerradas antes de o corpo de um
+# StreamingResponse ser enviado. Validações que podem virar 404/422 devem ser
+# feitas na rota, antes de criar a resposta.
+
+import os
+from typing import Any, AsyncIterator, Callable
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+from app.database import async_session
+from app.serialization import ORJSON_OPTIONS, aninhar, orjson_default
+
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+STREAM_YIELD_PER = int(os.getenv("STREAM_YIELD_PER", "1000"))
+
+_OPCOES_LINHA = ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+
+
+def linha_ndjson(conteudo: Any) -> bytes:
+    return orjson.dumps(conteudo, default=orjson_default, option=_OPCOES_LINHA)
+
+
+async def linhas_ndjson(
+    query,
+    transformar: Callable[[Any], Any] = aninhar,
+    yield_per: int = STREAM_YIELD_PER,
+) -> AsyncIterator[bytes]:
+    """Executa a consulta em streaming e gera um pedaço (várias linhas NDJSON) por lote."""
+    async with async_session() as session:
+        resultado = await session.stream(query.execution_options(yield_per=yield_per))
+        try:
+            async for linhas in resultado.partitions():
+                yield b"".join([linha_ndjson(transformar(linha)) for linha in linhas])
+        finally:
+            # Cliente desconectado no meio: fecha o cursor antes da sessão
+            await resultado.close()
+
+
+def resposta_ndjson(query, transformar: Callable[[Any], Any] = aninhar) -> StreamingResponse:
+    """StreamingResponse NDJSON de uma consulta que já projeta as colunas da resposta."""
+    return StreamingResponse(linhas_ndjson(query, transformar), media_type=MEDIA_TYPE_NDJSON)
@@ -0,0 +1,145 @@
+# app/templating.py
+#
+# Ambiente Jinja2 único da aplicação: usado pelas páginas (pages.py), pela
+# raiz (main.py) e pela página de edição de contagem (contagens.py).
+
+import os
+import typing
+from datetime import datetime
+from urllib.parse import urlencode
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+from app.assets import asset_url
+
+TEMPLATES_DIR = "templates"
+# Diretório do cache de bytecode dos templates compilados (compartilhado entre workers)
+BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR", ".cache/jinja")
+# Tamanho mínimo de cada pedaço enviado ao navegador durante o streaming
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+# --- FUNÇÃO DE FILTRO PERSONALIZADO ---
+def format_datetime(value, fmt="%d/%m/%Y %H:%M"):
+    """Filtro Jinja2 para formatar um datetime."""
+    if isinstance(value, str):
+        # Tenta converter de string ISO para datetime, se necessário
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value # Retorna o valor original se não puder converter
+    if isinstance(value, datetime):
+        return value.strftime(fmt)
+    return value
+
+
+# --- FILTRO urlencode_exclude ---
+def urlencode_with_exclude(query_params, **kwargs):
+    # Converte o MultiDict do Starlette para um dict simples
+    params = dict(query_params)
+    # Pega a chave a ser excluída a partir dos kwargs do filtro
+    exclude_key = kwargs.get("exclude")
+
+    # Remove a chave, se ela existir no dicionário
+    if exclude_key and exclude_key in params:
+        del params[exclude_key]
+
+    # Codifica os parâmetros restantes e retorna a string
+    return urlencode(params)
+
+
+async def _agrupar(partes: typing.AsyncIterator[str], tamanho: int) -> typing.AsyncIterator[str]:
+    """Junta os pequenos pedaços gerados pelo Jinja em blocos de ~`tamanho` caracteres."""
+    buffer = []
+    acumulado = 0
+    async for parte in partes:
+        buffer.append(parte)
+        acumulado += len(parte)
+        if acumulado >= tamanho:
+            yield "".join(buffer)
+            buffer.clear()
+            acumulado = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+class StreamingTemplateResponse(StreamingResponse):
+    """
+    Resposta HTML renderizada com `Template.generate_async`: os primeiros bytes
+    chegam ao navegador antes de a página inteira (ex.: tabelas grandes) estar pronta.
+    """
+
+    def __init__(
+        self,
+        template: Template,
+        context: dict,
+        status_code: int = 200,
+        headers: typing.Optional[typing.Mapping[str, str]] = None,
+        media_type: typing.Optional[str] = None,
+        background: typing.Optional[BackgroundTask] = None,
+    ):
+        self.template = template
+        self.context = context
+        super().__init__(
+            _agrupar(template.generate_async(context), STREAM_CHUNK_SIZE),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type or "text/html",
+            background=background,
+        )
+
+
+class StreamingJinja2Templates(Jinja2Templates):
+    """
+    Jinja2Templates sobre um ambiente assíncrono: todo TemplateResponse é
+    renderizado em streaming. Aceita a chamada usada no projeto,
+    `TemplateResponse(name, {"request": request, ...})`, e também a forma
+    `TemplateResponse(request, name, context)`.
+    """
+
+    def TemplateResponse(self, *args, **kwargs) -> StreamingTemplateResponse:
+        if args and not isinstance(args[0], str):
+            request, name, *resto = args
+            context = resto[0] if resto else kwargs.pop("context", {})
+            context.setdefault("request", request)
+        else:
+            name = args[0] if args else kwargs.pop("name")
+            context = args[1] if len(args) > 1 else kwargs.pop("context", {})
+        if "request" not in context:
+            raise ValueError('context must include a "request" key')
+
+        for context_processor in self.context_processors:
+            context.update(context_processor(context["request"]))
+
+        return StreamingTemplateResponse(self.get_template(name), context, **kwargs)
+
+
+def criar_ambiente() -> Environment:
+    os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        enable_async=True,
+        bytecode_cache=FileSystemBytecodeCache(BYTECODE_CACHE_DIR),
+    )
+    env.filters["datetimeformat"] = format_datetime
+    env.filters["urlencode_with_exclude"] = urlencode_with_exclude
+    env.globals["asset_url"] = asset_url
+    return env
+
+
+def precompilar_templates() -> int:
+    """
+    Compila todos os templates (populando o cache de bytecode e o cache em
+    memória do ambiente) para que a primeira requisição não pague por isso.
+    """
+    nomes = templates.env.list_templates(extensions=["html"])
+    for nome in nomes:
+        templates.env.get_template(nome)
+    return len(nomes)
+
+
+templates = StreamingJinja2Templates(env=criar_ambiente())
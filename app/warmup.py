@@ -0,0 +1,108 @@
+# app/warmup.py
+#
+# Aquecimento executado pelo lifespan da aplicação antes de ela aceitar
+# requisições, para que a primeira requisição após um deploy tenha a mesma
+# latência do regime:
+# - abre DB_POOL_WARM conexões do pool ao mesmo tempo (conexão TCP,
+#   autenticação e, no asyncpg, a introspecção de tipos);
+# - em cada uma delas executa as consultas de lista mais usadas, populando o
+#   cache de SQL compilado do SQLAlchemy e o cache de prepared statements da
+#   conexão (lendo só a primeira linha, por um cursor);
+# - chama uma vez as rotas GET de lista direto no roteador (sem middlewares),
+#   aquecendo validação, serialização e os caches em memória das rotas.
+# Os comandos do aquecimento não entram nas estatísticas de /api/admin/sql-stats.
+
+import asyncio
+import os
+import time
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp
+
+from app import queries
+from app.sql_instrumentation import REGISTRO_SQL
+
+# Rotas GET aquecidas no roteador (listas que abrem as páginas principais)
+ROTAS_QUENTES = (
+    "/api/contagens/",
+    "/api/sistemas/",
+    "/api/projetos/",
+    "/api/clientes/",
+    "/api/fatores-ajuste/",
+    "/api/lookup/clientes",
+)
+
+
+def conexoes_para_aquecer(engine: AsyncEngine) -> int:
+    """DB_POOL_WARM, limitado ao tamanho do pool (1 para pools de conexão única)."""
+    tamanho = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    return max(min(int(os.getenv("DB_POOL_WARM", str(tamanho))), tamanho), 0)
+
+
+async def _aquecer_conexao(engine: AsyncEngine, conexoes_abertas: asyncio.Barrier):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        # Mantém esta conexão ocupada até todas abrirem: assim o pool cria
+        # conexões distintas em vez de reutilizar a primeira
+        await conexoes_abertas.wait()
+        for consulta in (queries.select_contagens(), queries.select_sistemas()):
+            async with conn.stream(consulta) as resultado:
+                await resultado.first()
+
+
+async def aquecer_pool(engine: AsyncEngine) -> int:
+    """Abre e aquece as conexões do pool; retorna quantas foram aquecidas."""
+    quantidade = conexoes_para_aquecer(engine)
+    if quantidade:
+        barreira = asyncio.Barrier(quantidade)
+        await asyncio.gather(*(_aquecer_conexao(engine, barreira) for _ in range(quantidade)))
+    return quantidade
+
+
+async def aquecer_rotas(app: ASGIApp, rotas: tuple = ROTAS_QUENTES) -> dict:
+    """Executa cada rota uma vez direto no roteador; retorna {rota: status}."""
+    resultados = {}
+    for rota in rotas:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": rota, "raw_path": rota.encode(), "root_path": "",
+            "query_string": b"", "headers": [(b"host", b"aquecimento")],
+            "client": ("127.0.0.1", 0), "server": ("aquecimento", 80), "app": app,
+        }
+        status = [0]
+        recebido = False
+
+        async def receive():
+            nonlocal recebido
+            if recebido:
+                # Não há mais corpo: espera como um cliente conectado
+                await asyncio.Event().wait()
+            recebido = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+
+        await app.router(scope, receive, send)
+        resultados[rota] = status[0]
+    return resultados
+
+
+async def aquecer(app, engine: AsyncEngine) -> dict:
+    """Aquece pool e rotas; retorna um resumo com a duração de cada etapa."""
+    inicio = time.perf_counter()
+    conexoes = await aquecer_pool(engine)
+    pool_ms = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    rotas = await aquecer_rotas(app)
+    rotas_ms = (time.perf_counter() - inicio) * 1000
+
+    falhas = {rota: status for rota, status in rotas.items() if status >= 500}
+    if falhas:
+        logger.warning("Rotas com erro no aquecimento: {}", falhas)
+    REGISTRO_SQL.limpar()
+    return {"conexoes": conexoes, "pool_ms": round(pool_ms, 1), "rotas": rotas, "rotas_ms": round(rotas_ms, 1)}
@@ -0,0 +1,12 @@
+# benchmarks/__init__.py
+#
+# Benchmarks de desempenho da aplicação. Cada módulo é executável com
+# `python -m benchmarks.<modulo>` a partir da raiz do projeto.
+#
+# Sem DATABASE_URL, os benchmarks usam um SQLite em memória descartável (a
+# aplicação exige a variável; aqui o banco efêmero é pedido explicitamente).
+
+import os
+
+BANCO_MEMORIA = "sqlite+aiosqlite://"
+os.environ.setdefault("DATABASE_URL", BANCO_MEMORIA)
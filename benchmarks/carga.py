@@ -0,0 +1,297 @@
+# benchmarks/carga.py
+#
+# Teste de carga HTTP reproduzível: sobe a aplicação em um uvicorn real
+# (processo separado, com N workers) sobre o banco de DATABASE_URL e simula
+# usuários percorrendo fluxos realistas:
+# - lista: página /contagens, depois com filtros e ordenação, e a API de lista;
+# - edicao: página de edição, combos em cascata (projetos do cliente,
+#   sistemas do projeto) e a aba de funções (/api/contagens/{id}/edit);
+# - importacao: as etapas 1 a 3 da importação de uma planilha sintética e
+#   a pré-visualização paginada.
+#
+# Cada usuário virtual usa uma única conexão keep-alive, como um navegador:
+# assim todas as etapas de uma importação caem no mesmo worker (os dados em
+# staging ficam na memória do processo). Os usuários não têm tempo de
+# espera entre as requisições, então a vazão medida é a máxima do servidor.
+#
+# Para cada número de workers o relatório mostra vazão e p50/p95/p99 por rota;
+# no fim, a curva de escala (vazão total e p95 por número de workers). Os
+# resultados vão para benchmarks/resultados/carga.json.
+#
+# As páginas consultam a API em http://127.0.0.1:8000 (pages.API_BASE_URL),
+# por isso o servidor sobe sempre na porta 8000.
+#
+# Uso: python -m benchmarks.carga [--workers 1,2,4] [--usuarios 16] [--duracao 20]
+#                                 [--geradores 2] [--semente 42]
+
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from benchmarks.historico import RESULTADOS, gravar_historico, nova_execucao
+from benchmarks.planilha import gerar_planilha, mapeamento_padrao
+
+PORTA = 8000
+BASE_URL = f"http://127.0.0.1:{PORTA}"
+HISTORICO = RESULTADOS / "carga.json"
+# Peso de cada fluxo na escolha do próximo passo de um usuário
+PESOS_FLUXOS = {"lista": 6, "edicao": 3, "importacao": 1}
+FUNCOES_PLANILHA = 200
+AQUECIMENTO_S = 3
+
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil pelo método do vizinho mais próximo (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    posicao = max(int(round(p / 100 * len(valores))) - 1, 0)
+    return valores[min(posicao, len(valores) - 1)]
+
+
+class Amostras:
+    """Latências (s) e erros por rota, identificadas pelo nome do passo."""
+
+    def __init__(self):
+        self.latencias = {}
+        self.erros = {}
+        # Tempo real da rodada: os fluxos em andamento terminam após o prazo
+        self.duracao = 0.0
+
+    def registrar(self, rota: str, duracao: float, ok: bool):
+        self.latencias.setdefault(rota, []).append(duracao)
+        if not ok:
+            self.erros[rota] = self.erros.get(rota, 0) + 1
+
+    def juntar(self, outras: "Amostras"):
+        for rota, valores in outras.latencias.items():
+            self.latencias.setdefault(rota, []).extend(valores)
+        for rota, quantidade in outras.erros.items():
+            self.erros[rota] = self.erros.get(rota, 0) + quantidade
+        self.duracao = max(self.duracao, outras.duracao)
+
+    def resumo(self) -> dict:
+        duracao = self.duracao
+        rotas = {}
+        for rota, valores in sorted(self.latencias.items()):
+            valores = sorted(valores)
+            rotas[rota] = {
+                "requisicoes": len(valores),
+                "erros": self.erros.get(rota, 0),
+                "req_por_s": round(len(valores) / duracao, 1),
+                "p50_ms": round(percentil(valores, 50) * 1000, 2),
+                "p95_ms": round(percentil(valores, 95) * 1000, 2),
+                "p99_ms": round(percentil(valores, 99) * 1000, 2),
+            }
+        todas = sorted(v for valores in self.latencias.values() for v in valores)
+        return {
+            "req_por_s": round(len(todas) / duracao, 1),
+            "erros": sum(self.erros.values()),
+            "p50_ms": round(percentil(todas, 50) * 1000, 2),
+            "p95_ms": round(percentil(todas, 95) * 1000, 2),
+            "p99_ms": round(percentil(todas, 99) * 1000, 2),
+            "rotas": rotas,
+        }
+
+
+# --- Fluxos de usuário ---
+
+class Usuario:
+    def __init__(self, client: httpx.AsyncClient, dados: dict, rng: random.Random, amostras: Amostras):
+        self.client = client
+        self.dados = dados
+        self.rng = rng
+        self.amostras = amostras
+
+    async def requisitar(self, rota: str, metodo: str, url: str, **kwargs) -> httpx.Response:
+        inicio = time.perf_counter()
+        try:
+            resposta = await self.client.request(metodo, url, **kwargs)
+            ok = resposta.status_code < 400
+        except httpx.HTTPError:
+            resposta, ok = None, False
+        self.amostras.registrar(rota, time.perf_counter() - inicio, ok)
+        return resposta
+
+    async def lista(self):
+        contagem = self.rng.choice(self.dados["contagens"])
+        await self.requisitar("GET /contagens", "GET", "/contagens")
+        await self.requisitar(
+            "GET /contagens?filtros", "GET", "/contagens",
+            params={"cliente_id": contagem["cliente_id"], "sort": "descricao"},
+        )
+        await self.requisitar(
+            "GET /api/contagens/?filtros", "GET", "/api/contagens/",
+            params={"descricao": contagem["descricao"][:10], "tipo_contagem": contagem["tipo_contagem"]},
+        )
+
+    async def edicao(self):
+        contagem = self.rng.choice(self.dados["contagens"])
+        await self.requisitar("GET /contagens/{id}/editar", "GET", f"/contagens/{contagem['id']}/editar")
+        await self.requisitar(
+            "GET /api/projetos/cliente/{id}", "GET", f"/api/projetos/cliente/{contagem['cliente_id']}"
+        )
+        await self.requisitar(
+            "GET /api/sistemas/projeto/{id}", "GET", f"/api/sistemas/projeto/{contagem['projeto_id']}"
+        )
+        await self.requisitar("GET /api/contagens/{id}/edit", "GET", f"/api/contagens/{contagem['id']}/edit")
+
+    async def importacao(self):
+        contagem_id = self.rng.choice(self.dados["contagens_detalhadas"])
+        base = f"/api/funcoes/contagem/{contagem_id}"
+        arquivo = {"file": ("planilha.xlsx", self.dados["planilha"])}
+        resposta = await self.requisitar("POST upload_step1", "POST", f"{base}/upload_step1", files=arquivo)
+        if resposta is None or resposta.status_code != 200:
+            return
+        await self.requisitar("POST validate_step2", "POST", f"{base}/validate_step2")
+        await self.requisitar(
+            "POST process_mapping_step3", "POST", f"{base}/process_mapping_step3", json=self.dados["mapeamento"]
+        )
+        await self.requisitar("GET preview", "GET", f"{base}/preview", params={"fonte": "processados", "limit": 50})
+
+
+async def _usuario(dados: dict, semente: int, fim: float, amostras: Amostras):
+    rng = random.Random(semente)
+    fluxos, pesos = zip(*PESOS_FLUXOS.items())
+    limites = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limites, timeout=60) as client:
+        usuario = Usuario(client, dados, rng, amostras)
+        while time.perf_counter() < fim:
+            await getattr(usuario, rng.choices(fluxos, pesos)[0])()
+
+
+async def _gerar_carga(dados: dict, usuarios: int, semente: int, duracao: float) -> Amostras:
+    amostras = Amostras()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_usuario(dados, semente + n, inicio + duracao, amostras) for n in range(usuarios)))
+    amostras.duracao = time.perf_counter() - inicio
+    return amostras
+
+
+def gerador(dados: dict, usuarios: int, semente: int, duracao: float) -> Amostras:
+    """Ponto de entrada de cada processo gerador de carga."""
+    return asyncio.run(_gerar_carga(dados, usuarios, semente, duracao))
+
+
+# --- Servidor ---
+
+def subir_servidor(workers: int) -> subprocess.Popen:
+    processo = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(PORTA), "--workers", str(workers),
+        "--log-level", "warning", "--no-access-log",
+    ], env={**os.environ, "LOG_LEVEL": os.getenv("LOG_LEVEL", "ERROR")})
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"O servidor terminou com o código {processo.returncode}.")
+        try:
+            if httpx.get(f"{BASE_URL}/api/clientes/", timeout=2).status_code == 200:
+                return processo
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError("O servidor não respondeu em 60 s.")
+
+
+def parar_servidor(processo: subprocess.Popen):
+    processo.terminate()
+    try:
+        processo.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+        processo.wait()
+
+
+def carregar_dados() -> dict:
+    """Ids usados pelos fluxos, lidos da própria API (o banco precisa ter contagens)."""
+    contagens = httpx.get(f"{BASE_URL}/api/contagens/", timeout=60).json()[:500]
+    if not contagens:
+        raise RuntimeError(
+            "O banco não tem contagens. Popule-o antes (ex.: python -m benchmarks.seed --contagens 2000 --funcoes 100000)."
+        )
+    campos = ("id", "descricao", "tipo_contagem", "metodo_contagem", "cliente_id", "projeto_id")
+    contagens = [{campo: c[campo] for campo in campos} for c in contagens]
+    return {
+        "contagens": contagens,
+        "contagens_detalhadas": [c["id"] for c in contagens if c["metodo_contagem"] == "Detalhada"]
+        or [contagens[0]["id"]],
+        "planilha": gerar_planilha(FUNCOES_PLANILHA),
+        "mapeamento": mapeamento_padrao("Detalhada"),
+    }
+
+
+def medir_workers(workers: int, usuarios: int, geradores: int, duracao: float, semente: int) -> dict:
+    processo = subir_servidor(workers)
+    try:
+        dados = carregar_dados()
+        # Os usuários são divididos entre processos geradores para o cliente
+        # não virar o gargalo quando há vários workers
+        por_gerador = [usuarios // geradores + (1 if n < usuarios % geradores else 0) for n in range(geradores)]
+        with ProcessPoolExecutor(max_workers=geradores) as executor:
+            list(executor.map(gerador, [dados] * geradores, por_gerador, range(geradores), [AQUECIMENTO_S] * geradores))
+            futuros = [
+                executor.submit(gerador, dados, quantidade, semente + 1000 * n, duracao)
+                for n, quantidade in enumerate(por_gerador) if quantidade
+            ]
+            amostras = Amostras()
+            for futuro in futuros:
+                amostras.juntar(futuro.result())
+    finally:
+        parar_servidor(processo)
+    return amostras.resumo()
+
+
+def relatar(workers: int, resumo: dict):
+    print(
+        f"\n{workers} worker(s): {resumo['req_por_s']} req/s, p50 {resumo['p50_ms']} ms, "
+        f"p95 {resumo['p95_ms']} ms, p99 {resumo['p99_ms']} ms, {resumo['erros']} erros"
+    )
+    for rota, medida in resumo["rotas"].items():
+        print(
+            f"  {rota:>34}: {medida['req_por_s']:8.1f} req/s  p50 {medida['p50_ms']:8.2f}  "
+            f"p95 {medida['p95_ms']:8.2f}  p99 {medida['p99_ms']:8.2f} ms  erros {medida['erros']}"
+        )
+
+
+def executar(lista_workers: list, usuarios: int, geradores: int, duracao: float, semente: int) -> dict:
+    curva = {}
+    for workers in lista_workers:
+        curva[str(workers)] = medir_workers(workers, usuarios, geradores, duracao, semente)
+        relatar(workers, curva[str(workers)])
+
+    print("\nCurva de escala (workers -> vazão total, p95):")
+    base = curva[str(lista_workers[0])]["req_por_s"]
+    for workers, resumo in curva.items():
+        ganho = resumo["req_por_s"] / base if base else 0.0
+        print(f"  {workers:>3}: {resumo['req_por_s']:8.1f} req/s ({ganho:4.2f}x)  p95 {resumo['p95_ms']:8.2f} ms")
+
+    execucao = nova_execucao(
+        usuarios=usuarios, geradores=geradores, duracao_s=duracao, semente=semente,
+        cpus=os.cpu_count(), pesos_fluxos=PESOS_FLUXOS, curva=curva,
+    )
+    gravar_historico(execucao, HISTORICO)
+    return execucao
+
+
+def _opcao(argumentos: list, nome: str, padrao: str) -> str:
+    if nome in argumentos:
+        return argumentos[argumentos.index(nome) + 1]
+    return padrao
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    executar(
+        [int(w) for w in _opcao(argumentos, "--workers", "1,2,4").split(",")],
+        usuarios=int(_opcao(argumentos, "--usuarios", "16")),
+        geradores=int(_opcao(argumentos, "--geradores", "2")),
+        duracao=float(_opcao(argumentos, "--duracao", "20")),
+        semente=int(_opcao(argumentos, "--semente", "42")),
+    )
@@ -0,0 +1,142 @@
+# benchmarks/compression.py
+#
+# Compara bytes transferidos e custo de CPU da compressão das respostas
+# (app.compression) em diferentes níveis de gzip e brotli, para três cargas
+# típicas: a listagem de contagens (JSON), a página de edição de uma contagem
+# com todas as funções (HTML) e a prévia de linhas importadas (JSON).
+#
+# O HTML é comprimido em pedaços de STREAM_CHUNK_SIZE com flush a cada
+# pedaço, como o middleware faz com respostas em streaming.
+#
+# Uso: python -m benchmarks.compression [funcoes]
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.compression import _Compressor
+from app.models import TipoFuncaoEnum
+from app.serialization import dumps
+from app.templating import STREAM_CHUNK_SIZE, templates
+
+NIVEIS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 1), ("br", 4), ("br", 6), ("br", 11)]
+
+
+def carga_contagens(quantidade: int = 2000) -> bytes:
+    return dumps([
+        {
+            "id": i,
+            "descricao": f"Contagem {i}",
+            "tipo_contagem": "Projeto de Melhoria",
+            "metodo_contagem": "Detalhada",
+            "data_criacao": datetime(2025, 1, 1, 12, 0),
+            "responsavel": "Responsável",
+            "cliente_id": i % 50,
+            "projeto_id": i % 200,
+            "sistema_id": i % 1000,
+            "cliente": {"id": i % 50, "nome": f"Cliente {i % 50}"},
+            "projeto": {"id": i % 200, "nome": f"Projeto {i % 200}", "cliente_id": i % 50},
+            "sistema": {"id": i % 1000, "nome": f"Sistema {i % 1000}", "projeto_id": i % 200},
+        }
+        for i in range(quantidade)
+    ])
+
+
+def carga_preview(quantidade: int = 500) -> bytes:
+    headers = ["Módulo", "Funcionalidade", "Nome", "Tipo", "DER", "RLR", "Fator Ajuste"]
+    return dumps({
+        "total_records": 30_000,
+        "total_filtrados": 30_000,
+        "offset": 0,
+        "limit": quantidade,
+        "headers": headers,
+        "rows": [
+            {
+                "linha": 10 + i,
+                "Módulo": f"Módulo {i % 12}",
+                "Funcionalidade": f"Funcionalidade {i % 90}",
+                "Nome": f"Consultar registro {i}",
+                "Tipo": ("ALI", "AIE", "EE", "CE", "SE")[i % 5],
+                "DER": i % 40,
+                "RLR": i % 6,
+                "Fator Ajuste": "Desenvolvimento",
+            }
+            for i in range(quantidade)
+        ],
+    })
+
+
+def pedacos_edicao(quantidade: int) -> list:
+    contagem = SimpleNamespace(
+        id=1, descricao="Contagem de exemplo", cliente_id=1, projeto_id=1, sistema_id=1,
+        tipo_contagem="Projeto de Melhoria", metodo_contagem="Detalhada",
+        data_criacao=datetime(2025, 1, 1), responsavel="Responsável",
+    )
+    tipos = list(TipoFuncaoEnum)
+    funcoes = [
+        SimpleNamespace(
+            id=i, nome=f"Consultar registro {i}", tipo_funcao=tipos[i % len(tipos)],
+            qtd_der=i % 40, desc_der="Campo A, Campo B, Campo C", qtd_rlr=i % 6, desc_rlr="Tabela X",
+            complexidade="Média", ponto_de_funcao_bruto=4, ponto_de_funcao_liquido=4.0,
+        )
+        for i in range(quantidade)
+    ]
+    contexto = {
+        "request": SimpleNamespace(query_params={}, url=SimpleNamespace(path="/contagens/1/edit")),
+        "contagem": contagem,
+        "funcoes": funcoes,
+        "clientes": [SimpleNamespace(id=i, nome=f"Cliente {i}") for i in range(50)],
+        "projetos": [SimpleNamespace(id=i, nome=f"Projeto {i}") for i in range(200)],
+        "sistemas": [SimpleNamespace(id=i, nome=f"Sistema {i}") for i in range(1000)],
+        "tipos_contagem": ["Projeto de Melhoria"],
+        "metodos_contagem": ["Detalhada", "Estimativa"],
+    }
+    template = templates.get_template("contagens/edit.html")
+
+    async def renderizar():
+        html = "".join([parte async for parte in template.generate_async(contexto)]).encode("utf-8")
+        return [html[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(html), STREAM_CHUNK_SIZE)]
+
+    return asyncio.run(renderizar())
+
+
+def medir(pedacos: list, codificacao: str, nivel: int, repeticoes: int = 5) -> dict:
+    melhor = float("inf")
+    tamanho = 0
+    for _ in range(repeticoes):
+        compressor = _Compressor(codificacao, gzip_level=nivel, brotli_quality=nivel)
+        inicio = time.process_time()
+        saida = [compressor.comprimir(p) for p in pedacos[:-1]]
+        saida.append(compressor.finalizar(pedacos[-1]))
+        melhor = min(melhor, time.process_time() - inicio)
+        tamanho = sum(len(s) for s in saida)
+    return {"bytes": tamanho, "cpu_ms": round(melhor * 1000, 2)}
+
+
+def executar(funcoes: int) -> dict:
+    cargas = {
+        "GET /api/contagens/ (JSON)": [carga_contagens()],
+        "GET /api/contagens/{id}/edit (HTML, streaming)": pedacos_edicao(funcoes),
+        "GET /api/funcoes/contagem/{id}/preview (JSON)": [carga_preview()],
+    }
+    resultado = {}
+    for nome, pedacos in cargas.items():
+        original = sum(len(p) for p in pedacos)
+        print(f"\n{nome}: {original / 1024:.1f} KiB sem compressão")
+        resultado[nome] = {"original": original}
+        for codificacao, nivel in NIVEIS:
+            medida = medir(pedacos, codificacao, nivel)
+            resultado[nome][f"{codificacao}-{nivel}"] = medida
+            razao = original / medida["bytes"]
+            print(
+                f"  {codificacao:>4} {nivel:>2}: {medida['bytes'] / 1024:8.1f} KiB "
+                f"({razao:5.1f}x)  {medida['cpu_ms']:7.2f} ms CPU"
+            )
+    return resultado
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:] if a.isdigit()]
+    executar(argumentos[0] if argumentos else 1000)
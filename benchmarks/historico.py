@@ -0,0 +1,47 @@
+# benchmarks/historico.py
+#
+# Histórico dos resultados dos benchmarks: cada execução é acrescentada a um
+# arquivo JSON em benchmarks/resultados/, junto com o commit e a versão do
+# Python, para comparar medidas entre commits.
+
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTADOS = Path(__file__).parent / "resultados"
+
+
+def commit_atual() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def nova_execucao(**campos) -> dict:
+    """Cabeçalho comum (data, commit, Python) mais os campos do benchmark."""
+    return {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "python": platform.python_version(),
+        **campos,
+    }
+
+
+def carregar_historico(caminho: Path) -> list:
+    try:
+        return json.loads(caminho.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+
+
+def gravar_historico(execucao: dict, caminho: Path) -> list:
+    historico = carregar_historico(caminho)
+    historico.append(execucao)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(json.dumps(historico, indent=2, ensure_ascii=False), encoding="utf-8")
+    return historico
@@ -0,0 +1,212 @@
+# benchmarks/import_pipeline.py
+#
+# Vazão e pico de memória da importação de planilhas, etapa por etapa:
+# upload_step1 (leitura da guia), validate_step2 (fatores novos),
+# process_mapping_step3 (mapeamento, validação e cálculo) e, isoladamente,
+# calculation.calcular_pontos_de_funcao.
+#
+# As planilhas vêm de benchmarks.planilha (formato da planilha modelo) e as
+# rotas são chamadas diretamente, com uma sessão do banco configurado em
+# DATABASE_URL (use um banco descartável: são criadas tabelas e uma contagem).
+# Sem DATABASE_URL, roda em um SQLite em memória (benchmarks/__init__.py).
+#
+# O tempo é o melhor de algumas repetições sem o tracemalloc; o pico de
+# memória vem de uma execução separada com o tracemalloc ligado (que deixa o
+# código bem mais lento). Cada execução é acrescentada ao histórico JSON com
+# o commit atual, e o relatório compara cada medida com a execução anterior.
+#
+# Uso: python -m benchmarks.import_pipeline [--estimada] [--repeticoes N] [tamanhos...]
+
+import asyncio
+import io
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.datastructures import UploadFile
+
+from app.database import async_engine
+from app.models import Cliente, Contagem, FatorAjuste, MetodoContagemEnum, Projeto, TipoAjuste, TipoContagemEnum
+from app.routers import funcoes
+from app.services import calculation
+from benchmarks.historico import RESULTADOS, gravar_historico, nova_execucao
+from benchmarks.planilha import TIPOS_PROJETO, gerar_planilha, mapeamento_padrao
+
+TAMANHOS = (500, 2_000, 10_000)
+HISTORICO = RESULTADOS / "import_pipeline.json"
+# Variação (em relação à execução anterior) a partir da qual a medida é destacada
+LIMITE_REGRESSAO = 0.10
+
+
+async def preparar_contagem(metodo: MetodoContagemEnum) -> int:
+    """Cria as tabelas, os fatores de ajuste do cadastro padrão e uma contagem vazia."""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        cliente = Cliente(nome="Cliente Benchmark")
+        session.add(cliente)
+        await session.flush()
+        projeto = Projeto(nome="Projeto Benchmark", cliente_id=cliente.id)
+        session.add(projeto)
+        await session.flush()
+        contagem = Contagem(
+            descricao="Benchmark de importação",
+            tipo_contagem=TipoContagemEnum.MELHORIA,
+            metodo_contagem=metodo,
+            data_criacao=datetime(2025, 1, 1),
+            responsavel="Benchmark",
+            cliente_id=cliente.id,
+            projeto_id=projeto.id,
+        )
+        session.add(contagem)
+        for nome, fator in TIPOS_PROJETO.items():
+            session.add(FatorAjuste(nome=nome, fator=fator, tipo_ajuste=TipoAjuste.PERCENTUAL))
+        await session.commit()
+        return contagem.id
+
+
+async def _etapas(contagem_id: int, conteudo: bytes, mapeamento: dict) -> dict:
+    """Executa as três etapas em sequência; retorna a duração de cada uma."""
+    duracoes = {}
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        arquivo = UploadFile(io.BytesIO(conteudo), filename="benchmark.xlsx")
+        inicio = time.perf_counter()
+        await funcoes.upload_step1(contagem_id, session=session, file=arquivo)
+        duracoes["upload_step1"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        await funcoes.validate_step2(contagem_id, session=session)
+        duracoes["validate_step2"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        await funcoes.process_mapping_step3(contagem_id, mapeamento=mapeamento, session=session)
+        duracoes["process_mapping_step3"] = time.perf_counter() - inicio
+    return duracoes
+
+
+async def _picos_memoria(contagem_id: int, conteudo: bytes, mapeamento: dict) -> dict:
+    """Mesmas etapas, com o pico de memória (tracemalloc) de cada uma."""
+    picos = {}
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        etapas = {
+            "upload_step1": lambda: funcoes.upload_step1(
+                contagem_id, session=session, file=UploadFile(io.BytesIO(conteudo), filename="benchmark.xlsx")
+            ),
+            "validate_step2": lambda: funcoes.validate_step2(contagem_id, session=session),
+            "process_mapping_step3": lambda: funcoes.process_mapping_step3(
+                contagem_id, mapeamento=mapeamento, session=session
+            ),
+        }
+        for nome, etapa in etapas.items():
+            tracemalloc.start()
+            await etapa()
+            picos[nome] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return picos
+
+
+def _linhas_calculo(contagem_id: int) -> list:
+    """Entradas do cálculo no formato montado pela etapa 3."""
+    processados = funcoes.db_temp[contagem_id]["dados_processados"]
+    colunas = ["tipo_funcao", "qtd_der", "qtd_rlr"]
+    linhas = processados[colunas].astype(object).to_dict(orient="records")
+    for linha in linhas:
+        linha["fator_ajuste"] = 0.75
+    return linhas
+
+
+def medir_calculo(linhas: list, repeticoes: int) -> tuple:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        copias = [dict(linha) for linha in linhas]
+        inicio = time.perf_counter()
+        for linha in copias:
+            calculation.calcular_pontos_de_funcao(linha)
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    copias = [dict(linha) for linha in linhas]
+    tracemalloc.start()
+    for linha in copias:
+        calculation.calcular_pontos_de_funcao(linha)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return melhor, pico
+
+
+async def medir_tamanho(contagem_id: int, metodo: str, funcoes_por_guia: int, repeticoes: int) -> dict:
+    conteudo = gerar_planilha(funcoes_por_guia)
+    mapeamento = mapeamento_padrao(metodo)
+
+    melhores = {}
+    for _ in range(repeticoes):
+        for etapa, duracao in (await _etapas(contagem_id, conteudo, mapeamento)).items():
+            melhores[etapa] = min(melhores.get(etapa, float("inf")), duracao)
+    picos = await _picos_memoria(contagem_id, conteudo, mapeamento)
+    linhas_calculo = _linhas_calculo(contagem_id)
+    melhores["calcular_pontos_de_funcao"], picos["calcular_pontos_de_funcao"] = medir_calculo(
+        linhas_calculo, repeticoes
+    )
+    funcoes.db_temp.pop(contagem_id, None)
+
+    return {
+        etapa: {
+            "ms": round(duracao * 1000, 2),
+            "linhas_por_s": round(funcoes_por_guia / duracao),
+            "pico_mb": round(picos[etapa] / 2**20, 2),
+        }
+        for etapa, duracao in melhores.items()
+    } | {"arquivo_kb": round(len(conteudo) / 1024, 1)}
+
+
+def _anterior(historico: list, metodo: str, tamanho: str) -> dict:
+    """Medidas da execução anterior (mesmo método e tamanho), se houver."""
+    for execucao in reversed(historico[:-1]):
+        if execucao["metodo"] == metodo and tamanho in execucao["resultados"]:
+            return execucao["resultados"][tamanho]
+    return {}
+
+
+def relatar(historico: list):
+    atual = historico[-1]
+    print(f"Importação ({atual['metodo']}) no commit {atual['commit']}:")
+    for tamanho, etapas in atual["resultados"].items():
+        anterior = _anterior(historico, atual["metodo"], tamanho)
+        print(f"  {tamanho} funções ({etapas['arquivo_kb']} KiB):")
+        for etapa, medida in etapas.items():
+            if etapa == "arquivo_kb":
+                continue
+            comparacao = ""
+            if etapa in anterior:
+                variacao = (medida["ms"] - anterior[etapa]["ms"]) / anterior[etapa]["ms"]
+                alerta = "  <-- REGRESSÃO" if variacao > LIMITE_REGRESSAO else ""
+                comparacao = f"  ({variacao:+.1%} vs anterior){alerta}"
+            print(
+                f"    {etapa:>26}: {medida['ms']:9.2f} ms  {medida['linhas_por_s']:>9} linhas/s  "
+                f"pico {medida['pico_mb']:7.2f} MB{comparacao}"
+            )
+
+
+async def executar(metodo: str, tamanhos: list, repeticoes: int) -> dict:
+    contagem_id = await preparar_contagem(MetodoContagemEnum(metodo))
+    resultados = {}
+    for tamanho in tamanhos:
+        resultados[str(tamanho)] = await medir_tamanho(contagem_id, metodo, tamanho, repeticoes)
+    await async_engine.dispose()
+
+    execucao = nova_execucao(metodo=metodo, repeticoes=repeticoes, resultados=resultados)
+    relatar(gravar_historico(execucao, HISTORICO))
+    return execucao
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    metodo = "Estimada" if "--estimada" in argumentos else "Detalhada"
+    repeticoes = 3
+    if "--repeticoes" in argumentos:
+        repeticoes = int(argumentos[argumentos.index("--repeticoes") + 1])
+        del argumentos[argumentos.index("--repeticoes"):argumentos.index("--repeticoes") + 2]
+    tamanhos = [int(a) for a in argumentos if a.isdigit()] or list(TAMANHOS)
+    asyncio.run(executar(metodo, tamanhos, repeticoes))
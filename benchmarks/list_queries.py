@@ -0,0 +1,129 @@
+# benchmarks/list_queries.py
+#
+# Compara, para read_contagens e read_sistemas, o caminho antigo (objetos ORM
+# + selectinload) com as consultas de projeção de app.queries: número de
+# comandos SQL emitidos e latência (consulta + montagem da resposta).
+#
+# Usa o banco configurado em DATABASE_URL. Com --seed, cria as tabelas e
+# insere dados sintéticos antes de medir (use um banco descartável; sem
+# DATABASE_URL, o banco é um SQLite em memória, ver benchmarks/__init__.py,
+# e --seed é obrigatório).
+#
+# Uso: python -m benchmarks.list_queries [--seed] [contagens]
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import queries
+from app.database import async_engine
+from app.models import Cliente, Contagem, MetodoContagemEnum, Projeto, Sistema, TipoContagemEnum
+from app.schemas import ContagemReadWithRelations, SistemaReadWithProjeto
+from app.serialization import resposta_linhas, resposta_lista
+
+
+class ContadorSQL:
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, *args, **kwargs):
+        self.total += 1
+
+
+async def popular(quantidade: int):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        clientes = [Cliente(nome=f"Cliente {i}") for i in range(50)]
+        session.add_all(clientes)
+        await session.flush()
+        projetos = [Projeto(nome=f"Projeto {i}", cliente_id=clientes[i % 50].id) for i in range(200)]
+        session.add_all(projetos)
+        await session.flush()
+        sistemas = [Sistema(nome=f"Sistema {i}", projeto_id=projetos[i % 200].id) for i in range(1000)]
+        session.add_all(sistemas)
+        await session.flush()
+        for i in range(quantidade):
+            projeto = projetos[i % 200]
+            session.add(Contagem(
+                descricao=f"Contagem {i}",
+                tipo_contagem=TipoContagemEnum.MELHORIA,
+                metodo_contagem=MetodoContagemEnum.DETALHADA,
+                data_criacao=datetime(2025, 1, 1),
+                responsavel="Responsável",
+                cliente_id=projeto.cliente_id,
+                projeto_id=projeto.id,
+                sistema_id=sistemas[i % 1000].id if i % 3 else None,
+            ))
+        await session.commit()
+
+
+async def contagens_orm(session):
+    query = select(Contagem).options(
+        selectinload(Contagem.projeto).selectinload(Projeto.cliente),
+        selectinload(Contagem.cliente),
+        selectinload(Contagem.sistema),
+    ).order_by(Contagem.data_criacao.desc())
+    result = await session.execute(query)
+    return resposta_lista(result.scalars().all(), ContagemReadWithRelations)
+
+
+async def contagens_projecao(session):
+    result = await session.execute(queries.select_contagens())
+    return resposta_linhas(result.all())
+
+
+async def sistemas_orm(session):
+    query = select(Sistema).options(
+        selectinload(Sistema.projeto).selectinload(Projeto.cliente)
+    ).order_by(Sistema.nome)
+    result = await session.execute(query)
+    return resposta_lista(result.scalars().all(), SistemaReadWithProjeto)
+
+
+async def sistemas_projecao(session):
+    result = await session.execute(queries.select_sistemas())
+    return resposta_linhas(result.all())
+
+
+async def medir(funcao, repeticoes: int = 5) -> dict:
+    contador = ContadorSQL()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", contador)
+    melhor = float("inf")
+    try:
+        for _ in range(repeticoes):
+            async with AsyncSession(async_engine) as session:
+                inicio = time.perf_counter()
+                await funcao(session)
+                melhor = min(melhor, time.perf_counter() - inicio)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", contador)
+    return {"consultas": contador.total // repeticoes, "ms": round(melhor * 1000, 1)}
+
+
+async def executar(seed: bool, quantidade: int) -> dict:
+    if seed:
+        await popular(quantidade)
+    resultado = {
+        "read_contagens_orm": await medir(contagens_orm),
+        "read_contagens_projecao": await medir(contagens_projecao),
+        "read_sistemas_orm": await medir(sistemas_orm),
+        "read_sistemas_projecao": await medir(sistemas_projecao),
+    }
+    await async_engine.dispose()
+    for chave, valor in resultado.items():
+        print(f"{chave:>24}: {valor['consultas']} consultas, {valor['ms']} ms")
+    return resultado
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    seed = "--seed" in argumentos
+    numeros = [int(a) for a in argumentos if a.isdigit()]
+    asyncio.run(executar(seed, numeros[0] if numeros else 10_000))
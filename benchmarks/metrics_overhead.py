@@ -0,0 +1,154 @@
+# benchmarks/metrics_overhead.py
+#
+# Overhead do MetricsMiddleware em uma rota "hello world" (o pior caso: a
+# rota não faz nada, então todo o custo extra é do middleware).
+#
+# - HTTP: um uvicorn real (processo separado, loopback) serve as duas
+#   versões da aplicação, escolhidas pelo prefixo /sem ou /com, e recebe
+#   requisições sequenciais por uma conexão keep-alive. Mesmo processo e
+#   mesma conexão para as duas, então a diferença é só o middleware. É a
+#   medida usada para o limite de 2%.
+# - ASGI: chamadas diretas à aplicação, sem rede nem servidor, para isolar o
+#   custo absoluto do middleware por requisição (em microssegundos). Como a
+#   base aqui é só o roteamento do FastAPI, o percentual é um limite superior.
+#
+# As rodadas com e sem o middleware são intercaladas para diluir o ruído.
+#
+# Uso: python -m benchmarks.metrics_overhead [requisicoes]
+
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.metrics import MetricsMiddleware, RegistroMetricas
+
+RODADAS = 9
+# HTTP: blocos curtos e alternados, para que variações da máquina afetem os dois lados
+BLOCOS_HTTP = 40
+
+
+def criar_app(com_metricas: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/hello")
+    async def hello():
+        return {"hello": "world"}
+
+    if com_metricas:
+        app.add_middleware(MetricsMiddleware, registro=RegistroMetricas())
+    return app
+
+
+app_sem = criar_app(False)
+app_com = criar_app(True)
+
+
+async def app_http(scope, receive, send):
+    """Despacha /sem/... e /com/... para a aplicação correspondente."""
+    if scope["type"] == "http":
+        prefixo, _, resto = scope["path"][1:].partition("/")
+        scope = dict(scope, path=f"/{resto}", raw_path=f"/{resto}".encode())
+        await (app_com if prefixo == "com" else app_sem)(scope, receive, send)
+        return
+    await app_sem(scope, receive, send)
+
+
+async def _asgi(app, requisicoes: int) -> float:
+    scope = {
+        "type": "http", "method": "GET", "path": "/hello", "raw_path": b"/hello",
+        "query_string": b"", "headers": [(b"host", b"bench")], "http_version": "1.1",
+        "scheme": "http", "server": ("bench", 80), "client": ("bench", 1), "root_path": "",
+    }
+    recebido = {"type": "http.request", "body": b"", "more_body": False}
+
+    async def receive():
+        return recebido
+
+    async def send(message):
+        pass
+
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - inicio) / requisicoes
+
+
+def medir_asgi(requisicoes: int) -> dict:
+    apps = {"sem": app_sem, "com": app_com}
+    tempos = {"sem": [], "com": []}
+    for _ in range(RODADAS):
+        for nome, app in apps.items():
+            tempos[nome].append(asyncio.run(_asgi(app, requisicoes)))
+    return {nome: statistics.median(valores) for nome, valores in tempos.items()}
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _subir() -> tuple:
+    porta = _porta_livre()
+    processo = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "benchmarks.metrics_overhead:app_http",
+        "--host", "127.0.0.1", "--port", str(porta), "--log-level", "warning", "--lifespan", "off",
+    ])
+    base_url = f"http://127.0.0.1:{porta}"
+    while True:
+        try:
+            httpx.get(f"{base_url}/sem/hello")
+            return processo, base_url
+        except httpx.ConnectError:
+            time.sleep(0.1)
+
+
+def medir_http(requisicoes: int) -> dict:
+    processo, base_url = _subir()
+    urls = {nome: f"{base_url}/{nome}/hello" for nome in ("sem", "com")}
+    tempos = {"sem": [], "com": []}
+    try:
+        with httpx.Client() as client:
+            for url in urls.values():
+                for _ in range(500):  # aquecimento
+                    client.get(url)
+            tamanho_bloco = max(requisicoes // BLOCOS_HTTP, 1)
+            for bloco in range(BLOCOS_HTTP):
+                # Alterna a ordem a cada bloco
+                ordem = list(urls.items()) if bloco % 2 == 0 else list(reversed(urls.items()))
+                for nome, url in ordem:
+                    inicio = time.perf_counter()
+                    for _ in range(tamanho_bloco):
+                        client.get(url)
+                    tempos[nome].append((time.perf_counter() - inicio) / tamanho_bloco)
+    finally:
+        processo.terminate()
+        processo.wait()
+    return {nome: statistics.median(valores) for nome, valores in tempos.items()}
+
+
+def _relatar(titulo: str, tempos: dict) -> float:
+    overhead = (tempos["com"] - tempos["sem"]) / tempos["sem"] * 100
+    print(
+        f"{titulo}: sem {tempos['sem'] * 1e6:7.1f} µs/req, com {tempos['com'] * 1e6:7.1f} µs/req "
+        f"-> +{(tempos['com'] - tempos['sem']) * 1e6:.1f} µs ({overhead:+.2f}%)"
+    )
+    return overhead
+
+
+def executar(requisicoes: int) -> dict:
+    return {
+        "asgi": _relatar("ASGI direto   ", medir_asgi(requisicoes * 5)),
+        "http": _relatar("HTTP (uvicorn)", medir_http(requisicoes * 5)),
+    }
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:] if a.isdigit()]
+    executar(argumentos[0] if argumentos else 2000)
@@ -0,0 +1,175 @@
+# benchmarks/planilha.py
+#
+# Gerador de planilhas sintéticas no formato da planilha modelo de contagem
+# (guias "AFP - Detalhada" e "AFP - Estimativa"), usadas pelos benchmarks da
+# importação:
+# - linhas 1 a 7: cabeçalho do documento (título, sistema, responsável...);
+# - linhas 8 e 9: cabeçalho de duas linhas com células mescladas, como na
+#   planilha real. "DER" e "RLR" agrupam "Qtd"/"Descrição" e as famílias
+#   "Tipo Projeto" e "Fator Ajuste" agrupam uma coluna por release;
+# - a partir da linha 10: uma função por linha, seguida da linha de marcação
+#   "Só inserir linhas antes desta.".
+#
+# A geração é determinística a partir da semente. Uma pequena fração das
+# linhas traz erros típicos de preenchimento (quantidade em texto, nome vazio,
+# tipo de função inválido) para exercitar a validação.
+#
+# Uso: python -m benchmarks.planilha [funcoes] [arquivo.xlsx]
+
+import io
+import random
+import sys
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font
+
+from app.fixtures import FATORES_PADRAO
+from app.services.validation import TEXTO_FIM_PLANILHA
+
+GUIAS = {"Detalhada": "AFP - Detalhada", "Estimada": "AFP - Estimativa"}
+LINHA_GRUPOS = 8
+LINHA_CAMPOS = 9
+PRIMEIRA_LINHA_DADOS = 10
+
+TIPOS_FUNCAO = ("ALI", "AIE", "EE", "CE", "SE", "INM")
+# Distribuição aproximada das contagens reais: mais transações que arquivos
+PESOS_TIPOS = (12, 6, 30, 30, 20, 2)
+# Tipos de projeto do cadastro padrão de fatores de ajuste
+TIPOS_PROJETO = dict(FATORES_PADRAO)
+# Tipos de projeto que a planilha usa mas que não existem no cadastro padrão
+# (devem aparecer como "fatores novos" na etapa 2)
+TIPOS_PROJETO_NOVOS = {"Desenvolvimento Ágil": 0.9, "Verificação de Erros": 0.15}
+FRACAO_ERROS = 0.01
+
+
+def colunas_guia(metodo: str, releases: int) -> list:
+    """Lista de (grupo da linha 8, campo da linha 9) de cada coluna da guia."""
+    colunas = [("Módulo", None), ("Funcionalidade", None), ("Nome", None), ("Tipo", None)]
+    if metodo == "Detalhada":
+        colunas += [("DER", "Qtd"), ("DER", "Descrição"), ("RLR", "Qtd"), ("RLR", "Descrição")]
+    else:
+        colunas += [("DER", "Qtd"), ("RLR", "Qtd")]
+    colunas += [("Tipo Projeto", f"Release {n}") for n in range(1, releases + 1)]
+    colunas += [("Fator Ajuste", f"Release {n}") for n in range(1, releases + 1)]
+    colunas += [("Insumos", None), ("Observações", None)]
+    return colunas
+
+
+def mapeamento_padrao(metodo: str) -> dict:
+    """Mapeamento {"Coluna Planilha": "campo_db"} usado na etapa 3 dos benchmarks."""
+    mapeamento = {
+        "Módulo": "modulo",
+        "Funcionalidade": "funcionalidade",
+        "Nome": "nome",
+        "Tipo": "tipo_funcao",
+        "DER - Qtd": "qtd_der",
+        "RLR - Qtd": "qtd_rlr",
+        "Tipo Projeto - Release 1": "nome_fator_ajuste",
+        "Insumos": "insumos",
+        "Observações": "observacoes",
+    }
+    if metodo == "Detalhada":
+        mapeamento.update({"DER - Descrição": "desc_der", "RLR - Descrição": "desc_rlr"})
+    return mapeamento
+
+
+def _escrever_cabecalho(ws, metodo: str, colunas: list):
+    ws["A1"] = "Análise de Pontos de Função"
+    ws["A1"].font = Font(bold=True, size=14)
+    ws["A3"], ws["B3"] = "Sistema:", "Sistema Sintético"
+    ws["A4"], ws["B4"] = "Método:", f"Contagem {metodo}"
+    ws["A5"], ws["B5"] = "Responsável:", "Benchmark"
+    ws["A6"], ws["B6"] = "Data:", "01/01/2025"
+
+    negrito = Font(bold=True)
+    centro = Alignment(horizontal="center", vertical="center")
+    inicio = 0
+    while inicio < len(colunas):
+        grupo, campo = colunas[inicio]
+        fim = inicio
+        while fim + 1 < len(colunas) and colunas[fim + 1][0] == grupo and campo is not None:
+            fim += 1
+        celula = ws.cell(row=LINHA_GRUPOS, column=inicio + 1, value=grupo)
+        celula.font, celula.alignment = negrito, centro
+        if campo is None:
+            # Coluna simples: o título ocupa as duas linhas
+            ws.merge_cells(
+                start_row=LINHA_GRUPOS, start_column=inicio + 1, end_row=LINHA_CAMPOS, end_column=inicio + 1
+            )
+        else:
+            if fim > inicio:
+                ws.merge_cells(
+                    start_row=LINHA_GRUPOS, start_column=inicio + 1, end_row=LINHA_GRUPOS, end_column=fim + 1
+                )
+            for posicao in range(inicio, fim + 1):
+                celula = ws.cell(row=LINHA_CAMPOS, column=posicao + 1, value=colunas[posicao][1])
+                celula.font, celula.alignment = negrito, centro
+        inicio = fim + 1
+
+
+def _linha_funcao(rng: random.Random, n: int, metodo: str, releases: int, tipos_projeto: list) -> list:
+    tipo = rng.choices(TIPOS_FUNCAO, PESOS_TIPOS)[0]
+    qtd_der = rng.randint(1, 60) if tipo != "INM" else rng.randint(1, 10)
+    qtd_rlr = rng.randint(1, 8) if tipo in ("ALI", "AIE") else rng.randint(0, 4)
+    nome = f"{'Manter' if tipo in ('ALI', 'AIE') else 'Consultar'} registro {n}"
+
+    # Erros típicos de preenchimento
+    if rng.random() < FRACAO_ERROS:
+        erro = rng.randrange(3)
+        if erro == 0:
+            qtd_der = "dez"
+        elif erro == 1:
+            nome = None
+        else:
+            tipo = "XYZ"
+
+    linha = [f"Módulo {n % 40}", f"Funcionalidade {n % 400}", nome, tipo]
+    if metodo == "Detalhada":
+        linha += [qtd_der, f"Campos da tela {n % 400}", qtd_rlr, f"Tabela {n % 120}"]
+    else:
+        linha += [qtd_der, qtd_rlr]
+
+    # Release 1 sempre preenchida; as seguintes só para parte das funções
+    tipos = [rng.choice(tipos_projeto)]
+    tipos += [rng.choice(tipos_projeto) if rng.random() < 0.3 else None for _ in range(releases - 1)]
+    todos = {**TIPOS_PROJETO, **TIPOS_PROJETO_NOVOS}
+    linha += tipos
+    linha += [todos[t] if t else None for t in tipos]
+    linha += [f"Documento {n % 25}" if rng.random() < 0.5 else None, None]
+    return linha
+
+
+def gerar_planilha(funcoes: int, releases: int = 3, semente: int = 42) -> bytes:
+    """
+    Gera um .xlsx com as guias "AFP - Detalhada" e "AFP - Estimativa", cada uma
+    com `funcoes` linhas de funções, e retorna o conteúdo do arquivo.
+    """
+    rng = random.Random(semente)
+    tipos_projeto = list(TIPOS_PROJETO) * 20 + list(TIPOS_PROJETO_NOVOS)
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    for metodo, guia in GUIAS.items():
+        ws = wb.create_sheet(guia)
+        colunas = colunas_guia(metodo, releases)
+        _escrever_cabecalho(ws, metodo, colunas)
+        for n in range(funcoes):
+            ws.append(_linha_funcao(rng, n, metodo, releases, tipos_projeto))
+
+        # Linha de marcação do fim da área de funções
+        marcacao = [None] * len(colunas)
+        marcacao[colunas.index(("Tipo Projeto", "Release 1"))] = TEXTO_FIM_PLANILHA
+        ws.append(marcacao)
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    quantidade = int(argumentos[0]) if argumentos else 1000
+    destino = argumentos[1] if len(argumentos) > 1 else f"planilha_{quantidade}.xlsx"
+    with open(destino, "wb") as arquivo:
+        arquivo.write(gerar_planilha(quantidade))
+    print(f"{destino}: {quantidade} funções por guia")
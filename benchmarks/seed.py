@@ -0,0 +1,288 @@
+# benchmarks/seed.py
+#
+# Popula o banco de DATABASE_URL com um volume configurável de dados
+# sintéticos (clientes, projetos, sistemas, contagens, funções e fatores de
+# ajuste), para reproduzir a lentidão de bancos de produção.
+#
+# - Determinístico: a mesma semente gera os mesmos dados (e, em um banco
+#   vazio, os mesmos ids, que são atribuídos aqui e não pelo banco).
+# - Distribuição: com --assimetria > 0, poucos clientes concentram muitos
+#   projetos, poucos projetos concentram muitas contagens etc. (pesos do tipo
+#   Zipf); o número de funções por contagem segue uma lognormal.
+# - Carga: no PostgreSQL, COPY (copy_records_to_table do asyncpg) em lotes;
+#   nos demais bancos (ex.: SQLite), INSERT com executemany.
+# - Complexidade e PF das funções vêm de calculation.calcular_pontos_de_funcao.
+#
+# Uso: python -m benchmarks.seed [--clientes 1000] [--projetos 3000] [--sistemas 5000]
+#          [--contagens 20000] [--funcoes 1000000] [--assimetria 1.0] [--semente 42] [--limpar]
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import delete, func, select, text
+from sqlmodel import SQLModel
+
+from app.database import async_engine
+from app.models import (
+    Cliente,
+    Contagem,
+    FatorAjuste,
+    Funcao,
+    MetodoContagemEnum,
+    Projeto,
+    Sistema,
+    TipoAjuste,
+    TipoContagemEnum,
+    TipoFuncaoEnum,
+)
+from app.services import calculation
+from benchmarks.planilha import PESOS_TIPOS, TIPOS_FUNCAO, TIPOS_PROJETO
+
+TAMANHO_LOTE = 50_000
+DATA_INICIAL = datetime(2020, 1, 1)
+
+
+def pesos_zipf(quantidade: int, assimetria: float, rng: np.random.Generator) -> np.ndarray:
+    """Pesos normalizados 1/posição^assimetria, em ordem aleatória (0 = uniforme)."""
+    pesos = 1.0 / np.arange(1, quantidade + 1) ** assimetria
+    rng.shuffle(pesos)
+    return pesos / pesos.sum()
+
+
+def distribuir(filhos: int, pais: int, assimetria: float, rng: np.random.Generator) -> np.ndarray:
+    """Índice do pai de cada filho; todo pai recebe ao menos um filho quando filhos >= pais."""
+    if filhos >= pais:
+        extras = rng.choice(pais, size=filhos - pais, p=pesos_zipf(pais, assimetria, rng))
+        indices = np.concatenate([np.arange(pais), extras])
+        rng.shuffle(indices)
+        return indices
+    return rng.choice(pais, size=filhos, p=pesos_zipf(pais, assimetria, rng))
+
+
+class Carregador:
+    """Grava lotes de tuplas em uma tabela: COPY no PostgreSQL, executemany nos demais."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.postgres = conn.dialect.name == "postgresql"
+        self.linhas = {}
+        self.tempo = {}
+
+    async def proximo_id(self, tabela) -> int:
+        maximo = await self.conn.scalar(select(func.max(tabela.c.id)))
+        return (maximo or 0) + 1
+
+    async def gravar(self, tabela, colunas: tuple, linhas: list):
+        if not linhas:
+            return
+        inicio = time.perf_counter()
+        if self.postgres:
+            bruta = await self.conn.get_raw_connection()
+            await bruta.driver_connection.copy_records_to_table(tabela.name, records=linhas, columns=colunas)
+        else:
+            await self.conn.execute(tabela.insert(), [dict(zip(colunas, linha)) for linha in linhas])
+        self.linhas[tabela.name] = self.linhas.get(tabela.name, 0) + len(linhas)
+        self.tempo[tabela.name] = self.tempo.get(tabela.name, 0.0) + time.perf_counter() - inicio
+
+    async def ajustar_sequencias(self, tabelas: list):
+        """Os ids foram atribuídos explicitamente: avança as sequências do PostgreSQL."""
+        if not self.postgres:
+            return
+        for tabela in tabelas:
+            await self.conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{tabela.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {tabela.name}), 0) + 1, false)"
+            ))
+
+
+def _linhas_funcoes(
+    rng: np.random.Generator,
+    primeiro_id: int,
+    contagem_ids: np.ndarray,
+    sistema_ids: list,
+    fatores: list,
+) -> list:
+    """Funções de um lote, com complexidade e PF calculados pelo serviço de cálculo."""
+    quantidade = len(contagem_ids)
+    tipos = rng.choice(len(TIPOS_FUNCAO), size=quantidade, p=np.array(PESOS_TIPOS) / sum(PESOS_TIPOS))
+    qtds_der = rng.integers(1, 61, size=quantidade)
+    # Arquivos (ALI/AIE) têm ao menos um registro lógico
+    qtds_rlr = np.where(tipos < 2, rng.integers(1, 9, size=quantidade), rng.integers(0, 5, size=quantidade))
+    qtds_inm = rng.integers(1, 11, size=quantidade)
+    indices_fator = rng.integers(0, len(fatores), size=quantidade)
+    modulos = rng.integers(0, 40, size=quantidade)
+
+    linhas = []
+    for i in range(quantidade):
+        tipo = TIPOS_FUNCAO[tipos[i]]
+        fator_id, fator = fatores[indices_fator[i]]
+        qtd_der = int(qtds_inm[i]) if tipo == "INM" else int(qtds_der[i])
+        calculada = calculation.calcular_pontos_de_funcao({
+            "tipo_funcao": tipo,
+            "qtd_der": qtd_der,
+            "qtd_rlr": int(qtds_rlr[i]),
+            "fator_ajuste": fator,
+        })
+        funcao_id = primeiro_id + i
+        linhas.append((
+            funcao_id,
+            f"Módulo {modulos[i]}",
+            f"Funcionalidade {funcao_id % 997}",
+            f"Função {funcao_id}",
+            TipoFuncaoEnum(tipo).name,
+            qtd_der,
+            int(qtds_rlr[i]),
+            int(qtds_inm[i]) if tipo == "INM" else 0,
+            calculada["complexidade"],
+            int(round(calculada["ponto_de_funcao_bruto"])),
+            calculada["ponto_de_funcao_liquido"],
+            int(contagem_ids[i]),
+            fator_id,
+            sistema_ids[i],
+        ))
+    return linhas
+
+
+async def semear(
+    clientes: int,
+    projetos: int,
+    sistemas: int,
+    contagens: int,
+    funcoes: int,
+    assimetria: float = 1.0,
+    semente: int = 42,
+    limpar: bool = False,
+) -> dict:
+    rng = np.random.default_rng(semente)
+    tabelas = [t.__table__ for t in (FatorAjuste, Cliente, Projeto, Sistema, Contagem, Funcao)]
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        if limpar:
+            for tabela in reversed(tabelas):
+                await conn.execute(delete(tabela))
+
+        carregador = Carregador(conn)
+        fator_t, cliente_t, projeto_t, sistema_t, contagem_t, funcao_t = tabelas
+
+        # Fatores de ajuste do cadastro padrão
+        base = await carregador.proximo_id(fator_t)
+        fatores = [(base + i, fator) for i, fator in enumerate(TIPOS_PROJETO.values())]
+        await carregador.gravar(fator_t, ("id", "nome", "fator", "tipo_ajuste"), [
+            (fator_id, nome, fator, TipoAjuste.PERCENTUAL.name)
+            for (fator_id, fator), nome in zip(fatores, TIPOS_PROJETO)
+        ])
+
+        base = await carregador.proximo_id(cliente_t)
+        cliente_ids = np.arange(base, base + clientes)
+        await carregador.gravar(cliente_t, ("id", "nome"), [
+            (int(i), f"Cliente {i}") for i in cliente_ids
+        ])
+
+        base = await carregador.proximo_id(projeto_t)
+        projeto_ids = np.arange(base, base + projetos)
+        projeto_cliente = cliente_ids[distribuir(projetos, clientes, assimetria, rng)]
+        await carregador.gravar(projeto_t, ("id", "nome", "cliente_id"), [
+            (int(i), f"Projeto {i}", int(c)) for i, c in zip(projeto_ids, projeto_cliente)
+        ])
+
+        base = await carregador.proximo_id(sistema_t)
+        sistema_ids = np.arange(base, base + sistemas)
+        sistema_projeto = distribuir(sistemas, projetos, assimetria, rng)
+        await carregador.gravar(sistema_t, ("id", "nome", "projeto_id"), [
+            (int(i), f"Sistema {i}", int(projeto_ids[p])) for i, p in zip(sistema_ids, sistema_projeto)
+        ])
+        # Sistemas de cada projeto (posição no array de projetos -> ids)
+        sistemas_do_projeto = {}
+        for sistema_id, posicao in zip(sistema_ids, sistema_projeto):
+            sistemas_do_projeto.setdefault(int(posicao), []).append(int(sistema_id))
+
+        base = await carregador.proximo_id(contagem_t)
+        contagem_ids = np.arange(base, base + contagens)
+        contagem_projeto = distribuir(contagens, projetos, assimetria, rng)
+        dias = rng.integers(0, 6 * 365, size=contagens)
+        tipos_contagem = [t.name for t in TipoContagemEnum]
+        metodos = [m.name for m in MetodoContagemEnum]
+        contagem_sistema = []
+        linhas = []
+        for n, (contagem_id, posicao) in enumerate(zip(contagem_ids, contagem_projeto)):
+            opcoes = sistemas_do_projeto.get(int(posicao))
+            # Um terço das contagens não tem sistema
+            sistema_id = opcoes[int(rng.integers(len(opcoes)))] if opcoes and n % 3 else None
+            contagem_sistema.append(sistema_id)
+            linhas.append((
+                int(contagem_id),
+                f"Contagem {contagem_id}",
+                tipos_contagem[n % len(tipos_contagem)],
+                metodos[n % len(metodos)],
+                DATA_INICIAL + timedelta(days=int(dias[n]), minutes=n % 1440),
+                f"Responsável {n % 50}",
+                int(projeto_cliente[posicao]),
+                int(projeto_ids[posicao]),
+                sistema_id,
+            ))
+            if len(linhas) >= TAMANHO_LOTE:
+                await carregador.gravar(contagem_t, _COLUNAS_CONTAGEM, linhas)
+                linhas = []
+        await carregador.gravar(contagem_t, _COLUNAS_CONTAGEM, linhas)
+
+        # Funções: quantidade por contagem segue uma lognormal (poucas contagens muito grandes)
+        if contagens and funcoes:
+            pesos = rng.lognormal(mean=0.0, sigma=1.0 if assimetria else 0.0, size=contagens)
+            por_contagem = rng.multinomial(funcoes, pesos / pesos.sum())
+            dono = np.repeat(np.arange(contagens), por_contagem)
+            proximo = await carregador.proximo_id(funcao_t)
+            for inicio in range(0, funcoes, TAMANHO_LOTE):
+                lote = dono[inicio:inicio + TAMANHO_LOTE]
+                await carregador.gravar(funcao_t, _COLUNAS_FUNCAO, _linhas_funcoes(
+                    rng,
+                    proximo + inicio,
+                    contagem_ids[lote],
+                    [contagem_sistema[posicao] for posicao in lote],
+                    fatores,
+                ))
+
+        await carregador.ajustar_sequencias(tabelas)
+
+    await async_engine.dispose()
+    return {
+        tabela: {"linhas": linhas, "segundos": round(carregador.tempo[tabela], 3)}
+        for tabela, linhas in carregador.linhas.items()
+    }
+
+
+_COLUNAS_CONTAGEM = (
+    "id", "descricao", "tipo_contagem", "metodo_contagem", "data_criacao",
+    "responsavel", "cliente_id", "projeto_id", "sistema_id",
+)
+_COLUNAS_FUNCAO = (
+    "id", "modulo", "funcionalidade", "nome", "tipo_funcao", "qtd_der", "qtd_rlr", "qtd_inm",
+    "complexidade", "ponto_de_funcao_bruto", "ponto_de_funcao_liquido",
+    "contagem_id", "fator_ajuste_id", "sistema_id",
+)
+
+
+def _argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Popula o banco com dados sintéticos.")
+    parser.add_argument("--clientes", type=int, default=1_000)
+    parser.add_argument("--projetos", type=int, default=3_000)
+    parser.add_argument("--sistemas", type=int, default=5_000)
+    parser.add_argument("--contagens", type=int, default=20_000)
+    parser.add_argument("--funcoes", type=int, default=1_000_000)
+    parser.add_argument("--assimetria", type=float, default=1.0, help="0 = distribuição uniforme")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--limpar", action="store_true", help="apaga os dados existentes antes")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    argumentos = _argumentos()
+    inicio = time.perf_counter()
+    resultado = asyncio.run(semear(**vars(argumentos)))
+    for tabela, medida in resultado.items():
+        taxa = medida["linhas"] / medida["segundos"] if medida["segundos"] else 0
+        print(f"{tabela:>12}: {medida['linhas']:>10} linhas em {medida['segundos']:7.2f} s ({taxa:,.0f} linhas/s)")
+    print(f"Total: {time.perf_counter() - inicio:.1f} s")
@@ -0,0 +1,82 @@
+# benchmarks/serialization.py
+#
+# Mede o custo de montar a resposta de GET /api/contagens/ para N itens:
+# caminho padrão do FastAPI (validação pydantic por item + ORJSONResponse)
+# x caminho rápido de app.serialization (dicionários + orjson).
+#
+# Uso: python -m benchmarks.serialization [itens]
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+
+from app.main import app
+from app.models import Cliente, Contagem, MetodoContagemEnum, Projeto, Sistema, TipoContagemEnum
+from app.schemas import ContagemReadWithRelations
+from app.serialization import resposta_lista
+
+
+def gerar_contagens(quantidade: int) -> list:
+    cliente = Cliente(id=1, nome="Cliente")
+    projeto = Projeto(id=1, nome="Projeto", cliente_id=1, cliente=cliente)
+    sistema = Sistema(id=1, nome="Sistema", projeto_id=1)
+    return [
+        Contagem(
+            id=i,
+            descricao=f"Contagem {i}",
+            tipo_contagem=TipoContagemEnum.MELHORIA,
+            metodo_contagem=MetodoContagemEnum.DETALHADA,
+            data_criacao=datetime(2025, 1, 1, 12, 0),
+            responsavel="Responsável",
+            cliente_id=1,
+            projeto_id=1,
+            sistema_id=1,
+            cliente=cliente,
+            projeto=projeto,
+            sistema=sistema,
+        )
+        for i in range(quantidade)
+    ]
+
+
+def _rota(path: str):
+    return next(r for r in app.routes if getattr(r, "path", None) == path and "GET" in r.methods)
+
+
+async def caminho_padrao(contagens: list) -> bytes:
+    rota = _rota("/api/contagens/")
+    conteudo = await serialize_response(field=rota.response_field, response_content=contagens)
+    return ORJSONResponse(content=conteudo).body
+
+
+async def caminho_rapido(contagens: list) -> bytes:
+    return resposta_lista(contagens, ContagemReadWithRelations).body
+
+
+def cronometrar(funcao, contagens, repeticoes: int = 5) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        asyncio.run(funcao(contagens))
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main(quantidade: int = 10_000) -> dict:
+    contagens = gerar_contagens(quantidade)
+    resultado = {
+        "itens": quantidade,
+        "padrao_ms": round(cronometrar(caminho_padrao, contagens) * 1000, 1),
+        "rapido_ms": round(cronometrar(caminho_rapido, contagens) * 1000, 1),
+    }
+    for chave, valor in resultado.items():
+        print(f"{chave:>10}: {valor}")
+    return resultado
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,70 @@
+# benchmarks/staging_memory.py
+#
+# Compara a memória ocupada pelos dados de uma importação em staging:
+# lista de dicionários (formato antigo) x tabela colunar compacta.
+#
+# Uso: python -m benchmarks.staging_memory [linhas] [colunas]
+
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from app.services import staging
+
+
+def gerar_dataframe(linhas: int, colunas: int) -> pd.DataFrame:
+    """Gera um DataFrame com o mesmo perfil de tipos devolvido pelo read_excel."""
+    rng = np.random.default_rng(42)
+    tipos = np.array(["ALI", "AIE", "EE", "CE", "SE"], dtype=object)
+    dados = {}
+    for i in range(colunas):
+        if i % 3 == 0:
+            dados[f"Qtd {i}"] = rng.integers(0, 60, linhas).astype(float)
+        elif i % 3 == 1:
+            dados[f"Tipo {i}"] = tipos[rng.integers(0, len(tipos), linhas)]
+        else:
+            modulos = np.array([f"Módulo {n}" for n in range(200)], dtype=object)
+            dados[f"Texto {i}"] = modulos[rng.integers(0, len(modulos), linhas)]
+    return pd.DataFrame(dados)
+
+
+def medir(funcao, *args):
+    tracemalloc.start()
+    resultado = funcao(*args)
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, atual, pico
+
+
+def formato_antigo(df: pd.DataFrame) -> list:
+    df = df.astype(object).where(pd.notnull(df), None)
+    return df.to_dict(orient="records")
+
+
+def main(linhas: int = 30_000, colunas: int = 60) -> dict:
+    df = gerar_dataframe(linhas, colunas)
+    mapeamento = {col: f"campo_{i}" for i, col in enumerate(df.columns[:11])}
+
+    _, retido_antigo, pico_antigo = medir(formato_antigo, df)
+    compacto, retido_novo, pico_novo = medir(staging.compactar_dataframe, df)
+    _, retido_projecao, _ = medir(staging.projetar_mapeamento, compacto, mapeamento)
+
+    resultado = {
+        "linhas": linhas,
+        "colunas": colunas,
+        "lista_dicts_retido_mb": round(retido_antigo / 2**20, 1),
+        "lista_dicts_pico_mb": round(pico_antigo / 2**20, 1),
+        "colunar_retido_mb": round(retido_novo / 2**20, 1),
+        "colunar_pico_mb": round(pico_novo / 2**20, 1),
+        "projecao_mapeamento_kb": round(retido_projecao / 2**10, 1),
+    }
+    for chave, valor in resultado.items():
+        print(f"{chave:>26}: {valor}")
+    return resultado
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    main(*argumentos)
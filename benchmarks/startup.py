@@ -0,0 +1,223 @@
+# benchmarks/startup.py
+#
+# Custo de inicialização de um worker:
+# - importação de app.main (app.startup_report, em um processo novo);
+# - partida a frio: do lançamento do uvicorn até /health/ready responder 200
+#   (mediana de algumas partidas);
+# - latência da primeira requisição a cada rota quente (app.warmup) logo após
+#   a partida, comparada com a mediana em regime na mesma conexão;
+# - memória residente (RSS) de cada worker com a aplicação ociosa e depois
+#   de uma rodada de requisições que inclui uma importação de planilha (que
+#   carrega o pandas sob demanda no worker que a atendeu).
+#
+# A RSS vem de /proc/<pid>/status (Linux). Sem DATABASE_URL (ver
+# benchmarks/__init__.py), cada worker usa o próprio SQLite em memória com as
+# fixtures (DATABASE_FIXTURES=1).
+# Os resultados vão para benchmarks/resultados/startup.json.
+#
+# Uso: python -m benchmarks.startup [--partidas 5] [--workers 1,2,4]
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from app.startup_report import relatorio
+from app.warmup import ROTAS_QUENTES
+from benchmarks import BANCO_MEMORIA
+from benchmarks.historico import RESULTADOS, gravar_historico, nova_execucao
+from benchmarks.planilha import gerar_planilha, mapeamento_padrao
+
+HISTORICO = RESULTADOS / "startup.json"
+ROTA_PRONTO = "/health/ready"
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _ambiente() -> dict:
+    ambiente = {**os.environ, "LOG_LEVEL": "ERROR"}
+    if ambiente.get("DATABASE_URL") == BANCO_MEMORIA:
+        ambiente["DATABASE_FIXTURES"] = "1"
+    return ambiente
+
+
+def iniciar(workers: int) -> tuple:
+    """Lança o uvicorn e espera ficar pronto (após o aquecimento); retorna (processo, url, segundos)."""
+    porta = _porta_livre()
+    inicio = time.perf_counter()
+    processo = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(porta),
+        "--workers", str(workers), "--log-level", "error", "--no-access-log",
+    ], env=_ambiente())
+    base_url = f"http://127.0.0.1:{porta}"
+    while True:
+        if processo.poll() is not None:
+            raise RuntimeError(f"O servidor terminou com o código {processo.returncode}.")
+        try:
+            if httpx.get(base_url + ROTA_PRONTO, timeout=2).status_code == 200:
+                return processo, base_url, time.perf_counter() - inicio
+        except httpx.HTTPError:
+            time.sleep(0.01)
+
+
+def parar(processo: subprocess.Popen):
+    processo.terminate()
+    try:
+        processo.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+        processo.wait()
+
+
+def rss_kib(pid: int) -> int:
+    for linha in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if linha.startswith("VmRSS:"):
+            return int(linha.split()[1])
+    return 0
+
+
+def pids_workers(pid_mestre: int) -> list:
+    """Processos dos workers: filhos do uvicorn (exceto o resource_tracker) ou o próprio mestre."""
+    filhos = []
+    for entrada in Path("/proc").iterdir():
+        if not entrada.name.isdigit():
+            continue
+        try:
+            stat = (entrada / "stat").read_text()
+            linha_comando = (entrada / "cmdline").read_bytes()
+        except OSError:
+            continue
+        # O nome do executável (entre parênteses) pode conter espaços
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        if ppid == pid_mestre and b"resource_tracker" not in linha_comando:
+            filhos.append(int(entrada.name))
+    return sorted(filhos) or [pid_mestre]
+
+
+def rodada_de_trafego(base_url: str, conexoes: int):
+    """Requisições de API e uma importação por conexão (cada uma tende a cair em um worker)."""
+    planilha = gerar_planilha(200)
+    for _ in range(conexoes):
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            contagens = client.get("/api/contagens/").json()
+            detalhada = next(c["id"] for c in contagens if c["metodo_contagem"] == "Detalhada")
+            client.get(f"/api/contagens/{detalhada}/edit")
+            base = f"/api/funcoes/contagem/{detalhada}"
+            client.post(f"{base}/upload_step1", files={"file": ("planilha.xlsx", planilha)})
+            client.post(f"{base}/validate_step2")
+            client.post(f"{base}/process_mapping_step3", json=mapeamento_padrao("Detalhada"))
+
+
+def medir_partida_fria(partidas: int) -> dict:
+    tempos = []
+    for _ in range(partidas):
+        processo, _, segundos = iniciar(1)
+        parar(processo)
+        tempos.append(segundos)
+    return {
+        "mediana_ms": round(statistics.median(tempos) * 1000, 1),
+        "min_ms": round(min(tempos) * 1000, 1),
+        "max_ms": round(max(tempos) * 1000, 1),
+    }
+
+
+def medir_primeira_requisicao(partidas: int, repeticoes: int = 20) -> dict:
+    """Por rota: mediana (entre partidas) da primeira requisição e mediana em regime."""
+    primeiras = {rota: [] for rota in ROTAS_QUENTES}
+    regime = {rota: [] for rota in ROTAS_QUENTES}
+    for _ in range(partidas):
+        processo, base_url, _ = iniciar(1)
+        try:
+            with httpx.Client(base_url=base_url, timeout=30) as client:
+                for rota in ROTAS_QUENTES:
+                    tempos = []
+                    for _ in range(repeticoes + 1):
+                        inicio = time.perf_counter()
+                        client.get(rota).raise_for_status()
+                        tempos.append(time.perf_counter() - inicio)
+                    primeiras[rota].append(tempos[0])
+                    regime[rota].append(statistics.median(tempos[1:]))
+        finally:
+            parar(processo)
+    return {
+        rota: {
+            "primeira_ms": round(statistics.median(primeiras[rota]) * 1000, 2),
+            "regime_ms": round(statistics.median(regime[rota]) * 1000, 2),
+        }
+        for rota in ROTAS_QUENTES
+    }
+
+
+def medir_memoria(workers: int) -> dict:
+    processo, base_url, _ = iniciar(workers)
+    try:
+        # Espera todos os workers subirem (o primeiro a responder pode não ser o último)
+        time.sleep(1.0)
+        pids = pids_workers(processo.pid)
+        ocioso = {pid: rss_kib(pid) for pid in pids}
+        rodada_de_trafego(base_url, conexoes=workers * 2)
+        depois = {pid: rss_kib(pid) for pid in pids}
+    finally:
+        parar(processo)
+    return {
+        "workers": [
+            {"ocioso_mb": round(ocioso[pid] / 1024, 1), "apos_importacao_mb": round(depois[pid] / 1024, 1)}
+            for pid in pids
+        ],
+        "total_ocioso_mb": round(sum(ocioso.values()) / 1024, 1),
+        "total_apos_importacao_mb": round(sum(depois.values()) / 1024, 1),
+    }
+
+
+def executar(partidas: int, lista_workers: list) -> dict:
+    importacao = relatorio(top=10)
+    partida_fria = medir_partida_fria(partidas)
+    primeira_requisicao = medir_primeira_requisicao(partidas)
+    memoria = {str(workers): medir_memoria(workers) for workers in lista_workers}
+
+    print(
+        f"Importação de app.main: {importacao['total_ms']} ms "
+        f"(sob demanda carregadas: {', '.join(importacao['sob_demanda_carregadas']) or 'nenhuma'})"
+    )
+    print(
+        f"Partida a frio (uvicorn -> pronto): mediana {partida_fria['mediana_ms']} ms "
+        f"[{partida_fria['min_ms']}-{partida_fria['max_ms']}] em {partidas} partidas"
+    )
+    for rota, medida in primeira_requisicao.items():
+        print(f"  {rota}: primeira requisição {medida['primeira_ms']} ms, regime {medida['regime_ms']} ms")
+    for workers, medida in memoria.items():
+        por_worker = ", ".join(
+            f"{w['ocioso_mb']}->{w['apos_importacao_mb']}" for w in medida["workers"]
+        )
+        print(
+            f"RSS com {workers} worker(s): total {medida['total_ocioso_mb']} MB ocioso, "
+            f"{medida['total_apos_importacao_mb']} MB após importação (por worker, MB: {por_worker})"
+        )
+
+    execucao = nova_execucao(
+        importacao_ms=importacao["total_ms"],
+        sob_demanda_carregadas=importacao["sob_demanda_carregadas"],
+        partida_fria=partida_fria,
+        primeira_requisicao=primeira_requisicao,
+        memoria=memoria,
+    )
+    gravar_historico(execucao, HISTORICO)
+    return execucao
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo de partida e memória por worker.")
+    parser.add_argument("--partidas", type=int, default=5)
+    parser.add_argument("--workers", default="1,2,4")
+    argumentos = parser.parse_args()
+    executar(argumentos.partidas, [int(w) for w in argumentos.workers.split(",")])
@@ -0,0 +1,123 @@
+# benchmarks/static_assets.py
+#
+# Peso e tempo de primeira carga da página inicial (HTML + assets de
+# base.html), comparando os arquivos originais servidos sem compressão com as
+# cópias de static/dist/ servidas pré-comprimidas (.gz/.br).
+#
+# - Medido: a aplicação sobe em um uvicorn real (loopback) e um cliente sem
+#   cache baixa o HTML e os assets com até 6 conexões paralelas, como um
+#   navegador na primeira visita. Registra bytes recebidos e tempo total.
+# - Modelado: como o loopback não tem limite de banda nem latência, o tempo
+#   em redes reais é estimado a partir dos bytes medidos (banda + RTT fixos).
+#
+# Uso: python -m benchmarks.static_assets [repeticoes]
+
+import asyncio
+import re
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from app.assets import construir_assets
+
+# Velocidades de enlace (bits/s) e latência de ida e volta usadas no modelo
+ENLACES = {"3G lento": (400_000, 0.4), "4G": (9_000_000, 0.17), "Cabo": (50_000_000, 0.02)}
+# Conexões paralelas que o navegador abre por origem (HTTP/1.1)
+CONEXOES = 6
+_ASSET_RE = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor() -> tuple:
+    from app.main import app
+
+    porta = _porta_livre()
+    servidor = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=porta, log_level="warning"))
+    thread = threading.Thread(target=servidor.run, daemon=True)
+    thread.start()
+    while not servidor.started:
+        time.sleep(0.05)
+    return servidor, thread, f"http://127.0.0.1:{porta}"
+
+
+async def carregar_pagina(base_url: str, codificacao: str, originais: dict) -> dict:
+    """
+    Primeira visita: HTML e, em seguida, os assets referenciados por ele.
+    `originais` troca as URLs com hash pelas dos arquivos originais (cenário antes).
+    """
+    limites = httpx.Limits(max_connections=CONEXOES)
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, headers={"accept-encoding": codificacao}) as client:
+        inicio = time.perf_counter()
+        pagina = await client.get("/")
+        urls = [originais.get(url, url) for url in _ASSET_RE.findall(pagina.text)]
+        respostas = await asyncio.gather(*(client.get(url) for url in urls))
+        tempo = time.perf_counter() - inicio
+    return {
+        "bytes": pagina.num_bytes_downloaded + sum(r.num_bytes_downloaded for r in respostas),
+        "arquivos": 1 + len(respostas),
+        "ms": tempo * 1000,
+    }
+
+
+def modelar_primeira_carga(total_bytes: int, arquivos: int, banda: int, rtt: float) -> float:
+    """Tempo estimado (s): uma rodada de RTT para o HTML, mais uma por lote de CONEXOES assets."""
+    rodadas = 1 + -(-(arquivos - 1) // CONEXOES)
+    return rodadas * rtt + total_bytes * 8 / banda
+
+
+def executar(repeticoes: int) -> dict:
+    manifesto = construir_assets()
+    originais = {f"/static/{hashed}": f"/static/{original}" for original, hashed in manifesto.items()}
+    cenarios = {
+        "original": ("identity", originais),
+        "dist+gzip": ("gzip", {}),
+        "dist+br": ("br, gzip", {}),
+    }
+
+    servidor, thread, base_url = iniciar_servidor()
+    resultado = {}
+    try:
+        for nome, (codificacao, troca) in cenarios.items():
+            medidas = [
+                asyncio.run(carregar_pagina(base_url, codificacao, troca))
+                for _ in range(repeticoes)
+            ]
+            resultado[nome] = {
+                "bytes": medidas[0]["bytes"],
+                "arquivos": medidas[0]["arquivos"],
+                "ms_mediana": round(statistics.median(m["ms"] for m in medidas), 2),
+            }
+    finally:
+        servidor.should_exit = True
+        thread.join()
+
+    print("Primeira visita à página inicial (medido, uvicorn em loopback):")
+    for nome, medida in resultado.items():
+        print(
+            f"  {nome:>10}: {medida['bytes'] / 1024:7.1f} KiB em {medida['arquivos']} arquivos, "
+            f"{medida['ms_mediana']:6.1f} ms (mediana de {repeticoes})"
+        )
+
+    print("Primeira visita em redes reais (MODELADO a partir dos bytes medidos, não medido):")
+    for rede, (banda, rtt) in ENLACES.items():
+        antes = modelar_primeira_carga(resultado["original"]["bytes"], resultado["original"]["arquivos"], banda, rtt)
+        depois = modelar_primeira_carga(resultado["dist+br"]["bytes"], resultado["dist+br"]["arquivos"], banda, rtt)
+        print(f"  {rede:>10}: {antes * 1000:7.0f} ms -> {depois * 1000:6.0f} ms")
+
+    print("Visitas seguintes: assets com hash ficam em cache (immutable), sem revalidação.")
+    return resultado
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:] if a.isdigit()]
+    executar(argumentos[0] if argumentos else 20)
@@ -0,0 +1,109 @@
+// static/js/lookup.js
+//
+// Combos alimentados pelas listas compactas de /api/lookup/<entidade>
+// (id, nome), com um campo de busca por prefixo logo acima do <select>.
+//
+//     const clientes = lookupSelect(document.getElementById('cliente_id'), {
+//         entidade: 'clientes',
+//         placeholder: 'Selecione um cliente...',
+//     });
+//     const projetos = lookupSelect(document.getElementById('projeto_id'), {
+//         entidade: 'projetos',
+//         filtro: () => ({ cliente_id: clientes.select.value }),
+//     });
+//
+// O <select> pode vir do servidor só com a opção já selecionada: ela é
+// mantida no topo quando não aparece no resultado da busca.
+
+(function () {
+    'use strict';
+
+    const ESPERA_MS = 200;
+
+    function lookupSelect(select, opcoes) {
+        const config = Object.assign({
+            entidade: null,
+            filtro: null,
+            placeholder: 'Selecione...',
+            opcional: false,
+            limite: 50,
+            buscaPlaceholder: 'Buscar pelo nome...',
+        }, opcoes || {});
+
+        const busca = document.createElement('input');
+        busca.type = 'search';
+        busca.className = 'form-control form-control-sm mb-1';
+        busca.placeholder = config.buscaPlaceholder;
+        busca.autocomplete = 'off';
+        select.parentNode.insertBefore(busca, select);
+
+        let espera = null;
+        let controlador = null;
+
+        function opcaoSelecionada() {
+            const opcao = select.options[select.selectedIndex];
+            return opcao && opcao.value ? { id: opcao.value, nome: opcao.textContent } : null;
+        }
+
+        function preencher(itens, selecionada) {
+            select.innerHTML = '';
+            const vazia = document.createElement('option');
+            vazia.value = '';
+            vazia.textContent = config.opcional ? 'Nenhum (Opcional)' : config.placeholder;
+            vazia.disabled = !config.opcional;
+            select.appendChild(vazia);
+            if (selecionada && !itens.some(item => String(item.id) === selecionada.id)) {
+                itens = [selecionada].concat(itens);
+            }
+            itens.forEach(item => {
+                const opcao = document.createElement('option');
+                opcao.value = item.id;
+                opcao.textContent = item.nome;
+                select.appendChild(opcao);
+            });
+            select.value = selecionada ? selecionada.id : '';
+        }
+
+        async function carregar(manterSelecao = true) {
+            const parametros = Object.assign({}, config.filtro ? config.filtro() : {});
+            if (Object.values(parametros).some(valor => valor === '' || valor === null || valor === undefined)) {
+                // Filtro obrigatório ainda sem valor (ex.: projeto sem cliente)
+                preencher([], null);
+                select.disabled = true;
+                return [];
+            }
+            parametros.limit = config.limite;
+            if (busca.value.trim()) {
+                parametros.q = busca.value.trim();
+            }
+            if (controlador) {
+                controlador.abort();
+            }
+            controlador = new AbortController();
+            const selecionada = manterSelecao ? opcaoSelecionada() : null;
+            try {
+                const resposta = await fetch(`/api/lookup/${config.entidade}?${new URLSearchParams(parametros)}`, {
+                    signal: controlador.signal,
+                });
+                const itens = await resposta.json();
+                preencher(itens, selecionada);
+                select.disabled = false;
+                return itens;
+            } catch (erro) {
+                if (erro.name !== 'AbortError') {
+                    console.error(`Erro ao carregar ${config.entidade}:`, erro);
+                }
+                return [];
+            }
+        }
+
+        busca.addEventListener('input', () => {
+            clearTimeout(espera);
+            espera = setTimeout(() => carregar(), ESPERA_MS);
+        });
+
+        return { select, busca, carregar };
+    }
+
+    window.lookupSelect = lookupSelect;
+})();